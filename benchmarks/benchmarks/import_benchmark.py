@@ -0,0 +1,11 @@
+class ColdImport:
+    """Import times in a fresh interpreter."""
+
+    def timeraw_import_aggregation(self):
+        return 'from crowdkit.aggregation import MajorityVote'
+
+    def timeraw_import_metrics(self):
+        return 'from crowdkit.metrics.workers import accuracy_on_aggregates'
+
+    def timeraw_import_text_summarization(self):
+        return 'from crowdkit.aggregation import TextSummarization'
@@ -0,0 +1,43 @@
+"""Lazy package attributes.
+
+Importing a package should not import the heavy dependencies of all its modules, such as `transformers`
+or `nltk`. A package lists its public attributes and the modules they are defined in, and each module
+is only imported when one of its attributes is accessed for the first time.
+"""
+
+__all__ = ['lazy_attributes']
+
+import sys
+from importlib import import_module
+from typing import Any, Callable, Dict, List, Tuple
+
+
+def lazy_attributes(package: str, modules: Dict[str, str]) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Returns the module-level `__getattr__` and `__dir__` functions of a package with lazy attributes.
+
+    Args:
+        package: The name of the package.
+        modules: A mapping of the attribute names to the names of the modules defining them relative to the package.
+
+    Returns:
+        Tuple[Callable, Callable]: The `__getattr__` and `__dir__` functions.
+
+    Raises:
+        ValueError: If an attribute is named the same as its module. Importing the module sets the package's
+            attribute to the module itself, so such attributes should be imported eagerly.
+    """
+    shadowed = [name for name, module in modules.items() if module.rsplit('.', 1)[-1] == name]
+    if shadowed:
+        raise ValueError(f'Attributes {shadowed} of {package!r} are shadowed by their modules.')
+
+    def __getattr__(name: str) -> Any:
+        if name not in modules:
+            raise AttributeError(f'module {package!r} has no attribute {name!r}')
+        value = getattr(import_module(modules[name], package), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(modules))
+
+    return __getattr__, __dir__
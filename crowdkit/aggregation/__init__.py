@@ -1,35 +1,39 @@
-from typing import cast
+from typing import TYPE_CHECKING
 
 from . import base
-from .classification import (
-    DawidSkene,
-    OneCoinDawidSkene,
-    GLAD,
-    GoldMajorityVote,
-    MMSR,
-    MajorityVote,
-    Wawa,
-    ZeroBasedSkill
-)
-from .embeddings import (
-    ClosestToAverage,
-    HRRASA,
-    RASA,
-)
-from .image_segmentation import (
-    SegmentationEM,
-    SegmentationRASA,
-    SegmentationMajorityVote
-)
-from .pairwise import (
-    BradleyTerry,
-    NoisyBradleyTerry
-)
-from .texts import (
-    TextRASA,
-    TextHRRASA,
-    ROVER
-)
+from .._lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .classification import (
+        DawidSkene,
+        OneCoinDawidSkene,
+        GLAD,
+        GoldMajorityVote,
+        MMSR,
+        MajorityVote,
+        Wawa,
+        ZeroBasedSkill
+    )
+    from .embeddings import (
+        ClosestToAverage,
+        HRRASA,
+        RASA,
+    )
+    from .image_segmentation import (
+        SegmentationEM,
+        SegmentationRASA,
+        SegmentationMajorityVote
+    )
+    from .pairwise import (
+        BradleyTerry,
+        NoisyBradleyTerry
+    )
+    from .texts import (
+        TextRASA,
+        TextHRRASA,
+        ROVER
+    )
+    from .texts.text_summarization import TextSummarization
 
 __all__ = [
     'base',
@@ -56,14 +60,26 @@ __all__ = [
     'ZeroBasedSkill',
 ]
 
-
-def is_arcadia() -> bool:
-    try:
-        import __res
-        return cast(bool, __res == __res)
-    except ImportError:
-        return False
-
-
-if not is_arcadia():
-    from .texts.text_summarization import TextSummarization
+# the classes are imported on the first access, so that e.g. `transformers` is only imported with `TextSummarization`
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'BradleyTerry': '.pairwise.bradley_terry',
+    'ClosestToAverage': '.embeddings.closest_to_average',
+    'DawidSkene': '.classification.dawid_skene',
+    'OneCoinDawidSkene': '.classification.dawid_skene',
+    'GLAD': '.classification.glad',
+    'GoldMajorityVote': '.classification.gold_majority_vote',
+    'HRRASA': '.embeddings.hrrasa',
+    'MMSR': '.classification.m_msr',
+    'MajorityVote': '.classification.majority_vote',
+    'NoisyBradleyTerry': '.pairwise.noisy_bt',
+    'RASA': '.embeddings.rasa',
+    'ROVER': '.texts.rover',
+    'SegmentationEM': '.image_segmentation.segmentation_em',
+    'SegmentationMajorityVote': '.image_segmentation.segmentation_majority_vote',
+    'SegmentationRASA': '.image_segmentation.segmentation_rasa',
+    'TextHRRASA': '.texts.text_hrrasa',
+    'TextRASA': '.texts.text_rasa',
+    'TextSummarization': '.texts.text_summarization',
+    'Wawa': '.classification.wawa',
+    'ZeroBasedSkill': '.classification.zero_based_skill',
+})
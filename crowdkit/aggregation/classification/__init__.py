@@ -9,10 +9,26 @@ __all__ = [
     'ZeroBasedSkill'
 ]
 
-from .dawid_skene import DawidSkene, OneCoinDawidSkene
-from .glad import GLAD
-from .gold_majority_vote import GoldMajorityVote
-from .m_msr import MMSR
-from .majority_vote import MajorityVote
-from .wawa import Wawa
-from .zero_based_skill import ZeroBasedSkill
+from typing import TYPE_CHECKING
+
+from ..._lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .dawid_skene import DawidSkene, OneCoinDawidSkene
+    from .glad import GLAD
+    from .gold_majority_vote import GoldMajorityVote
+    from .m_msr import MMSR
+    from .majority_vote import MajorityVote
+    from .wawa import Wawa
+    from .zero_based_skill import ZeroBasedSkill
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'DawidSkene': '.dawid_skene',
+    'OneCoinDawidSkene': '.dawid_skene',
+    'GLAD': '.glad',
+    'GoldMajorityVote': '.gold_majority_vote',
+    'MMSR': '.m_msr',
+    'MajorityVote': '.majority_vote',
+    'Wawa': '.wawa',
+    'ZeroBasedSkill': '.zero_based_skill',
+})
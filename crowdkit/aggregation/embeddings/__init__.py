@@ -1,9 +1,20 @@
-from .closest_to_average import ClosestToAverage
-from .hrrasa import HRRASA
-from .rasa import RASA
+from typing import TYPE_CHECKING
+
+from ..._lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .closest_to_average import ClosestToAverage
+    from .hrrasa import HRRASA
+    from .rasa import RASA
 
 __all__ = [
     'ClosestToAverage',
     'HRRASA',
     'RASA',
 ]
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'ClosestToAverage': '.closest_to_average',
+    'HRRASA': '.hrrasa',
+    'RASA': '.rasa',
+})
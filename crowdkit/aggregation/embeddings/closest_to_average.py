@@ -1,6 +1,6 @@
 __all__ = ['ClosestToAverage']
 
-from typing import Callable, Optional, Any
+from typing import Callable, Optional, Any, Union, cast
 
 import attr
 import numpy as np
@@ -8,6 +8,7 @@ import numpy.typing as npt
 import pandas as pd
 
 from ..base import BaseEmbeddingsAggregator
+from ..utils import factorize, get_embeddings_matrix, get_known_embeddings, get_segment_sums
 
 
 @attr.s
@@ -20,8 +21,9 @@ class ClosestToAverage(BaseEmbeddingsAggregator):
     embedding is the closest one to the average embedding of the task's responses.
 
     Args:
-        distance: A callable that takes two NumPy arrays and returns a single `float` number — the distance
-            between these two vectors.
+        distance: A name of a distance computed for all the embeddings at once: "cosine" (infinite if any of
+            the vectors is zero), "euclidean" or "sqeuclidean". Or a callable that takes two NumPy arrays and
+            returns a single `float` number — the distance between these two vectors.
 
     Attributes:
         embeddings_and_outputs_ (DataFrame): Tasks' embeddings and outputs.
@@ -35,7 +37,7 @@ class ClosestToAverage(BaseEmbeddingsAggregator):
     # embeddings_and_outputs_
     scores_: pd.DataFrame
 
-    distance: Callable[[npt.NDArray[Any], npt.NDArray[Any]], float] = attr.ib()
+    distance: Union[str, Callable[[npt.NDArray[Any], npt.NDArray[Any]], float]] = attr.ib()
 
     def fit(self, data: pd.DataFrame, aggregated_embeddings: Optional[pd.Series] = None,
             true_embeddings: pd.Series = None) -> 'ClosestToAverage':
@@ -59,24 +61,29 @@ class ClosestToAverage(BaseEmbeddingsAggregator):
             )
 
         data = data[['task', 'worker', 'output', 'embedding']]
+        tasks, task_codes = factorize(data.task.values)
+        embeddings = get_embeddings_matrix(data.embedding)
+
         if aggregated_embeddings is None:
-            group = data.groupby('task')
-            # we don't use .mean() because it does not work with np.array in older pandas versions
-            avg_embeddings = group.embedding.apply(np.sum) / group.worker.count()
-            avg_embeddings.update(true_embeddings)
+            # average embeddings, the ground truth ones replace them where known
+            avg_embeddings = get_segment_sums(embeddings, task_codes, len(tasks))
+            avg_embeddings /= np.bincount(task_codes, minlength=len(tasks))[:, None]
+            true_tasks, true_embeddings_matrix = get_known_embeddings(true_embeddings, pd.Index(tasks))
+            if true_tasks.size:
+                avg_embeddings[true_tasks] = true_embeddings_matrix
         else:
-            avg_embeddings = aggregated_embeddings
+            avg_embeddings = get_embeddings_matrix(aggregated_embeddings, pd.Index(tasks))
 
         # Calculating distances (scores)
-        data = data.join(avg_embeddings.rename('avg_embedding'), on='task')
-        # TODO: native Python functions are slow
-        data['score'] = data.apply(lambda row: self.distance(row.embedding, row.avg_embedding), axis=1)
+        data = data.assign(score=self._get_distances(embeddings, avg_embeddings[task_codes]))
 
-        # Selecting best scores and outputs
+        # Selecting best scores and outputs: the first answer with the least score in every task
         scores = data[['task', 'output', 'score', 'embedding']]
         # TODO: process cases when we actually have an answer in true_embeddings
         # TODO: to do that we must make true_embeddings a DataFrame with `output` column
-        embeddings_and_outputs = scores[['task', 'output', 'embedding']].loc[scores.groupby('task')['score'].idxmin()]
+        order = np.lexsort((scores.score.values, task_codes))
+        closest = order[np.concatenate([[0], np.cumsum(np.bincount(task_codes))[:-1]])] if len(scores) else order
+        embeddings_and_outputs = scores[['task', 'output', 'embedding']].iloc[closest]
 
         #
         self.scores_ = scores.set_index('task')
@@ -84,6 +91,24 @@ class ClosestToAverage(BaseEmbeddingsAggregator):
 
         return self
 
+    def _get_distances(self, embeddings: npt.NDArray[Any], avg_embeddings: npt.NDArray[Any]) -> npt.NDArray[Any]:
+        """Computes the distances between the corresponding rows of two matrices."""
+        if callable(self.distance):
+            return np.array([self.distance(embedding, avg_embedding)
+                             for embedding, avg_embedding in zip(embeddings, avg_embeddings)], dtype=float)
+
+        if self.distance == 'sqeuclidean':
+            return cast(npt.NDArray[Any], ((embeddings - avg_embeddings) ** 2).sum(axis=1))
+        if self.distance == 'euclidean':
+            return cast(npt.NDArray[Any], np.sqrt(((embeddings - avg_embeddings) ** 2).sum(axis=1)))
+        if self.distance == 'cosine':
+            norms_prod = np.sqrt((embeddings ** 2).sum(axis=1) * (avg_embeddings ** 2).sum(axis=1))
+            with np.errstate(divide='ignore', invalid='ignore'):
+                distances = np.clip(1 - (embeddings * avg_embeddings).sum(axis=1) / norms_prod, 0, 2)
+            distances[norms_prod == 0] = np.inf
+            return cast(npt.NDArray[Any], distances)
+        raise ValueError(f'Unknown option {self.distance!r} of "distance" argument.')
+
     def fit_predict_scores(self, data: pd.DataFrame, aggregated_embeddings: pd.Series = None) -> pd.DataFrame:
         """Fit the model and return the estimated scores.
 
@@ -4,7 +4,7 @@ __all__ = [
 ]
 
 from functools import partial
-from typing import Any, Tuple, List, Optional, Callable, Generator
+from typing import Any, Tuple, List, Optional, Callable, cast
 
 import attr
 import nltk.translate.gleu_score as gleu
@@ -12,10 +12,10 @@ import numpy as np
 import numpy.typing as npt
 import pandas as pd
 import scipy.stats as sps
-from scipy.spatial import distance
 
 from .closest_to_average import ClosestToAverage
 from ..base import BaseClassificationAggregator
+from ..utils import factorize, get_embeddings_matrix, get_known_embeddings, get_segment_sums
 
 _EPS = 1e-5
 
@@ -123,35 +123,48 @@ class HRRASA(BaseClassificationAggregator):
 
         data = data[['task', 'worker', 'embedding', 'output']]
         data, single_overlap_tasks = self._filter_single_overlap(data)
-        data = self._get_local_skills(data)
+
+        tasks, task_codes = factorize(data.task.values)
+        workers, worker_codes = factorize(data.worker.values)
+        embeddings = get_embeddings_matrix(data.embedding)
+        local_skills = self._get_local_skills(data, embeddings, task_codes, worker_codes)
+        data = data.assign(local_skill=local_skills)
+        true_tasks, true_embeddings_matrix = get_known_embeddings(true_embeddings, pd.Index(tasks))
 
         prior_skills = data.worker.value_counts().apply(partial(sps.chi2.isf, self.alpha / 2))
-        skills = pd.Series(1.0, index=data.worker.unique())
-        weights = self._calc_weights(data, skills)
-        aggregated_embeddings = self._aggregate_embeddings(data, weights, true_embeddings)
+        prior_skills_values = prior_skills[workers].values
+        skills = np.ones(len(workers))
+        weights = skills[worker_codes] * local_skills
+        aggregated_embeddings = self._aggregate_embeddings(embeddings, task_codes, weights, len(tasks))
         self.loss_history_ = []
         last_aggregated = None
 
         if len(data) > 0:
             for _ in range(self.n_iter):
-                aggregated_embeddings = self._aggregate_embeddings(data, weights, true_embeddings)
-                skills = self._update_skills(data, aggregated_embeddings, prior_skills)
-                weights = self._calc_weights(data, skills)
+                aggregated_embeddings = self._aggregate_embeddings(embeddings, task_codes, weights, len(tasks))
+                if true_tasks.size:
+                    aggregated_embeddings[true_tasks] = true_embeddings_matrix
+                skills = self._update_skills(embeddings, task_codes, worker_codes, local_skills,
+                                             aggregated_embeddings, prior_skills_values)
+                weights = skills[worker_codes] * local_skills
 
                 if last_aggregated is not None:
                     delta = aggregated_embeddings - last_aggregated
-                    loss = (delta * delta).sum().sum() / (aggregated_embeddings * aggregated_embeddings).sum().sum()
+                    loss = (delta * delta).sum() / (aggregated_embeddings * aggregated_embeddings).sum()
                     self.loss_history_.append(loss)
                     if loss < self.tol:
                         break
                 last_aggregated = aggregated_embeddings
 
         self.prior_skills_ = prior_skills
-        self.skills_ = skills
-        self.weights_ = weights
-        self.aggregated_embeddings_ = aggregated_embeddings
+        self.skills_ = pd.Series(skills, index=workers)
+        self.weights_ = pd.DataFrame(
+            {'weight': weights}, index=pd.MultiIndex.from_arrays([data.task, data.worker], names=['task', 'worker'])
+        )
+        self.aggregated_embeddings_ = pd.Series(list(aggregated_embeddings), index=pd.Index(tasks, name='task'),
+                                                dtype=object)
         if self.calculate_ranks:
-            self.ranks_ = self._rank_outputs(data, skills)
+            self.ranks_ = self._rank_outputs(data, embeddings, task_codes, worker_codes, aggregated_embeddings, skills)
 
         if len(single_overlap_tasks) > 0:
             self._fill_single_overlap_tasks_info(single_overlap_tasks)
@@ -190,132 +203,97 @@ class HRRASA(BaseClassificationAggregator):
 
         return self.fit(data, true_embeddings)._apply(data, true_embeddings).embeddings_and_outputs_
 
-    @staticmethod
-    def _cosine_distance(embedding: npt.NDArray[Any], avg_embedding: npt.NDArray[Any]) -> float:
-        if not embedding.any() or not avg_embedding.any():
-            return float('inf')
-        return float(distance.cosine(embedding, avg_embedding))
-
     def _apply(self, data: pd.DataFrame, true_embeddings: pd.Series = None) -> 'HRRASA':
-        cta = ClosestToAverage(distance=self._cosine_distance)
+        cta = ClosestToAverage(distance='cosine')
         cta.fit(data, aggregated_embeddings=self.aggregated_embeddings_, true_embeddings=true_embeddings)
         self.scores_ = cta.scores_
         self.embeddings_and_outputs_ = cta.embeddings_and_outputs_
         return self
 
     @staticmethod
-    def _aggregate_embeddings(data: pd.DataFrame, weights: pd.DataFrame,
-                              true_embeddings: Optional[pd.Series] = None) -> pd.Series:
+    def _aggregate_embeddings(embeddings: npt.NDArray[Any], task_codes: npt.NDArray[Any], weights: npt.NDArray[Any],
+                              tasks: int) -> npt.NDArray[Any]:
         """Calculates weighted average of embeddings for each task."""
-        data = data.join(weights, on=['task', 'worker'])
-        data['weighted_embedding'] = data.weight * data.embedding
-        group = data.groupby('task')
-        aggregated_embeddings = pd.Series((group.weighted_embedding.apply(np.sum) / group.weight.sum()),
-                                          dtype=np.float64)
-        if true_embeddings is None:
-            true_embeddings = pd.Series([], dtype=np.float64)
-        aggregated_embeddings.update(true_embeddings)
+        aggregated_embeddings = get_segment_sums(embeddings, task_codes, tasks, weights)
+        aggregated_embeddings /= np.bincount(task_codes, weights, minlength=tasks)[:, None]
         return aggregated_embeddings
 
-    def _distance_from_aggregated(self, answers: pd.DataFrame) -> pd.DataFrame:
-        """Calculates the square of Euclidian distance from aggregated embedding for each answer.
-        """
-        with_task_aggregate = answers.set_index('task')
-        with_task_aggregate['task_aggregate'] = self.aggregated_embeddings_
-        with_task_aggregate['distance'] = with_task_aggregate.apply(
-            lambda row: np.sum((row['embedding'] - row['task_aggregate']) ** 2), axis=1)
-        with_task_aggregate['distance'] = with_task_aggregate['distance'].replace({0.0: 1e-5})  # avoid division by zero
-        return with_task_aggregate.reset_index()
-
-    def _rank_outputs(self, data: pd.DataFrame, skills: pd.Series) -> pd.DataFrame:
+    @staticmethod
+    def _rank_outputs(data: pd.DataFrame, embeddings: npt.NDArray[Any], task_codes: npt.NDArray[Any],
+                      worker_codes: npt.NDArray[Any], aggregated_embeddings: npt.NDArray[Any],
+                      skills: npt.NDArray[Any]) -> pd.DataFrame:
         """Returns ranking score for each record in `data` data frame.
         """
 
         if not data.size:
             return pd.DataFrame(columns=['task', 'output', 'rank'])
 
-        data = self._distance_from_aggregated(data)
-        data['norms_prod'] = data.apply(lambda row: np.sum(row['embedding'] ** 2) * np.sum(row['task_aggregate'] ** 2),
-                                        axis=1)
-        data['rank'] = skills * np.exp(-data.distance / data.norms_prod) + data.local_skill
-        return data[['task', 'output', 'rank']]
+        task_aggregates = aggregated_embeddings[task_codes]
+        distances = ((embeddings - task_aggregates) ** 2).sum(axis=1)
+        distances[distances == 0.0] = 1e-5  # avoid division by zero
+        norms_prod = (embeddings ** 2).sum(axis=1) * (task_aggregates ** 2).sum(axis=1)
+        ranks = skills[worker_codes] * np.exp(-distances / norms_prod) + data.local_skill.values
+        return data[['task', 'output']].assign(rank=ranks)
 
     @staticmethod
-    def _calc_weights(data: pd.DataFrame, worker_skills: pd.Series) -> pd.DataFrame:
-        """Calculates the weight for every embedding according to its local and global skills.
-        """
-        data = data.set_index('worker')
-        data['worker_skill'] = worker_skills
-        data = data.reset_index()
-        data['weight'] = data['worker_skill'] * data['local_skill']
-        return data[['task', 'worker', 'weight']].set_index(['task', 'worker'])
-
-    @staticmethod
-    def _update_skills(data: pd.DataFrame, aggregated_embeddings: pd.Series, prior_skills: pd.Series) -> pd.Series:
+    def _update_skills(embeddings: npt.NDArray[Any], task_codes: npt.NDArray[Any], worker_codes: npt.NDArray[Any],
+                       local_skills: npt.NDArray[Any], aggregated_embeddings: npt.NDArray[Any],
+                       prior_skills: npt.NDArray[Any]) -> npt.NDArray[Any]:
         """Estimates global reliabilities by aggregated embeddings."""
-        data = data.join(aggregated_embeddings.rename('aggregated_embedding'), on='task')
-        data['distance'] = ((data.embedding - data.aggregated_embedding) ** 2).apply(np.sum)
-        data['distance'] = data['distance'] / data['local_skill']
-        total_distances = data.groupby('worker').distance.apply(np.sum)
-        total_distances.clip(lower=_EPS, inplace=True)
-        return prior_skills / total_distances
-
-    def _get_local_skills(self, data: pd.DataFrame) -> pd.DataFrame:
+        distances = ((embeddings - aggregated_embeddings[task_codes]) ** 2).sum(axis=1) / local_skills
+        total_distances = np.bincount(worker_codes, distances, minlength=len(prior_skills))
+        return cast(npt.NDArray[Any], prior_skills / total_distances.clip(min=_EPS))
+
+    def _get_local_skills(self, data: pd.DataFrame, embeddings: npt.NDArray[Any], task_codes: npt.NDArray[Any],
+                          worker_codes: npt.NDArray[Any]) -> npt.NDArray[Any]:
         """Computes local (relative) skills for each task's answer.
+
+        The tasks are grouped by their overlap, so the embedding similarities of all the pairs of answers
+        to the tasks of the same overlap are computed at once from a batch of Gram matrices. The output
+        similarity is called once for every ordered pair of answers by different workers.
         """
-        index = []
-        local_skills = []
-        processed_pairs = set()
-        for task, task_answers in data.groupby('task'):
-            for worker, skill in self._local_skills_on_task(task_answers):
-                if (task, worker) not in processed_pairs:
-                    local_skills.append(skill)
-                    index.append((task, worker))
-                    processed_pairs.add((task, worker))
-        data = data.set_index(['task', 'worker'])
-        local_skills = pd.Series(local_skills, index=pd.MultiIndex.from_tuples(index, names=['task', 'worker']),
-                                 dtype=float)
-        data['local_skill'] = local_skills
-        return data.reset_index()
-
-    def _local_skills_on_task(self, task_answers: pd.DataFrame) -> Generator[Tuple[Any, float], None, None]:
-        overlap = len(task_answers)
-
-        for _, cur_row in task_answers.iterrows():
-            worker = cur_row['worker']
-            emb_sum = 0.0
-            seq_sum = 0.0
-            emb = cur_row['embedding']
-            seq = cur_row['output']
-            emb_norm = np.sum(emb ** 2)
-            for __, other_row in task_answers.iterrows():
-                if other_row['worker'] == worker:
-                    continue
-                other_emb = other_row['embedding']
-                other_seq = other_row['output']
-
-                # embeddings similarity
-                diff_norm = np.sum((emb - other_emb) ** 2)
-                other_norm = np.sum(other_emb ** 2)
-                emb_sum += np.exp(-diff_norm / (emb_norm * other_norm))
-
-                # sequence similarity
-                seq_sum += self._output_similarity(seq, other_seq)
-            emb_sum /= (overlap - 1)
-            seq_sum /= (overlap - 1)
-
-            yield worker, self.lambda_emb * emb_sum + self.lambda_out * seq_sum
+        local_skills = np.zeros(len(data))
+        if not len(data):
+            return local_skills
+
+        outputs = data.output.values
+        order = np.argsort(task_codes, kind='stable')
+        overlaps = np.bincount(task_codes)
+        starts = np.concatenate([[0], np.cumsum(overlaps)[:-1]])
+
+        for overlap in np.unique(overlaps):
+            # rows of the answers to the tasks of this overlap, a task per row
+            rows = order[starts[overlaps == overlap, None] + np.arange(overlap)]
+            task_embeddings = embeddings[rows]
+
+            norms = (task_embeddings ** 2).sum(axis=2)
+            gram = task_embeddings @ task_embeddings.transpose(0, 2, 1)
+            diff_norms = np.maximum(norms[:, :, None] + norms[:, None, :] - 2 * gram, 0)
+            other_workers = worker_codes[rows][:, :, None] != worker_codes[rows][:, None, :]
+
+            emb_similarities = np.exp(-diff_norms / (norms[:, :, None] * norms[:, None, :]))
+            seq_similarities = np.zeros_like(emb_similarities)
+            seq_similarities[other_workers] = [
+                self._output_similarity(outputs[i], outputs[j])
+                for i, j in zip(np.broadcast_to(rows[:, :, None], other_workers.shape)[other_workers],
+                                np.broadcast_to(rows[:, None, :], other_workers.shape)[other_workers])
+            ]
+
+            emb_sums = (emb_similarities * other_workers).sum(axis=2) / (overlap - 1)
+            seq_sums = seq_similarities.sum(axis=2) / (overlap - 1)
+            local_skills[rows] = self.lambda_emb * emb_sums + self.lambda_out * seq_sums
+
+        # a worker answering a task several times gets the local skill of the first answer
+        return cast(npt.NDArray[Any],
+                    pd.Series(local_skills).groupby([task_codes, worker_codes], sort=False).transform('first').values)
 
     def _filter_single_overlap(self, data: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """Filter skills, embeddings, weights and ranks for single overlap tasks that couldn't be processed by HRASSA
         """
 
-        single_overlap_task_ids = []
-        for task, task_answers in data.groupby('task'):
-            if len(task_answers) == 1:
-                single_overlap_task_ids.append(task)
-        data = data.set_index('task')
-        return data.drop(single_overlap_task_ids).reset_index(), data.loc[single_overlap_task_ids].reset_index()
+        single_overlap = data.groupby('task').task.transform('size').values == 1
+        single_overlap_tasks = data[single_overlap].sort_values('task', kind='stable')
+        return data[~single_overlap].reset_index(drop=True), single_overlap_tasks.reset_index(drop=True)
 
     def _fill_single_overlap_tasks_info(self, single_overlap_tasks: pd.DataFrame) -> None:
         """Fill skills, embeddings, weights and ranks for single overlap tasks
@@ -2,7 +2,7 @@ __all__ = [
     'RASA',
 ]
 
-from typing import Any, List
+from typing import Any, List, cast
 from functools import partial
 
 import attr
@@ -10,10 +10,10 @@ import numpy as np
 import numpy.typing as npt
 import pandas as pd
 import scipy.stats as sps
-from scipy.spatial import distance
 
 from .closest_to_average import ClosestToAverage
 from ..base import BaseEmbeddingsAggregator
+from ..utils import factorize, get_embeddings_matrix, get_known_embeddings, get_segment_sums
 
 _EPS = 1e-5
 
@@ -70,34 +70,23 @@ class RASA(BaseEmbeddingsAggregator):
     loss_history_: List[float] = attr.ib(init=False)
 
     @staticmethod
-    def _aggregate_embeddings(data: pd.DataFrame, skills: pd.Series,
-                              true_embeddings: pd.Series = None) -> pd.Series:
+    def _aggregate_embeddings(embeddings: npt.NDArray[Any], task_codes: npt.NDArray[Any], weights: npt.NDArray[Any],
+                              tasks: int) -> npt.NDArray[Any]:
         """Calculates weighted average of embeddings for each task."""
-        data = data.join(skills.rename('skill'), on='worker')
-        data['weighted_embedding'] = data.skill * data.embedding
-        group = data.groupby('task')
-        aggregated_embeddings = (group.weighted_embedding.apply(np.sum) / group.skill.sum())
-        aggregated_embeddings.update(true_embeddings)
+        aggregated_embeddings = get_segment_sums(embeddings, task_codes, tasks, weights)
+        aggregated_embeddings /= np.bincount(task_codes, weights, minlength=tasks)[:, None]
         return aggregated_embeddings
 
     @staticmethod
-    def _update_skills(data: pd.DataFrame, aggregated_embeddings: pd.Series,
-                       prior_skills: pd.Series) -> pd.Series:
+    def _update_skills(embeddings: npt.NDArray[Any], task_codes: npt.NDArray[Any], worker_codes: npt.NDArray[Any],
+                       aggregated_embeddings: npt.NDArray[Any], prior_skills: npt.NDArray[Any]) -> npt.NDArray[Any]:
         """Estimates global reliabilities by aggregated embeddings."""
-        data = data.join(aggregated_embeddings.rename('aggregated_embedding'), on='task')
-        data['distance'] = ((data.embedding - data.aggregated_embedding) ** 2).apply(np.sum)
-        total_distances = data.groupby('worker').distance.apply(np.sum)
-        total_distances.clip(lower=_EPS, inplace=True)
-        return prior_skills / total_distances
-
-    @staticmethod
-    def _cosine_distance(embedding: npt.NDArray[Any], avg_embedding: npt.NDArray[Any]) -> float:
-        if not embedding.any() or not avg_embedding.any():
-            return float('inf')
-        return float(distance.cosine(embedding, avg_embedding))
+        distances = ((embeddings - aggregated_embeddings[task_codes]) ** 2).sum(axis=1)
+        total_distances = np.bincount(worker_codes, distances, minlength=len(prior_skills))
+        return cast(npt.NDArray[Any], prior_skills / total_distances.clip(min=_EPS))
 
     def _apply(self, data: pd.DataFrame, true_embeddings: pd.Series = None) -> 'RASA':
-        cta = ClosestToAverage(distance=self._cosine_distance)
+        cta = ClosestToAverage(distance='cosine')
         cta.fit(data, aggregated_embeddings=self.aggregated_embeddings_, true_embeddings=true_embeddings)
         self.scores_ = cta.scores_
         self.embeddings_and_outputs_ = cta.embeddings_and_outputs_
@@ -123,26 +112,38 @@ class RASA(BaseEmbeddingsAggregator):
                 'Incorrect data in true_embeddings: multiple true embeddings for a single task are not supported.'
             )
 
+        tasks, task_codes = factorize(data.task.values)
+        workers, worker_codes = factorize(data.worker.values)
+        embeddings = get_embeddings_matrix(data.embedding)
+        true_tasks, true_embeddings_matrix = get_known_embeddings(true_embeddings, pd.Index(tasks))
+
         # What we call skills here is called reliabilities in the paper
         prior_skills = data.worker.value_counts().apply(partial(sps.chi2.isf, self.alpha / 2))
-        skills = pd.Series(1.0, index=data.worker.unique())
+        prior_skills_values = prior_skills[workers].values
+        skills = np.ones(len(workers))
         aggregated_embeddings = None
         last_aggregated = None
+        self.loss_history_ = []
 
         for _ in range(self.n_iter):
-            aggregated_embeddings = self._aggregate_embeddings(data, skills, true_embeddings)
-            skills = self._update_skills(data, aggregated_embeddings, prior_skills)
+            aggregated_embeddings = self._aggregate_embeddings(embeddings, task_codes, skills[worker_codes], len(tasks))
+            if true_tasks.size:
+                aggregated_embeddings[true_tasks] = true_embeddings_matrix
+            skills = self._update_skills(embeddings, task_codes, worker_codes, aggregated_embeddings,
+                                         prior_skills_values)
 
             if last_aggregated is not None:
                 delta = aggregated_embeddings - last_aggregated
-                loss = (delta * delta).sum().sum() / (aggregated_embeddings * aggregated_embeddings).sum().sum()
+                loss = (delta * delta).sum() / (aggregated_embeddings * aggregated_embeddings).sum()
+                self.loss_history_.append(loss)
                 if loss < self.tol:
                     break
             last_aggregated = aggregated_embeddings
 
         self.prior_skills_ = prior_skills
-        self.skills_ = skills
-        self.aggregated_embeddings_ = aggregated_embeddings
+        self.skills_ = pd.Series(skills, index=workers)
+        self.aggregated_embeddings_ = None if aggregated_embeddings is None else \
+            pd.Series(list(aggregated_embeddings), index=pd.Index(tasks, name='task'))
         return self
 
     def fit_predict_scores(self, data: pd.DataFrame,
@@ -1,9 +1,20 @@
-from .segmentation_em import SegmentationEM
-from .segmentation_majority_vote import SegmentationMajorityVote
-from .segmentation_rasa import SegmentationRASA
+from typing import TYPE_CHECKING
+
+from ..._lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .segmentation_em import SegmentationEM
+    from .segmentation_majority_vote import SegmentationMajorityVote
+    from .segmentation_rasa import SegmentationRASA
 
 __all__ = [
     'SegmentationEM',
     'SegmentationRASA',
     'SegmentationMajorityVote'
 ]
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'SegmentationEM': '.segmentation_em',
+    'SegmentationRASA': '.segmentation_rasa',
+    'SegmentationMajorityVote': '.segmentation_majority_vote',
+})
@@ -1,6 +1,6 @@
 __all__ = ['SegmentationEM']
 
-from typing import List, Union, Any, cast
+from typing import Any, Generator, List, Optional, Sequence, Tuple, Union, cast
 
 import attr
 import numpy as np
@@ -26,8 +26,15 @@ class SegmentationEM(BaseImageSegmentationAggregator):
     Quality Evaluation Methods for Crowdsourced Image Segmentation
     <https://ilpubs.stanford.edu:8090/1161/1/main.pdf>
 
+    If `tile_size` is set, the posteriors are computed tile by tile: only `tile_size` rows of every
+    worker's segmentation are loaded into memory at once, and the workers' error statistics are
+    accumulated across tiles. This allows aggregating very large masks, e.g. ones backed by
+    `np.memmap` or zarr arrays, since the peak memory is bounded by the tile size instead of
+    the number of workers times the image size.
+
     Args:
         n_iter: A number of EM iterations.
+        tile_size: A number of image rows processed at once, at least 1. If `None`, the whole image is processed at once.
 
     Examples:
         >>> import numpy as np
@@ -51,10 +58,16 @@ class SegmentationEM(BaseImageSegmentationAggregator):
 
     n_iter: int = attr.ib(default=10)
     tol: float = attr.ib(default=1e-5)
+    tile_size: Optional[int] = attr.ib(default=None)
     eps: float = 1e-15
     # segmentations_
     loss_history_: List[float] = attr.ib(init=False)
 
+    @tile_size.validator
+    def _check_tile_size(self, attribute: 'attr.Attribute[Optional[int]]', value: Optional[int]) -> None:
+        if value is not None and value < 1:
+            raise ValueError(f'tile_size must be at least 1, got {value}.')
+
     @staticmethod
     def _e_step(
             segmentations: pd.Series,
@@ -113,10 +126,76 @@ class SegmentationEM(BaseImageSegmentationAggregator):
 
             return log_likelihood_expectation - float(np.nan_to_num(np.log(posteriors) * posteriors, nan=0).sum())  # type: ignore
 
+    @staticmethod
+    def _iter_tiles(segmentations: Sequence[Any], tile_size: int) -> Generator[Tuple[slice, npt.NDArray[Any]], None, None]:
+        """
+        Yields row slices of the image along with the stacked workers' segmentations for these rows.
+        Segmentations may be any arrays supporting slicing, e.g. `np.memmap` or zarr arrays.
+        """
+        height = segmentations[0].shape[0]
+        for start in range(0, height, tile_size):
+            rows = slice(start, min(start + tile_size, height))
+            yield rows, np.stack([np.asarray(segmentation[rows]) for segmentation in segmentations])
+
+    def _aggregate_one_tiled(self, segmentations: Sequence[Any]) -> npt.NDArray[np.bool_]:
+        """
+        Performs an expectation maximization algorithm for a single image processing it tile by tile.
+        """
+        tile_size = cast(int, self.tile_size)
+        n_workers = len(segmentations)
+        shape = segmentations[0].shape
+
+        priors = np.empty(shape, dtype=float)
+        segmentation_region_size = 0
+        segmentations_sizes = np.zeros(n_workers)
+        # sufficient statistics for the M-step initialized with the majority vote
+        posteriors_sum = 0.0
+        intersections = np.zeros(n_workers)
+        for rows, tile in self._iter_tiles(segmentations, tile_size):
+            priors[rows] = tile.mean(axis=0)
+            segmentation_region_size += tile.any(axis=0).sum()
+            segmentations_sizes += tile.sum(axis=(1, 2))
+            majority_vote = np.round(priors[rows])
+            posteriors_sum += majority_vote.sum()
+            intersections += (tile * majority_vote).sum(axis=(1, 2))
+
+        if segmentation_region_size == 0:
+            return np.zeros(shape, dtype=bool)
+
+        errors = 1 - (segmentations_sizes + posteriors_sum - 2 * intersections) / segmentation_region_size
+        posteriors = np.empty(shape, dtype=float)
+        loss = -np.inf
+        self.loss_history_ = []
+        for _ in range(self.n_iter):
+            posteriors_sum = 0.0
+            intersections[:] = 0
+            for rows, tile in self._iter_tiles(segmentations, tile_size):
+                tile_posteriors = self._e_step(tile, errors, priors[rows])
+                tile_posteriors[tile_posteriors < self.eps] = 0
+                posteriors[rows] = tile_posteriors
+                posteriors_sum += tile_posteriors.sum()
+                intersections += (tile * tile_posteriors).sum(axis=(1, 2))
+            errors = 1 - (segmentations_sizes + posteriors_sum - 2 * intersections) / segmentation_region_size
+
+            evidence_lower_bound = 0.0
+            for rows, tile in self._iter_tiles(segmentations, tile_size):
+                evidence_lower_bound += self._evidence_lower_bound(tile, priors[rows], posteriors[rows], errors)
+            new_loss = evidence_lower_bound / (n_workers * priors.size)
+            priors, posteriors = posteriors, priors
+            self.loss_history_.append(new_loss)
+            if new_loss - loss < self.tol:
+                break
+            loss = new_loss
+
+        return priors > 0.5
+
     def _aggregate_one(self, segmentations: pd.Series) -> npt.NDArray[np.bool_]:
         """
         Performs an expectation maximization algorithm for a single image.
         """
+        if self.tile_size is not None:
+            return self._aggregate_one_tiled(segmentations.values)
+
         priors = sum(segmentations) / len(segmentations)
         segmentations = np.stack(segmentations.values)
         segmentation_region_size = segmentations.any(axis=0).sum()
@@ -1,13 +1,14 @@
 __all__ = ['SegmentationMajorityVote']
 
-from typing import Optional, cast
+from typing import Any, Dict, Hashable, Optional, cast
 
 import attr
 import numpy as np
+import numpy.typing as npt
 import pandas as pd
 
 from ..base import BaseImageSegmentationAggregator
-from ..utils import add_skills_to_data
+from ..utils import add_skills_to_data, named_series_attrib
 
 
 @attr.s
@@ -21,6 +22,10 @@ class SegmentationMajorityVote(BaseImageSegmentationAggregator):
 
     The method also supports weighted majority voting if `skills` were provided to `fit` method.
 
+    Tasks are grouped by the segmentation shape and the number of workers, so the weighted vote
+    for every such group is computed by a single `np.einsum` call over the stacked segmentations.
+    Besides the boolean segmentations, per-pixel vote fractions are available in the `probas_` attribute.
+
     Doris Jung-Lin Lee. 2018.
     Quality Evaluation Methods for Crowdsourced Image Segmentation
     <https://ilpubs.stanford.edu:8090/1161/1/main.pdf>
@@ -47,6 +52,11 @@ class SegmentationMajorityVote(BaseImageSegmentationAggregator):
             A pandas.Series indexed by `task` such that `labels.loc[task]`
             is the tasks's aggregated segmentation.
 
+        probas_ (Series): Tasks' per-pixel vote fractions.
+            A pandas.Series indexed by `task` such that `probas.loc[task]`
+            is a float array of the segmentation's shape holding the weighted fraction
+            of workers who included the pixel into their segmentations.
+
         on_missing_skill (str): How to handle assignments done by workers with unknown skill.
             Possible values:
                     * "error" — raise an exception if there is at least one assignment done by user with unknown skill;
@@ -56,6 +66,7 @@ class SegmentationMajorityVote(BaseImageSegmentationAggregator):
     """
 
     # segmentations_
+    probas_: pd.Series = named_series_attrib(name='agg_proba')
 
     on_missing_skill: str = attr.ib(default='error')
     default_skill: Optional[float] = attr.ib(default=None)
@@ -72,10 +83,27 @@ class SegmentationMajorityVote(BaseImageSegmentationAggregator):
         else:
             data = add_skills_to_data(data, skills, self.on_missing_skill, cast(float, self.default_skill))
 
-        data['pixel_scores'] = data.segmentation * data.skill
-        group = data.groupby('task')
+        data = data.sort_values('task', kind='stable')
+        data['overlap'] = data.groupby('task').task.transform('size')
+        data['shape'] = [np.shape(segmentation) for segmentation in data.segmentation]
+
+        segmentations: Dict[Hashable, npt.NDArray[np.bool_]] = {}
+        probas: Dict[Hashable, npt.NDArray[Any]] = {}
+        for (shape, overlap), bucket in data.groupby(['shape', 'overlap'], sort=False):
+            tasks = bucket.task.values[::overlap]
+            pixel_votes = np.stack(bucket.segmentation.values).reshape(len(tasks), overlap, -1)
+            skill = bucket.skill.values.astype(float).reshape(len(tasks), overlap)
+
+            pixel_scores = np.einsum('tw,twp->tp', skill, pixel_votes)
+            skill_sums = skill.sum(axis=1, keepdims=True)
+
+            for task, scores, skill_sum in zip(tasks, pixel_scores, skill_sums):
+                segmentations[task] = (2 * scores - skill_sum >= 0).reshape(shape)
+                probas[task] = (scores / skill_sum).reshape(shape)
 
-        self.segmentations_ = (2 * group.pixel_scores.apply(np.sum) - group.skill.apply(np.sum)).apply(lambda x: x >= 0)
+        index = pd.Index(data.task.unique(), name='task')
+        self.segmentations_ = pd.Series([segmentations[task] for task in index], index=index, dtype=object)
+        self.probas_ = pd.Series([probas[task] for task in index], index=index, dtype=object)
         return self
 
     def fit_predict(self, data: pd.DataFrame, skills: Optional[pd.Series] = None) -> pd.Series:
@@ -84,3 +112,10 @@ class SegmentationMajorityVote(BaseImageSegmentationAggregator):
         """
 
         return self.fit(data, skills).segmentations_
+
+    def fit_predict_proba(self, data: pd.DataFrame, skills: Optional[pd.Series] = None) -> pd.Series:
+        """
+        Fit the model and return the per-pixel vote fractions.
+        """
+
+        return self.fit(data, skills).probas_
@@ -26,8 +26,14 @@ class SegmentationRASA(BaseImageSegmentationAggregator):
     pages 24–28 Hong Kong, China, November 3, 2019.
     <https://doi.org/10.18653/v1/D19-5904>
 
+    If `incremental` is true, the weighted vote and per-worker intersection and union sizes are kept
+    between iterations and only updated with the workers whose weights changed and the pixels which
+    flipped in the current estimation. An image stops iterating as soon as the maximum absolute change
+    of the workers' weights falls below `tol`, and `loss_history_` holds these changes.
+
     Args:
         n_iter: A number of iterations.
+        incremental: If true, update the vote and the distances incrementally.
 
     Examples:
         >>> import numpy as np
@@ -51,6 +57,7 @@ class SegmentationRASA(BaseImageSegmentationAggregator):
 
     n_iter: int = attr.ib(default=10)
     tol: float = attr.ib(default=1e-5)
+    incremental: bool = attr.ib(default=False)
     # segmentations_
     loss_history_: List[float] = attr.ib(init=False)
 
@@ -72,16 +79,68 @@ class SegmentationRASA(BaseImageSegmentationAggregator):
         """
         intersection = (segmentations & mv).astype(float)
         union = (segmentations | mv).astype(float)
-        distances = 1 - intersection.sum(axis=(1, 2)) / union.sum(axis=(1, 2))
+        return SegmentationRASA._weights_from_counts(intersection.sum(axis=(1, 2)), union.sum(axis=(1, 2)))
+
+    @staticmethod
+    def _weights_from_counts(intersection: npt.NDArray[Any], union: npt.NDArray[Any]) -> npt.NDArray[Any]:
+        """
+        Calculates weights of each workers from sizes of intersections and unions of their segmentations
+        with the current majority vote estimation.
+        """
+        distances = 1 - intersection / union
         # add a small bias for more
         # numerical stability and correctness of transform.
         weights = np.log(1 / (distances + _EPS) + 1)
         return cast(npt.NDArray[Any], weights / np.sum(weights))
 
+    def _aggregate_one_incremental(self, segmentations: npt.NDArray[Any]) -> npt.NDArray[Any]:
+        """
+        Performs Segmentation RASA algorithm for a single image updating the weighted vote
+        and the intersection and union sizes only where they changed.
+        """
+        size = len(segmentations)
+        weights = np.full(size, 1 / size)
+        weighted = self._segmentation_weighted(segmentations, weights)
+        mv = weighted >= 0.5
+        intersection = (segmentations & mv).sum(axis=(1, 2)).astype(float)
+        union = (segmentations | mv).sum(axis=(1, 2)).astype(float)
+
+        self.loss_history_ = []
+
+        # the first of the `n_iter` votes is the unweighted one, the same as in the classic loop
+        for _ in range(self.n_iter - 1):
+            new_weights = self._weights_from_counts(intersection, union)
+            weights_delta = new_weights - weights
+
+            loss = float(np.abs(weights_delta).max())
+            self.loss_history_.append(loss)
+            if loss < self.tol:
+                break
+
+            weights = new_weights
+            changed_workers = weights_delta != 0
+            weighted += np.tensordot(weights_delta[changed_workers], segmentations[changed_workers], axes=1)
+            new_mv = weighted >= 0.5
+
+            flipped = new_mv != mv
+            if flipped.any():
+                # +1 for pixels added to the estimation, -1 for removed ones
+                sign = np.where(new_mv[flipped], 1., -1.)
+                flipped_segmentations = segmentations[:, flipped]
+                intersection += flipped_segmentations @ sign
+                union += ~flipped_segmentations @ sign
+                mv = new_mv
+
+        # the updates of the vote accumulate rounding errors, so it is thresholded after a full recomputation
+        return cast(npt.NDArray[Any], self._segmentation_weighted(segmentations, weights) >= 0.5)
+
     def _aggregate_one(self, segmentations: pd.Series) -> npt.NDArray[Any]:
         """
         Performs Segmentation RASA algorithm for a single image.
         """
+        if self.incremental:
+            return self._aggregate_one_incremental(np.stack(segmentations.values).astype(bool))
+
         size = len(segmentations)
         segmentations = np.stack(segmentations.values)
         weights = np.full(size, 1 / size)
@@ -1,7 +1,17 @@
-from .bradley_terry import BradleyTerry
-from .noisy_bt import NoisyBradleyTerry
+from typing import TYPE_CHECKING
+
+from ..._lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .bradley_terry import BradleyTerry
+    from .noisy_bt import NoisyBradleyTerry
 
 __all__ = [
     'BradleyTerry',
     'NoisyBradleyTerry'
 ]
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'BradleyTerry': '.bradley_terry',
+    'NoisyBradleyTerry': '.noisy_bt',
+})
@@ -1,15 +1,20 @@
 __all__ = ['BradleyTerry']
 
-from typing import Tuple, List
+from typing import Any, List, Optional, Tuple, cast
 
 import attr
 import numpy as np
 import numpy.typing as npt
 import pandas as pd
+from scipy.sparse import coo_matrix, csr_matrix
+from scipy.sparse.csgraph import connected_components
 
 from ..base import BasePairwiseAggregator
+from ..utils import add_sorted_counts, find_sorted_counts, get_merged_components, named_series_attrib
 
 _EPS = np.float_power(10, -10)
+# a compared pair of items (i, j) is stored under the key `i << _ITEM_BITS | j`
+_ITEM_BITS = 32
 
 
 @attr.s
@@ -36,6 +41,13 @@ class BradleyTerry(BasePairwiseAggregator):
 
     {% endnote %}
 
+    Only the observed pairs of items are stored as a sparse matrix, and each MM update is computed
+    with sparse reductions, so the memory consumption scales with the number of distinct compared pairs.
+
+    If `decompose` is true, the connected components of the comparisons graph are fitted independently:
+    the scores are normalized within each component, and a component stops iterating as soon as it
+    converges. Scores are not comparable across components, so their ids are stored in `components_`.
+
     David R. Hunter.
     MM algorithms for generalized Bradley-Terry models
     *Ann. Statist.*, Vol. 32, 1 (2004): 384–406.
@@ -46,6 +58,7 @@ class BradleyTerry(BasePairwiseAggregator):
 
     Args:
         n_iter: A number of optimization iterations.
+        decompose: If true, fit the connected components of the comparisons graph independently.
 
     Examples:
         The Bradley-Terry model needs the data to be a `DataFrame` containing columns
@@ -66,12 +79,23 @@ class BradleyTerry(BasePairwiseAggregator):
     Attributes:
         scores_ (Series): 'Labels' scores.
             A pandas.Series index by labels and holding corresponding label's scores
+        components_ (Series): Labels' connected components.
+            A pandas.Series index by labels and holding corresponding label's component id.
+            All labels belong to the component 0 if `decompose` is false.
     """
 
     n_iter: int = attr.ib()
     tol: float = attr.ib(default=1e-5)
+    decompose: bool = attr.ib(default=False)
     # scores_
+    components_: pd.Series = named_series_attrib(name='component')
     loss_history_: List[float] = attr.ib(init=False)
+    # numbers of comparisons for every compared pair of items as runs of `add_sorted_counts`,
+    # both (i, j) and (j, i) are stored
+    _comparisons: Optional[List[Tuple[npt.NDArray[Any], npt.NDArray[Any]]]] = attr.ib(init=False, default=None,
+                                                                                      repr=False)
+    # numbers of comparisons won by every item, followed by the zeros reserved for the items to come
+    _wins: Optional[npt.NDArray[Any]] = attr.ib(init=False, default=None, repr=False)
 
     def fit(self, data: pd.DataFrame) -> 'BradleyTerry':
         """Args:
@@ -84,44 +108,84 @@ class BradleyTerry(BasePairwiseAggregator):
         """
 
         M, unique_labels = self._build_win_matrix(data)
+        T = (M.T + M).tocoo()
+        keys = self._pack(T.row, T.col)
+        order = np.argsort(keys)
+        self._comparisons = add_sorted_counts([], keys[order], T.data[order].astype(float))
+        self._wins = np.asarray(M.sum(axis=1)).ravel()
 
         if not unique_labels.size:
             self.scores_ = pd.Series([], dtype=np.float64)
+            self.components_ = pd.Series([], dtype=int)
             return self
 
-        T: npt.NDArray[np.int_] = M.T + M
-        active: npt.NDArray[np.bool_] = T > 0
-
-        w = M.sum(axis=1)
-
-        Z = np.zeros_like(M, dtype=float)
-
+        T = T.tocsr()
+        components = self._get_components(T)
         p = np.ones(M.shape[0])
-        p_new = p.copy() / p.sum()
-
-        p_old = None
+        self.scores_ = pd.Series(self._optimize(T, self._wins, p, components), index=unique_labels)
+        self.components_ = pd.Series(components, index=unique_labels)
 
-        self.loss_history_ = []
+        return self
 
-        for _ in range(self.n_iter):
-            P: npt.NDArray[np.float_] = np.broadcast_to(p, M.shape)  # type: ignore
+    def partial_fit(self, data: pd.DataFrame) -> 'BradleyTerry':
+        """Updates the scores with new comparisons.
 
-            Z[active] = T[active] / (P[active] + P.T[active])
+        The win counts of the new comparisons are added to the ones accumulated by the previous calls
+        of `fit` and `partial_fit`. The MM iterations are warm-started from the current scores and only
+        update the items present in the new comparisons, the scores of the other items are fixed. So an
+        iteration only visits the comparisons of these items, and only their components are normalized.
+        The counts of the compared pairs are kept in sorted runs which are merged geometrically, so the
+        counts accumulated before are not rewritten on every call, and the comparisons of an item are found
+        by binary searches in these runs.
+        The components linked by the new comparisons are merged. Previously unseen items are appended
+        to the end of `scores_`. If the model was not fitted yet, this is equivalent to `fit`.
 
-            p_new[:] = w
-            p_new /= Z.sum(axis=0)
-            p_new /= p_new.sum()
-            p[:] = p_new
+        Args:
+            data (DataFrame): Workers' pairwise comparison results.
+                A pandas.DataFrame containing `worker`, `left`, `right`, and `label` columns'.
+                For each row `label` must be equal to either `left` column or `right` column.
 
-            if p_old is not None:
-                loss = np.abs(p_new - p_old).sum()
+        Returns:
+            BradleyTerry: self.
+        """
 
-                if loss < self.tol:
-                    break
+        if self._comparisons is None or self._wins is None or not self.scores_.size:
+            return self.fit(data)
 
-            p_old = p_new
+        data = data[['left', 'right', 'label']]
+        if data.empty:
+            return self
 
-        self.scores_ = pd.Series(p_new, index=unique_labels)
+        labels = self.scores_.index
+        new_labels = pd.Index(pd.unique(data.values.ravel())).difference(labels, sort=False)
+        labels = labels.append(new_labels)
+        np_data = labels.get_indexer(data.values.ravel()).reshape(data.shape)
+
+        winners, losers = self._get_winners_and_losers(np_data)
+        keys, counts = np.unique(np.concatenate([self._pack(winners, losers), self._pack(losers, winners)]),
+                                 return_counts=True)
+        self._comparisons = add_sorted_counts(self._comparisons, keys, counts.astype(float))
+        if labels.size > self._wins.size:
+            # the reserved space is doubled, so the wins are copied a logarithmic number of times
+            reserved = max(labels.size, 2 * self._wins.size) - self._wins.size
+            self._wins = np.concatenate([self._wins, np.zeros(reserved)])
+        np.add.at(self._wins, winners, 1)
+
+        components = self.components_.to_numpy()
+        if self.decompose:
+            # new items start in their own components
+            n_components = components.max() + 1
+            components = np.append(components, np.arange(n_components, n_components + new_labels.size))
+            components = get_merged_components(components, np_data[:, 0], np_data[:, 1])
+        else:
+            components = np.zeros(labels.size, dtype=int)
+
+        # new items start from the average score
+        p = self.scores_.values
+        p = np.append(p, np.full(new_labels.size, p.mean()))
+        p = self._update(self._wins, p, components, np.unique(np_data[:, :2]))
+        self.scores_ = pd.Series(p, index=labels)
+        self.components_ = pd.Series(components, index=labels)
 
         return self
 
@@ -137,19 +201,122 @@ class BradleyTerry(BasePairwiseAggregator):
         """
         return self.fit(data).scores_
 
-    @staticmethod
-    def _build_win_matrix(data: pd.DataFrame) -> Tuple[npt.NDArray[np.int_], npt.NDArray[np.int_]]:
-        data = data[['left', 'right', 'label']]
+    def _get_components(self, T: csr_matrix) -> npt.NDArray[Any]:
+        if not self.decompose:
+            return np.zeros(T.shape[0], dtype=int)
+        _, components = connected_components(T, directed=False)
+        return cast(npt.NDArray[Any], components)
 
-        unique_labels, np_data = np.unique(data.values, return_inverse=True)  # type: ignore
-        np_data = np_data.reshape(data.shape)
+    def _optimize(self, T: csr_matrix, wins: npt.NDArray[Any], p: npt.NDArray[Any],
+                  components: npt.NDArray[Any]) -> npt.NDArray[Any]:
+        """Runs the MM iterations starting from the scores `p`.
+
+        The scores are normalized within each of the `components`, and the items of a component
+        are not updated after it converges.
+        """
+
+        items = np.arange(T.shape[0])
+        n_components = components.max() + 1
+
+        def normalize(p: npt.NDArray[Any]) -> npt.NDArray[Any]:
+            return cast(npt.NDArray[Any], p / np.bincount(components, weights=p, minlength=n_components)[components])
+
+        T_items, w = T.tocoo(), wins
+        p = normalize(p)
+        p_old = None
 
+        self.loss_history_ = []
+
+        for _ in range(self.n_iter):
+            Z = T_items.data / (p[items[T_items.row]] + p[T_items.col])
+
+            p[items] = w / np.bincount(T_items.row, weights=Z, minlength=items.size)
+            p = normalize(p)
+
+            if p_old is not None:
+                losses = np.bincount(components, weights=np.abs(p - p_old), minlength=n_components)
+                self.loss_history_.append(losses.sum())
+
+                active = losses[components[items]] >= self.tol
+                if not active.any():
+                    break
+                if not active.all():
+                    items = items[active]
+                    T_items, w = T[items].tocoo(), wins[items]
+
+            p_old = p.copy()
+
+        return p
+
+    def _update(self, wins: npt.NDArray[Any], p: npt.NDArray[Any], components: npt.NDArray[Any],
+                items: npt.NDArray[Any]) -> npt.NDArray[Any]:
+        """Runs the MM iterations for the `items` only, starting from the scores `p`.
+
+        The scores of the other items are fixed, so they anchor the scale of the updated ones, and the
+        scores are only normalized after the iterations, within the components of the `items`. The items
+        of a component are not updated after it converges.
+        """
+
+        touched, item_components = np.unique(components[items], return_inverse=True)
+        rows, cols, counts = self._get_comparisons(items)
+        w = wins[items]
+
+        self.loss_history_ = []
+
+        for _ in range(self.n_iter):
+            Z = counts / (p[items[rows]] + p[cols])
+            updated = w / np.bincount(rows, weights=Z, minlength=items.size)
+
+            losses = np.bincount(item_components, weights=np.abs(updated - p[items]), minlength=touched.size)
+            self.loss_history_.append(losses.sum())
+            p[items] = updated
+
+            active = losses[item_components] >= self.tol
+            if not active.any():
+                break
+            if not active.all():
+                items, item_components = items[active], item_components[active]
+                rows, cols, counts = self._get_comparisons(items)
+                w = wins[items]
+
+        scale = np.ones(components.max() + 1)
+        scale[touched] = 1 / np.bincount(components, weights=p, minlength=scale.size)[touched]
+        return cast(npt.NDArray[Any], p * scale[components])
+
+    def _get_comparisons(self, items: npt.NDArray[Any]) -> Tuple[npt.NDArray[Any], npt.NDArray[Any],
+                                                                 npt.NDArray[Any]]:
+        """Returns the positions of the compared items in `items`, the items they are compared to and the numbers
+        of their comparisons. A pair may be returned several times with the parts of its number."""
+        assert self._comparisons is not None
+        items = items.astype(np.int64)
+        keys, counts, rows = find_sorted_counts(self._comparisons, items << _ITEM_BITS, (items + 1) << _ITEM_BITS)
+        return rows, keys & ((1 << _ITEM_BITS) - 1), counts
+
+    @staticmethod
+    def _pack(first: npt.NDArray[Any], second: npt.NDArray[Any]) -> npt.NDArray[Any]:
+        return cast(npt.NDArray[Any], first.astype(np.int64) << _ITEM_BITS | second.astype(np.int64))
+
+    @staticmethod
+    def _get_winners_and_losers(np_data: npt.NDArray[Any]) -> Tuple[npt.NDArray[Any], npt.NDArray[Any]]:
         left_wins = np_data[np_data[:, 0] == np_data[:, 2], :2].T
         right_wins = np_data[np_data[:, 1] == np_data[:, 2], 1::-1].T
+        winners, losers = np.hstack([left_wins, right_wins])
+        return winners, losers
 
-        win_matrix = np.zeros((unique_labels.size, unique_labels.size), dtype='int')
+    @staticmethod
+    def _win_matrix_from_codes(np_data: npt.NDArray[Any], size: int) -> csr_matrix:
+        winners, losers = BradleyTerry._get_winners_and_losers(np_data)
+
+        # duplicate entries are summed up on conversion to CSR
+        return coo_matrix((np.ones(winners.size, dtype='int'), (winners, losers)), shape=(size, size)).tocsr()
 
-        np.add.at(win_matrix, tuple(left_wins), 1)
-        np.add.at(win_matrix, tuple(right_wins), 1)
+    @staticmethod
+    def _build_win_matrix(data: pd.DataFrame) -> Tuple[csr_matrix, npt.NDArray[Any]]:
+        """Builds a sparse matrix such that `M[i, j]` is the number of comparisons of `i` and `j` won by `i`.
+        Only the observed pairs are stored, so the memory scales with the number of compared pairs."""
+        data = data[['left', 'right', 'label']]
+
+        unique_labels, np_data = np.unique(data.values, return_inverse=True)  # type: ignore
+        np_data = np_data.reshape(data.shape)
 
-        return win_matrix, unique_labels
+        return BradleyTerry._win_matrix_from_codes(np_data, unique_labels.size), unique_labels
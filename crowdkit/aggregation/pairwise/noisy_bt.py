@@ -1,16 +1,21 @@
 __all__ = ['NoisyBradleyTerry']
 
-from typing import Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, List, Optional, Tuple, cast
 
 import attr
 import numpy as np
 import numpy.typing as npt
 import pandas as pd
 from scipy.optimize import minimize
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
 from scipy.special import expit
 
 from ..base import BasePairwiseAggregator
-from ..utils import factorize, named_series_attrib
+from ..utils import (
+    add_sorted_counts, factorize, find_sorted_counts, get_merged_components, merge_sorted_counts, named_series_attrib
+)
 
 
 @attr.s
@@ -20,6 +25,17 @@ class NoisyBradleyTerry(BasePairwiseAggregator):
     This model is a modification of the [Bradley-Terry model](crowdkit.aggregation.pairwise.bradley_terry.BradleyTerry.md)
     with parameters for workers' skills (reliability) and biases.
 
+    If `decompose` is true, the connected components of the graph linking the compared items and the workers
+    who compared them are fitted independently, optionally in `n_jobs` parallel processes. Since the
+    components share neither items nor workers, their optimization problems are independent, and small
+    components converge without being dragged through the global optimization. The component ids
+    are stored in `components_`.
+
+    Args:
+        n_iter: A number of optimization iterations.
+        decompose: If true, fit the connected components of the comparisons graph independently.
+        n_jobs: A number of processes used for fitting the components if `decompose` is true.
+
     Examples:
         The following example shows how to aggregate results of comparisons **grouped by some column**.
         In the example the two questions `q1` and `q2` are used to group the labeled data.
@@ -57,13 +73,24 @@ class NoisyBradleyTerry(BasePairwiseAggregator):
             A pandas.Series index by workers and holding corresponding worker's skill
         biases_ (Series): Predicted biases for each worker. Indicates the probability of a worker to choose the left item..
             A series of workers' biases indexed by workers
+        components_ (Series): Labels' connected components.
+            A pandas.Series index by labels and holding corresponding label's component id.
+            All labels belong to the component 0 if `decompose` is false.
     """
     n_iter: int = attr.ib(default=100)
     tol: float = attr.ib(default=1e-5)
     regularization_ratio: float = attr.ib(default=1e-5)
     random_state: int = attr.ib(default=0)
+    decompose: bool = attr.ib(default=False)
+    n_jobs: int = attr.ib(default=1)
     skills_: pd.Series = named_series_attrib(name='skill')
     biases_: pd.Series = named_series_attrib(name='bias')
+    components_: pd.Series = named_series_attrib(name='component')
+
+    _x: Optional[npt.NDArray[Any]] = attr.ib(init=False, default=None, repr=False)
+    _comparisons: Optional['_ComparisonCounts'] = attr.ib(init=False, default=None, repr=False)
+    # component ids of the labels followed by component ids of the workers
+    _components: Optional[npt.NDArray[Any]] = attr.ib(init=False, default=None, repr=False)
 
     # scores_
 
@@ -79,20 +106,112 @@ class NoisyBradleyTerry(BasePairwiseAggregator):
 
         unique_labels, np_data = factorize(data[['left', 'right', 'label']].values)
         unique_workers, np_workers = factorize(data.worker.values)
+        comparisons = _ComparisonCounts()
+        comparisons.add(np_data, np_workers, unique_labels.size, unique_workers.size)
+        np_data, np_workers, counts = comparisons.get_all()
         np.random.seed(self.random_state)
         x_0 = np.random.rand(1 + unique_labels.size + 2 * unique_workers.size)
-        np_data += 1
+        components = self._get_components(np_data, np_workers, unique_labels.size, unique_workers.size)
 
-        x = minimize(self._compute_log_likelihood, x_0, jac=self._compute_gradient,
-                     args=(np_data, np_workers, unique_labels.size, unique_workers.size, self.regularization_ratio),
-                     method='L-BFGS-B', options={'maxiter': self.n_iter, 'ftol': np.float32(self.tol)})
+        if components.size and components.max() > 0:
+            x = self._fit_components(x_0, np_data, np_workers, counts, components, unique_labels.size)
+        else:
+            x = self._minimize(x_0, np_data, np_workers, unique_labels.size, unique_workers.size, counts)
+
+        self._comparisons = comparisons
+        self._set_parameters(x, pd.Index(unique_labels), pd.Index(unique_workers))
+        self._components = components
+        self.components_ = pd.Series(components[:unique_labels.size], index=self.scores_.index)
+
+        return self
+
+    def partial_fit(self, data: pd.DataFrame) -> 'NoisyBradleyTerry':
+        """Updates the scores, skills and biases with new comparisons.
+
+        The counts of the new distinct comparisons are added to the ones accumulated by the previous calls
+        of `fit` and `partial_fit`. The optimization is warm-started from the current parameters
+        and only updates the parameters of the items and workers present in the new comparisons, the
+        other parameters are fixed. So it only visits the comparisons involving these items and workers,
+        which are looked up without scanning the others. The components linked by the new comparisons
+        are merged. Previously unseen items and workers are appended to the end of the corresponding
+        attributes. If the model was not fitted yet, this is equivalent to `fit`.
+
+        Args:
+            data (DataFrame): Workers' pairwise comparison results.
+                A pandas.DataFrame containing `worker`, `left`, `right`, and `label` columns'.
+                For each row `label` must be equal to either `left` column or `right` column.
+
+        Returns:
+            NoisyBradleyTerry: self.
+        """
+
+        if self._x is None or self._comparisons is None or self._components is None:
+            return self.fit(data)
 
-        biases_begin = unique_labels.size + 1
-        workers_begin = biases_begin + unique_workers.size
+        if data.empty:
+            return self
 
-        self.scores_ = pd.Series(expit(x.x[1:biases_begin]), index=pd.Index(unique_labels, name='label'), name='score')
-        self.biases_ = pd.Series(expit(x.x[biases_begin:workers_begin]), index=unique_workers)
-        self.skills_ = pd.Series(expit(x.x[workers_begin:]), index=unique_workers)
+        labels, workers = self.scores_.index, self.skills_.index
+        values = data[['left', 'right', 'label']].values
+        new_labels = pd.Index(pd.unique(values.ravel())).difference(labels, sort=False)
+        new_workers = pd.Index(pd.unique(data.worker.values)).difference(workers, sort=False)
+
+        # new parameters are initialized randomly like in fit
+        np.random.seed(self.random_state)
+        biases_begin = labels.size + 1
+        workers_begin = biases_begin + workers.size
+        x = np.concatenate([
+            self._x[:biases_begin], np.random.rand(new_labels.size),
+            self._x[biases_begin:workers_begin], np.random.rand(new_workers.size),
+            self._x[workers_begin:], np.random.rand(new_workers.size),
+        ])
+        n_components = self._components.max() + 1 if self._components.size else 0
+        components = np.concatenate([
+            self._components[:labels.size], n_components + np.arange(new_labels.size),
+            self._components[labels.size:], n_components + new_labels.size + np.arange(new_workers.size),
+        ])
+        labels, workers = labels.append(new_labels), workers.append(new_workers)
+
+        np_data = labels.get_indexer(values.ravel()).reshape(values.shape)
+        np_workers = workers.get_indexer(data.worker.values)
+        self._comparisons.add(np_data, np_workers, labels.size, workers.size)
+        if self.decompose:
+            components = get_merged_components(components, np.concatenate([np_data[:, 0], np_data[:, 0]]),
+                                               np.concatenate([np_data[:, 1], labels.size + np_workers]))
+        else:
+            components = np.zeros(labels.size + workers.size, dtype=int)
+
+        affected_labels = np.unique(np_data[:, :2])
+        affected_workers = np.unique(np_workers)
+        np_data, np_workers, counts = self._comparisons.get_involving(affected_labels, affected_workers)
+
+        # the comparisons are coded within the items and workers they involve, the parameters of the ones
+        # not present in the new comparisons and the regularization anchor stay fixed
+        local_labels, local_data = np.unique(np_data, return_inverse=True)
+        local_workers, local_np_workers = np.unique(np_workers, return_inverse=True)
+        local_params = np.concatenate([
+            [0], 1 + local_labels, 1 + labels.size + local_workers, 1 + labels.size + workers.size + local_workers,
+        ])
+        label_positions = 1 + np.searchsorted(local_labels, affected_labels)
+        worker_positions = 1 + local_labels.size + np.searchsorted(local_workers, affected_workers)
+        params = np.concatenate([label_positions, worker_positions, local_workers.size + worker_positions])
+
+        local_x = x[local_params]
+        args = (local_data.reshape(np_data.shape) + 1, local_np_workers.ravel(), local_labels.size,
+                local_workers.size, self.regularization_ratio, counts)
+
+        def compute_log_likelihood_and_gradient(z: npt.NDArray[Any]) -> Tuple[float, npt.NDArray[Any]]:
+            local_x[params] = z
+            log_likelihood, gradient = self._compute_log_likelihood_and_gradient(local_x, *args)
+            return log_likelihood, gradient[params]
+
+        z = minimize(compute_log_likelihood_and_gradient, local_x[params], jac=True,
+                     method='L-BFGS-B', options={'maxiter': self.n_iter, 'ftol': np.float32(self.tol)})
+        x[local_params[params]] = z.x
+
+        self._set_parameters(x, labels, workers)
+        self._components = components
+        self.components_ = pd.Series(components[:labels.size], index=self.scores_.index)
 
         return self
 
@@ -108,42 +227,231 @@ class NoisyBradleyTerry(BasePairwiseAggregator):
         """
         return self.fit(data).scores_
 
-    @staticmethod
-    def _compute_log_likelihood(x: npt.NDArray[Any], np_data: npt.NDArray[Any],
-                                np_workers: npt.NDArray[Any], labels: int, workers: int,
-                                regularization_ratio: float) -> float:
-        s_i = x[np_data[:, 0]]
-        s_j = x[np_data[:, 1]]
-        y = np.zeros_like(np_data[:, 2])
-        y[np_data[:, 0] == np_data[:, 2]] = 1
-        y[np_data[:, 0] != np_data[:, 2]] = -1
-        q = x[1 + np_workers + labels]
-        gamma = x[1 + np_workers + labels + workers]
-
-        total = np.sum(np.log(expit(gamma) * expit(y * (s_i - s_j)) + (1 - expit(gamma)) * expit(y * q)))
-        reg = np.sum(np.log(expit(x[0] - x[1:labels + 1]))) + np.sum(np.log(expit(x[1:labels + 1] - x[0])))
-
-        return float(-total + regularization_ratio * reg)
+    def _minimize(self, x_0: npt.NDArray[Any], np_data: npt.NDArray[Any], np_workers: npt.NDArray[Any],
+                  labels: int, workers: int, counts: npt.NDArray[Any]) -> npt.NDArray[Any]:
+        x = minimize(self._compute_log_likelihood_and_gradient, x_0, jac=True,
+                     args=(np_data + 1, np_workers, labels, workers, self.regularization_ratio, counts),
+                     method='L-BFGS-B', options={'maxiter': self.n_iter, 'ftol': np.float32(self.tol)})
+        return cast(npt.NDArray[Any], x.x)
+
+    def _get_components(self, np_data: npt.NDArray[Any], np_workers: npt.NDArray[Any],
+                        labels: int, workers: int) -> npt.NDArray[Any]:
+        """Returns component ids of the labels followed by component ids of the workers."""
+        if not self.decompose:
+            return np.zeros(labels + workers, dtype=int)
+        # each comparison links its left item with its right item and with the worker
+        rows = np.concatenate([np_data[:, 0], np_data[:, 0]])
+        cols = np.concatenate([np_data[:, 1], labels + np_workers])
+        graph = coo_matrix((np.ones(rows.size), (rows, cols)), shape=(labels + workers, labels + workers))
+        _, components = connected_components(graph, directed=False)
+        return cast(npt.NDArray[Any], components)
+
+    def _fit_components(self, x_0: npt.NDArray[Any], np_data: npt.NDArray[Any], np_workers: npt.NDArray[Any],
+                        counts: npt.NDArray[Any], components: npt.NDArray[Any], labels: int) -> npt.NDArray[Any]:
+        """Fits every connected component separately and gathers their parameters."""
+        label_components, worker_components = components[:labels], components[labels:]
+        workers = worker_components.size
+        n_components = components.max() + 1
+
+        # the labels, the workers and the comparisons are grouped by component once and sliced below
+        label_order, label_bounds = _group_by_component(label_components, n_components)
+        worker_order, worker_bounds = _group_by_component(worker_components, n_components)
+        row_order, row_bounds = _group_by_component(label_components[np_data[:, 0]], n_components)
+
+        # codes of the labels and the workers within their components
+        labels_codes = np.empty(labels, dtype=int)
+        labels_codes[label_order] = np.arange(labels) - label_bounds[label_components[label_order]]
+        workers_codes = np.empty(workers, dtype=int)
+        workers_codes[worker_order] = np.arange(workers) - worker_bounds[worker_components[worker_order]]
+        data_codes, comparison_workers_codes = labels_codes[np_data], workers_codes[np_workers]
+
+        params = []
+        problems = []
+        for component in range(n_components):
+            component_labels = label_order[label_bounds[component]:label_bounds[component + 1]]
+            component_workers = worker_order[worker_bounds[component]:worker_bounds[component + 1]]
+            rows = row_order[row_bounds[component]:row_bounds[component + 1]]
+
+            component_params = np.concatenate([
+                [0], 1 + component_labels, 1 + labels + component_workers, 1 + labels + workers + component_workers,
+            ])
+            params.append(component_params)
+            problems.append((x_0[component_params], data_codes[rows], comparison_workers_codes[rows],
+                             component_labels.size, component_workers.size, counts[rows]))
+
+        if self.n_jobs == 1:
+            results = [self._minimize(*problem) for problem in problems]
+        else:
+            with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+                chunksize = max(1, len(problems) // (4 * self.n_jobs))
+                results = list(executor.map(self._minimize, *zip(*problems), chunksize=chunksize))
+
+        x = x_0.copy()
+        for component_params, component_x in zip(params, results):
+            x[component_params[1:]] = component_x[1:]
+        # the regularization anchor is not shared by the components
+        x[0] = np.mean([component_x[0] for component_x in results])
+        return x
+
+    def _set_parameters(self, x: npt.NDArray[Any], labels: pd.Index, workers: pd.Index) -> None:
+        biases_begin = labels.size + 1
+        workers_begin = biases_begin + workers.size
+
+        self._x = x
+        self.scores_ = pd.Series(expit(x[1:biases_begin]), index=labels.rename('label'), name='score')
+        self.biases_ = pd.Series(expit(x[biases_begin:workers_begin]), index=workers)
+        self.skills_ = pd.Series(expit(x[workers_begin:]), index=workers)
 
     @staticmethod
-    def _compute_gradient(x: npt.NDArray[Any], np_data: npt.NDArray[Any],
-                          np_workers: npt.NDArray[Any], labels: int, workers: int,
-                          regularization_ratio: float) -> npt.NDArray[Any]:
-        gradient = np.zeros_like(x)
-
-        for worker_idx, (left_idx, right_idx, label) in zip(np_workers, np_data):
-            s_i = x[left_idx]
-            s_j = x[right_idx]
-            y = 1 if label == left_idx else -1
-            q = x[1 + labels + worker_idx]
-            gamma = x[1 + labels + workers + worker_idx]
-
-            # We'll use autograd in the future
-            gradient[left_idx] += (y * np.exp(y * (-(s_i - s_j)))) / ((np.exp(-gamma) + 1) * (np.exp(y * (-(s_i - s_j))) + 1) ** 2 * (1 / ((np.exp(-gamma) + 1) * (np.exp(y * (-(s_i - s_j))) + 1)) + (1 - 1 / (np.exp(-gamma) + 1)) / (np.exp(-q * y) + 1)))  # noqa
-            gradient[right_idx] += -(y * (np.exp(q * y) + 1) * np.exp(y * (s_i - s_j) + gamma)) / ((np.exp(y * (s_i - s_j)) + 1) * (np.exp(y * (s_i - s_j) + gamma + q * y) + np.exp(y * (s_i - s_j) + gamma) + np.exp(y * (s_i - s_j) + q * y) + np.exp(q * y)))  # noqa
-            gradient[labels + worker_idx] = (y * np.exp(q * y) * (np.exp(s_i * y) + np.exp(s_j * y))) / ((np.exp(q * y) + 1) * (np.exp(y * (s_i + q) + gamma) + np.exp(s_i * y + gamma) + np.exp(y * (s_i + q)) + np.exp(y * (s_j + q))))  # noqa #dq
-            gradient[labels + workers + worker_idx] = (np.exp(gamma) * (np.exp(s_i * y) - np.exp(y * (s_j + q)))) / ((np.exp(gamma) + 1) * (np.exp(y * (s_i + q) + gamma) + np.exp(s_i * y + gamma) + np.exp(y * (s_i + q)) + np.exp(y * (s_j + q))))  # noqa #dgamma
-
-        gradient[1:labels + 1] -= regularization_ratio * np.tanh((x[1:labels + 1] - x[0]) / 2.)
-        gradient[0] += regularization_ratio * np.sum(np.tanh((x[1:labels + 1] - x[0]) / 2.))
-        return -gradient
+    def _compute_log_likelihood_and_gradient(x: npt.NDArray[Any], np_data: npt.NDArray[Any],
+                                             np_workers: npt.NDArray[Any], labels: int, workers: int,
+                                             regularization_ratio: float,
+                                             counts: Optional[npt.NDArray[Any]] = None) -> Tuple[float, npt.NDArray[Any]]:
+        """Computes the negative regularized log-likelihood and its gradient sharing the intermediate values.
+        If `counts` are provided, each comparison is counted the corresponding number of times."""
+        left_idx, right_idx, label = np_data.T
+        q_idx = 1 + labels + np_workers
+        gamma_idx = q_idx + workers
+
+        y = np.where(left_idx == label, 1., -1.)
+        gamma = expit(x[gamma_idx])
+        comparison = expit(y * (x[left_idx] - x[right_idx]))
+        bias = expit(y * x[q_idx])
+        likelihood = gamma * comparison + (1 - gamma) * bias
+        if counts is None:
+            counts = np.ones(likelihood.size)
+
+        scores = x[1:labels + 1] - x[0]
+        total = np.sum(counts * np.log(likelihood))
+        reg = np.sum(np.log(expit(-scores))) + np.sum(np.log(expit(scores)))
+
+        d_score = counts * y * gamma * comparison * (1 - comparison) / likelihood
+        d_q = counts * y * (1 - gamma) * bias * (1 - bias) / likelihood
+        d_gamma = counts * gamma * (1 - gamma) * (comparison - bias) / likelihood
+
+        gradient = np.bincount(left_idx, weights=d_score, minlength=x.size)
+        gradient -= np.bincount(right_idx, weights=d_score, minlength=x.size)
+        gradient += np.bincount(q_idx, weights=d_q, minlength=x.size)
+        gradient += np.bincount(gamma_idx, weights=d_gamma, minlength=x.size)
+
+        gradient[1:labels + 1] -= regularization_ratio * np.tanh(scores / 2.)
+        gradient[0] += regularization_ratio * np.sum(np.tanh(scores / 2.))
+
+        return float(-total - regularization_ratio * reg), -gradient
+
+
+def _group_by_component(components: npt.NDArray[Any], n_components: int) -> Tuple[npt.NDArray[Any], npt.NDArray[Any]]:
+    """Sorts the indices by component keeping their order within a component.
+
+    Returns:
+        Tuple[ndarray, ndarray]: The sorted indices and the bounds of the components' slices in them.
+    """
+    order = np.argsort(components, kind='stable')
+    bounds = np.concatenate([[0], np.cumsum(np.bincount(components, minlength=n_components))])
+    return order, bounds
+
+
+@attr.s
+class _ComparisonCounts:
+    """Counts of distinct comparisons made by the workers.
+
+    A comparison of the left and the right items won by one of them and made by a worker is packed into
+    an integer key. The keys are kept sorted in three orders, by the left items, by the right items and by
+    the workers, so the comparisons involving some items or workers are found by binary searches. Every
+    order is stored as runs of `add_sorted_counts`, so new counts are added without rewriting the counts
+    accumulated before. The keys are packed with the numbers of items and workers rounded up to powers
+    of two, and are repacked when these numbers grow.
+    """
+
+    label_capacity: int = attr.ib(default=1)
+    worker_capacity: int = attr.ib(default=1)
+    runs: List[List[Tuple[npt.NDArray[Any], npt.NDArray[Any]]]] = attr.ib(factory=lambda: [[] for _ in range(3)])
+
+    def add(self, np_data: npt.NDArray[Any], np_workers: npt.NDArray[Any], labels: int, workers: int) -> None:
+        """Adds the comparisons coded within `labels` items and `workers` workers to the counts."""
+        self._reserve(labels, workers)
+
+        left, right, label = np_data.astype(np.int64).T
+        keys, inverse = np.unique(self._pack(0, left, right, label != left, np_workers.astype(np.int64)),
+                                  return_inverse=True)
+        counts = np.bincount(inverse.ravel(), minlength=keys.size).astype(float)
+        comparisons = self._unpack(0, keys)
+
+        for order in range(3):
+            order_keys = self._pack(order, *comparisons)
+            sorting = np.argsort(order_keys)
+            self.runs[order] = add_sorted_counts(self.runs[order], order_keys[sorting], counts[sorting])
+
+    def get_all(self) -> Tuple[npt.NDArray[Any], npt.NDArray[Any], npt.NDArray[Any]]:
+        """Returns the distinct comparisons, the workers who made them and their counts."""
+        return self._get(0, *merge_sorted_counts(self.runs[0]))
+
+    def get_involving(self, labels: npt.NDArray[Any],
+                      workers: npt.NDArray[Any]) -> Tuple[npt.NDArray[Any], npt.NDArray[Any], npt.NDArray[Any]]:
+        """Returns the comparisons of any of the sorted `labels` or made by any of the sorted `workers`.
+
+        A comparison is returned once per run it is present in, with the part of its count in this run.
+        """
+        by_left = self._find(0, labels)
+        by_right = self._find(1, labels)
+        by_worker = self._find(2, workers)
+
+        # every comparison is only taken from the first of the orders it is found in
+        by_right_rows = ~np.isin(by_right[0][:, 0], labels)
+        by_worker_rows = ~(np.isin(by_worker[0][:, 0], labels) | np.isin(by_worker[0][:, 1], labels))
+        np_data, np_workers, counts = (
+            np.concatenate([left, right[by_right_rows], worker[by_worker_rows]])
+            for left, right, worker in zip(by_left, by_right, by_worker)
+        )
+        return np_data, np_workers, counts
+
+    def _reserve(self, labels: int, workers: int) -> None:
+        label_capacity = max(self.label_capacity, 1 << max(labels - 1, 0).bit_length())
+        worker_capacity = max(self.worker_capacity, 1 << max(workers - 1, 0).bit_length())
+        if (label_capacity, worker_capacity) == (self.label_capacity, self.worker_capacity):
+            return
+        if 2 * label_capacity ** 2 * worker_capacity > np.iinfo(np.int64).max:
+            raise ValueError('Too many items and workers to pack the comparisons in 64-bit keys.')
+
+        # the order of the keys does not depend on the capacities
+        comparisons = [[(self._unpack(order, keys), counts) for keys, counts in runs]
+                       for order, runs in enumerate(self.runs)]
+        self.label_capacity, self.worker_capacity = label_capacity, worker_capacity
+        self.runs = [[(self._pack(order, *comparison), counts) for comparison, counts in runs]
+                     for order, runs in enumerate(comparisons)]
+
+    def _pack(self, order: int, left: npt.NDArray[Any], right: npt.NDArray[Any], right_won: npt.NDArray[Any],
+              worker: npt.NDArray[Any]) -> npt.NDArray[Any]:
+        labels, workers = self.label_capacity, self.worker_capacity
+        if order == 0:
+            return cast(npt.NDArray[Any], ((left * labels + right) * 2 + right_won) * workers + worker)
+        if order == 1:
+            return cast(npt.NDArray[Any], ((right * labels + left) * 2 + right_won) * workers + worker)
+        return cast(npt.NDArray[Any], ((worker * labels + left) * labels + right) * 2 + right_won)
+
+    def _unpack(self, order: int, keys: npt.NDArray[Any]) -> Tuple[npt.NDArray[Any], ...]:
+        labels, workers = self.label_capacity, self.worker_capacity
+        if order == 2:
+            keys, right_won = np.divmod(keys, 2)
+            keys, right = np.divmod(keys, labels)
+            worker, left = np.divmod(keys, labels)
+            return left, right, right_won, worker
+
+        keys, worker = np.divmod(keys, workers)
+        keys, right_won = np.divmod(keys, 2)
+        first, second = np.divmod(keys, labels)
+        return (first, second, right_won, worker) if order == 0 else (second, first, right_won, worker)
+
+    def _find(self, order: int,
+              values: npt.NDArray[Any]) -> Tuple[npt.NDArray[Any], npt.NDArray[Any], npt.NDArray[Any]]:
+        """Returns the comparisons of the order with the leading digits among the sorted `values`."""
+        stride = 2 * self.label_capacity * (self.label_capacity if order == 2 else self.worker_capacity)
+        values = values.astype(np.int64)
+        keys, counts, _ = find_sorted_counts(self.runs[order], values * stride, (values + 1) * stride)
+        return self._get(order, keys, counts)
+
+    def _get(self, order: int, keys: npt.NDArray[Any],
+             counts: npt.NDArray[Any]) -> Tuple[npt.NDArray[Any], npt.NDArray[Any], npt.NDArray[Any]]:
+        left, right, right_won, worker = self._unpack(order, keys)
+        np_data = np.column_stack([left, right, np.where(right_won, right, left)])
+        return np_data, worker, counts
@@ -1,9 +1,25 @@
-from .rover import ROVER
-from .text_hrrasa import TextHRRASA
-from .text_rasa import TextRASA
+from typing import TYPE_CHECKING
+
+from ..._lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .caching import EmbeddingCache, GenerationCache
+    from .rover import ROVER
+    from .text_hrrasa import TextHRRASA
+    from .text_rasa import TextRASA
 
 __all__ = [
+    'EmbeddingCache',
+    'GenerationCache',
     'TextHRRASA',
     'TextRASA',
     'ROVER'
 ]
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'EmbeddingCache': '.caching',
+    'GenerationCache': '.caching',
+    'TextHRRASA': '.text_hrrasa',
+    'TextRASA': '.text_rasa',
+    'ROVER': '.rover',
+})
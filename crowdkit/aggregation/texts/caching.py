@@ -0,0 +1,178 @@
+__all__ = [
+    'EmbeddingCache',
+    'GenerationCache',
+]
+
+import hashlib
+import io
+import sqlite3
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Iterable, Optional, TypeVar
+
+import numpy as np
+import numpy.typing as npt
+
+# the most of the parameters SQLite accepts in a single query by default
+_SQLITE_MAX_VARIABLES = 999
+
+T = TypeVar('T')
+
+
+class _TextCache(ABC, Generic[T]):
+    """A cache of values keyed by the hashes of texts.
+
+    The recently used values are kept in memory. If a path is specified, all the values are also
+    stored in the `_table` table of an SQLite database, so they persist between runs.
+    """
+
+    _table: str
+
+    def __init__(self, path: Optional[str] = None, max_size: Optional[int] = 100_000) -> None:
+        self.path = path
+        self.max_size = max_size
+        self._memory: 'OrderedDict[str, T]' = OrderedDict()
+        self._connection: Optional[sqlite3.Connection] = None
+        if path is not None:
+            self._connection = sqlite3.connect(path)
+            self._connection.execute(f'CREATE TABLE IF NOT EXISTS {self._table} (key TEXT PRIMARY KEY, value BLOB)')
+
+    def __len__(self) -> int:
+        if self._connection is not None:
+            return int(self._connection.execute(f'SELECT COUNT(*) FROM {self._table}').fetchone()[0])
+        return len(self._memory)
+
+    def get(self, texts: Iterable[str]) -> Dict[str, T]:
+        """Returns the cached values of the texts found in the cache."""
+        keys = {text: self._get_key(text) for text in texts}
+        found = {}
+        for text, key in keys.items():
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                found[text] = self._memory[key]
+
+        missing = {key: text for text, key in keys.items() if text not in found}
+        if self._connection is not None and missing:
+            stored: Dict[str, bytes] = {}
+            missing_keys = list(missing)
+            for start in range(0, len(missing_keys), _SQLITE_MAX_VARIABLES):
+                chunk = missing_keys[start:start + _SQLITE_MAX_VARIABLES]
+                stored.update(self._connection.execute(
+                    f'SELECT key, value FROM {self._table} WHERE key IN ({", ".join("?" * len(chunk))})', chunk
+                ).fetchall())
+            for key, blob in stored.items():
+                value = self._deserialize(blob)
+                self._remember(key, value)
+                found[missing[key]] = value
+
+        return found
+
+    def update(self, values: Dict[str, T]) -> None:
+        """Adds the values of the texts to the cache."""
+        keys = {text: self._get_key(text) for text in values}
+        for text, value in values.items():
+            self._remember(keys[text], value)
+
+        if self._connection is not None and values:
+            with self._connection:
+                self._connection.executemany(
+                    f'INSERT OR REPLACE INTO {self._table} (key, value) VALUES (?, ?)',
+                    ((keys[text], self._serialize(value)) for text, value in values.items())
+                )
+
+    def close(self) -> None:
+        """Closes the database connection."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def _remember(self, key: str, value: T) -> None:
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if self.max_size is not None:
+            while len(self._memory) > self.max_size:
+                self._memory.popitem(last=False)
+
+    @staticmethod
+    def _get_key(text: str) -> str:
+        return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    @abstractmethod
+    def _serialize(value: T) -> bytes:
+        ...
+
+    @staticmethod
+    @abstractmethod
+    def _deserialize(blob: bytes) -> T:
+        ...
+
+
+class EmbeddingCache(_TextCache[npt.NDArray[Any]]):
+    """A cache of text embeddings keyed by the hashes of the texts.
+
+    The recently used embeddings are kept in memory. If a path is specified, all the embeddings are also
+    stored in an SQLite database, so they persist between runs. Since the embeddings are only keyed by
+    the texts, a cache should only be used with a single encoder.
+
+    Args:
+        path: A path to the SQLite database file. If not specified, the embeddings are only kept in memory.
+        max_size: A maximal number of embeddings kept in memory. The least recently used ones are evicted first.
+            If `None`, the number is not limited.
+            Default value: `100_000`.
+
+    Examples:
+        >>> from crowdkit.aggregation import TextRASA
+        >>> from crowdkit.aggregation.texts import EmbeddingCache
+        >>> from sentence_transformers import SentenceTransformer
+        >>> encoder = SentenceTransformer('all-mpnet-base-v2')
+        >>> cache = EmbeddingCache('all-mpnet-base-v2.sqlite')
+        >>> rasa = TextRASA(encoder=encoder.encode, batch_size=64, cache=cache)
+    """
+
+    _table = 'embeddings'
+
+    @staticmethod
+    def _serialize(value: npt.NDArray[Any]) -> bytes:
+        buffer = io.BytesIO()
+        np.save(buffer, value, allow_pickle=False)
+        return buffer.getvalue()
+
+    @staticmethod
+    def _deserialize(blob: bytes) -> npt.NDArray[Any]:
+        return np.load(io.BytesIO(blob), allow_pickle=False)  # type: ignore
+
+
+class GenerationCache(_TextCache[str]):
+    """A cache of texts generated by a language model.
+
+    The outputs are keyed by the hashes of the model identifier, the generation parameters and the
+    model inputs, so a single cache can be shared by several models. The recently used outputs are
+    kept in memory. If a path is specified, all the outputs are also stored in an SQLite database,
+    so rerunning the aggregation on the same tasks does not call the model again.
+
+    Args:
+        path: A path to the SQLite database file. If not specified, the outputs are only kept in memory.
+        max_size: A maximal number of outputs kept in memory. The least recently used ones are evicted first.
+            If `None`, the number is not limited.
+            Default value: `100_000`.
+
+    Examples:
+        >>> from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+        >>> from crowdkit.aggregation import TextSummarization
+        >>> from crowdkit.aggregation.texts import GenerationCache
+        >>> mname = "toloka/t5-large-for-text-aggregation"
+        >>> tokenizer = AutoTokenizer.from_pretrained(mname)
+        >>> model = AutoModelForSeq2SeqLM.from_pretrained(mname)
+        >>> agg = TextSummarization(tokenizer, model, cache=GenerationCache('generations.sqlite'))
+    """
+
+    _table = 'generations'
+
+    @staticmethod
+    def _serialize(value: str) -> bytes:
+        return value.encode('utf-8')
+
+    @staticmethod
+    def _deserialize(blob: bytes) -> str:
+        return blob.decode('utf-8')
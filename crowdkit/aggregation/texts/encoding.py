@@ -0,0 +1,52 @@
+__all__ = [
+    'encode_texts',
+]
+
+from typing import Callable, List, Optional, Union
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from .caching import EmbeddingCache
+
+
+def encode_texts(
+    texts: pd.Series,
+    encoder: Union[Callable[[str], npt.ArrayLike], Callable[[List[str]], npt.ArrayLike]],
+    batch_size: Optional[int] = None,
+    cache: Optional[EmbeddingCache] = None
+) -> pd.Series:
+    """Encodes the texts, calling the encoder once for every distinct text missing in the cache.
+
+    Args:
+        texts (Series): Texts to encode.
+        encoder: A callable that takes a text and returns its embedding. If `batch_size` is specified, it takes
+            a list of texts and returns a two-dimensional array of their embeddings instead.
+        batch_size: A maximal number of texts passed to the encoder at once.
+        cache: A cache the embeddings are looked up in and stored to.
+
+    Returns:
+        Series: The texts' embeddings indexed like `texts`.
+    """
+
+    unique_texts = list(pd.unique(texts))
+    embeddings = cache.get(unique_texts) if cache is not None else {}
+
+    missing = [text for text in unique_texts if text not in embeddings]
+    if batch_size is None:
+        encoded = {text: np.asarray(encoder(text)) for text in missing}  # type: ignore
+    else:
+        encoded = {}
+        for start in range(0, len(missing), batch_size):
+            batch = missing[start:start + batch_size]
+            encoded.update(zip(batch, np.asarray(encoder(batch))))  # type: ignore
+
+    if cache is not None:
+        cache.update(encoded)
+    embeddings.update(encoded)
+
+    values = np.empty(len(texts), dtype=object)
+    for i, text in enumerate(texts):
+        values[i] = embeddings[text]
+    return pd.Series(values, index=texts.index, name=texts.name)
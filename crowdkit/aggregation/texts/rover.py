@@ -2,16 +2,19 @@ __all__ = [
     'ROVER',
 ]
 
-from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
 from enum import Enum, unique
-from typing import List, Callable, Dict, Optional, Tuple, cast
+from itertools import combinations, repeat, starmap
+from typing import Any, List, Callable, Iterator, Optional, Tuple
 
 import attr
 import numpy as np
+import numpy.typing as npt
 import pandas as pd
 from tqdm.auto import tqdm
 
 from ..base import BaseTextsAggregator
+from ..utils import add_skills_to_data
 
 
 @unique
@@ -22,10 +25,8 @@ class AlignmentAction(Enum):
     CORRECT = 'CORRECT'
 
 
-@attr.s
-class AlignmentEdge:
-    value: str = attr.ib()
-    sources_count: Optional[int] = attr.ib()
+# the id of the empty token
+_EMPTY = 0
 
 
 @attr.s
@@ -46,6 +47,18 @@ class ROVER(BaseTextsAggregator):
         tokenizer: A callable that takes a string and returns a list of tokens.
         detokenizer: A callable that takes a list of tokens and returns a string.
         silent: If false, show a progress bar.
+        n_jobs: A number of processes used for aligning the tasks. The tokenizer and the detokenizer are always
+            called in the main process, so they do not have to be picklable.
+        chunk_size: A number of tasks sent to a process at once if `n_jobs` is greater than 1.
+            If not specified, the tasks are split into about four chunks per process.
+        backbone: The hypothesis the other hypotheses of a task are aligned to first.
+            Possible values:
+                * "first" — the first hypothesis of the task;
+                * "longest" — the hypothesis with the most tokens;
+                * "medoid" — the hypothesis with the least total edit distance to the other ones.
+        band: If specified, the alignment only fills and stores the cells of the dynamic programming table within `band`
+            cells of the diagonal, which is nearly linear for similar hypotheses. If a path leaving the band
+            could be as good as the one found, the band is doubled up to the full table, so the result does not change.
 
     Examples:
         >>> from crowdkit.aggregation import load_dataset
@@ -65,45 +78,90 @@ class ROVER(BaseTextsAggregator):
     tokenizer: Callable[[str], List[str]] = attr.ib()
     detokenizer: Callable[[List[str]], str] = attr.ib()
     silent: bool = attr.ib(default=True)
+    n_jobs: int = attr.ib(default=1)
+    chunk_size: Optional[int] = attr.ib(default=None)
+    backbone: str = attr.ib(default='first')
+    band: Optional[int] = attr.ib(default=None)
 
     # Available after fit
     # texts_
 
-    def fit(self, data: pd.DataFrame) -> 'ROVER':
+    def fit(self, data: pd.DataFrame, skills: Optional[pd.Series] = None) -> 'ROVER':
         """Fits the model. The aggregated results are saved to the `texts_` attribute.
 
         Args:
             data (DataFrame): Workers' text outputs.
                 A pandas.DataFrame containing `task`, `worker` and `text` columns.
+            skills (Series): Workers' skills used as the weights of their votes.
+                A pandas.Series indexed by workers and holding corresponding worker's skill.
+                If not specified, every vote has the weight of 1.
 
         Returns:
             ROVER: self.
         """
 
-        result = {}
-        grouped_tasks = data.groupby('task') if self.silent else tqdm(data.groupby('task'))
-        for task, df in grouped_tasks:
-            hypotheses = [self.tokenizer(text) for i, text in enumerate(df['text'])]
+        texts = pd.Series(dict(self.iter_texts(data, skills)), name='text', dtype=object)
+        texts.index.name = 'task'
+        self.texts_ = texts
 
-            edges = self._build_word_transition_network(hypotheses)
-            rover_result = self._get_result(edges)
+        return self
 
-            text = self.detokenizer([value for value in rover_result if value != ''])
+    def iter_texts(self, data: pd.DataFrame, skills: Optional[pd.Series] = None) -> Iterator[Tuple[Any, str]]:
+        """Aggregates the texts task by task, yielding each result as soon as it is ready.
 
-            result[task] = text
+        The `texts_` attribute is not changed.
 
-        texts = pd.Series(result, name='text')
-        texts.index.name = 'task'
-        self.texts_ = texts
+        Args:
+            data (DataFrame): Workers' text outputs.
+                A pandas.DataFrame containing `task`, `worker` and `text` columns.
+            skills (Series): Workers' skills used as the weights of their votes.
+                A pandas.Series indexed by workers and holding corresponding worker's skill.
+                If not specified, every vote has the weight of 1.
 
-        return self
+        Yields:
+            Tuple: A task and its aggregated text, in the order of the sorted tasks.
+        """
 
-    def fit_predict(self, data: pd.DataFrame) -> pd.Series:
+        if self.backbone not in ('first', 'longest', 'medoid'):
+            raise ValueError(f'Unknown option {self.backbone!r} of "backbone" argument.')
+
+        data = data[['task', 'worker', 'text']]
+        if skills is None:
+            data = data.assign(skill=1.0)
+        else:
+            data = add_skills_to_data(data, skills, on_missing_skill='error')
+
+        grouped_tasks = data.groupby('task')
+        tasks = list(grouped_tasks.groups)
+        arguments = (
+            ([self.tokenizer(text) for text in df['text']], df['skill'].to_numpy(dtype=float))
+            for _, df in grouped_tasks
+        )
+
+        if self.n_jobs == 1:
+            results: Iterator[List[str]] = starmap(self._aggregate_tokens, ((*args, self.backbone, self.band) for args in arguments))
+            yield from self._detokenize(tasks, results)
+        else:
+            chunk_size = self.chunk_size or max(1, len(tasks) // (4 * self.n_jobs))
+            hypotheses, weights = zip(*arguments) if tasks else ((), ())
+            with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+                results = executor.map(self._aggregate_tokens, hypotheses, weights, repeat(self.backbone),
+                                       repeat(self.band), chunksize=chunk_size)
+                yield from self._detokenize(tasks, results)
+
+    def _detokenize(self, tasks: List[Any], results: Iterator[List[str]]) -> Iterator[Tuple[Any, str]]:
+        for i, tokens in enumerate(results if self.silent else tqdm(results, total=len(tasks))):
+            yield tasks[i], self.detokenizer(tokens)
+
+    def fit_predict(self, data: pd.DataFrame, skills: Optional[pd.Series] = None) -> pd.Series:
         """Fit the model and return the aggregated texts.
 
         Args:
             data (DataFrame): Workers' text outputs.
                 A pandas.DataFrame containing `task`, `worker` and `text` columns.
+            skills (Series): Workers' skills used as the weights of their votes.
+                A pandas.Series indexed by workers and holding corresponding worker's skill.
+                If not specified, every vote has the weight of 1.
 
         Returns:
             Series: Tasks' texts.
@@ -111,122 +169,235 @@ class ROVER(BaseTextsAggregator):
                 is the task's text.
         """
 
-        self.fit(data)
+        self.fit(data, skills)
         return self.texts_
 
-    def _build_word_transition_network(self, hypotheses: List[List[str]]) -> List[Dict[str, AlignmentEdge]]:
-        edges = [{edge.value: edge} for edge in self._get_edges_for_words(hypotheses[0])]
+    @staticmethod
+    def _aggregate_tokens(hypotheses: List[List[str]], weights: npt.NDArray[Any], backbone: str,
+                          band: Optional[int]) -> List[str]:
+        """Aligns the tokenized hypotheses of a task and returns the non-empty tokens of the voting result."""
+
+        # intern tokens to integer ids, the id 0 stands for the empty token
+        vocabulary = [''] + sorted({token for hypothesis in hypotheses for token in hypothesis} - {''})
+        token_ids = {token: token_id for token_id, token in enumerate(vocabulary)}
+
+        wtn = ROVER._build_word_transition_network(
+            [np.array([token_ids[token] for token in hypothesis], dtype=int) for hypothesis in hypotheses], weights,
+            backbone, band
+        )
+        return [value for value in ROVER._get_result(wtn, vocabulary) if value != '']
+
+    @staticmethod
+    def _build_word_transition_network(hypotheses: List[npt.NDArray[np.int_]], weights: npt.NDArray[Any],
+                                       backbone: str = 'first',
+                                       band: Optional[int] = None) -> '_WordTransitionNetwork':
+        first = ROVER._get_backbone(hypotheses, backbone, band)
+        order = [first] + [i for i in range(len(hypotheses)) if i != first]
+        hypotheses = [hypotheses[i] for i in order]
+        weights = weights[order]
+
+        wtn = _WordTransitionNetwork(
+            np.arange(len(hypotheses[0]) + 1), hypotheses[0], np.full(len(hypotheses[0]), weights[0], dtype=float)
+        )
 
         for sources_count, hyp in enumerate(hypotheses[1:], start=1):
-            edges = self._align(edges, self._get_edges_for_words(hyp), sources_count)
+            wtn = ROVER._align(wtn, hyp, weights[:sources_count].sum(), weights[sources_count], band)
+
+        return wtn
+
+    @staticmethod
+    def _get_backbone(hypotheses: List[npt.NDArray[np.int_]], backbone: str, band: Optional[int]) -> int:
+        """Returns the index of the hypothesis to start the word transition network from."""
+        if backbone == 'longest':
+            return int(np.argmax([len(hyp) for hyp in hypotheses]))
+
+        if backbone == 'medoid':
+            edit_distances = np.zeros((len(hypotheses), len(hypotheses)), dtype=int)
+            for a, b in combinations(range(len(hypotheses)), 2):
+                hyp, ref = hypotheses[a], hypotheses[b]
+                n_tokens = max(hyp.max(initial=0), ref.max(initial=0)) + 1
+                ref_keys = ROVER._get_ref_keys(np.arange(len(ref)), ref, n_tokens)
+                distance, offsets, _ = ROVER._get_distances(hyp, ref_keys, n_tokens, np.ones(len(ref), dtype=int), band)
+                edit_distances[a, b] = edit_distances[b, a] = distance[-1, len(ref) - offsets[-1]]
+            return int(np.argmin(edit_distances.sum(axis=1)))
+
+        return 0
+
+    @staticmethod
+    def _get_ref_keys(slots: npt.NDArray[np.int_], tokens: npt.NDArray[np.int_],
+                      n_tokens: int) -> npt.NDArray[np.int_]:
+        """Encodes the tokens of the reference slots as sorted keys `slot * n_tokens + token`."""
+        return np.sort(slots * n_tokens + tokens)
+
+    @staticmethod
+    def _get_distances(
+            hyp: npt.NDArray[np.int_], ref_keys: npt.NDArray[np.int_], n_tokens: int,
+            deletion_cost: npt.NDArray[np.int_], band: Optional[int] = None
+    ) -> Tuple[npt.NDArray[np.int_], npt.NDArray[np.int_], npt.NDArray[np.bool_]]:
+        """Fills the dynamic programming table of alignment costs, see `_fill_distances`.
+
+        If `band` is specified, the banded table is filled first and is only kept if no path leaving the band
+        can cost as much as the path found. Otherwise the band is doubled until it covers the full table.
+        """
+        hyp_size, ref_size = len(hyp), len(deletion_cost)
+        full_band = max(hyp_size, ref_size)
+        while band is not None and band < full_band:
+            distance, offsets, is_hyp_word_in_ref = ROVER._fill_distances(hyp, ref_keys, n_tokens, deletion_cost, band)
+            if ROVER._is_band_optimal(distance[-1, ref_size - offsets[-1]], hyp_size, deletion_cost, band):
+                return distance, offsets, is_hyp_word_in_ref
+            band = 2 * band + 1
+        return ROVER._fill_distances(hyp, ref_keys, n_tokens, deletion_cost, full_band)
+
+    @staticmethod
+    def _get_band_limits(hyp_size: int, ref_size: int, band: int) -> Tuple[int, int]:
+        """Returns how far below and above the diagonal the band spreads, so that it contains the last cell."""
+        return band + max(0, hyp_size - ref_size), band + max(0, ref_size - hyp_size)
+
+    @staticmethod
+    def _fill_distances(
+            hyp: npt.NDArray[np.int_], ref_keys: npt.NDArray[np.int_], n_tokens: int,
+            deletion_cost: npt.NDArray[np.int_], band: int
+    ) -> Tuple[npt.NDArray[np.int_], npt.NDArray[np.int_], npt.NDArray[np.bool_]]:
+        """Fills the cells of the dynamic programming table within the band.
+
+        Only a window of the cells around the diagonal is stored for every row: the cell `(i, j)` is
+        `distance[i, j - offsets[i]]`, and so is `is_hyp_word_in_ref[i, j - offsets[i]]`, telling if the slot
+        `j - 1` of the reference holds the token `i - 1` of the hypothesis. The windows are clipped to the
+        table, so the window of the full band is the full table. The cells of a window outside the band are
+        set to a cost greater than any path has.
+
+        The table is filled row by row. Substitution and insertion costs of a row only depend on the previous
+        row, and the dependency on the deletion from the left neighbour is resolved with a running minimum:
+        `distance[i, j] = min over k <= j of (candidate[k] + deletion_cost[k + 1:j + 1].sum())`.
+
+        Args:
+            hyp: Token ids of the hypothesis.
+            ref_keys: Tokens of the reference slots encoded by `_get_ref_keys`.
+            n_tokens: The number of token ids the keys are encoded with.
+            deletion_cost: Costs of deleting the reference slots.
+            band: Width of the band around the diagonal.
+
+        Returns:
+            The windows of the table, the offsets of the windows and the token matches of their cells.
+        """
+        hyp_size, ref_size = len(hyp), len(deletion_cost)
+        below, above = ROVER._get_band_limits(hyp_size, ref_size, band)
+        width = min(below + above + 1, ref_size + 1)
+        offsets = np.clip(np.arange(hyp_size + 1) - below, 0, ref_size + 1 - width)
+
+        # the keys of the tokens of the hypothesis in the slots of the window cells, the row 0 has no token
+        cell_slots = offsets[:, None] + np.arange(width) - 1
+        cell_keys = cell_slots * n_tokens + np.concatenate([[_EMPTY], hyp])[:, None]
+        positions = np.minimum(np.searchsorted(ref_keys, cell_keys), max(ref_keys.size - 1, 0))
+        is_hyp_word_in_ref = (cell_slots >= 0) & (ref_keys[positions] == cell_keys) if ref_keys.size else \
+            np.zeros(cell_keys.shape, dtype=bool)
+        is_hyp_word_in_ref[0] = False
+
+        # one more column, which is never filled, is read past the window of the previous row
+        distance = np.full((hyp_size + 1, width + 1), hyp_size + ref_size + 1, dtype=int)
+        distance[:min(hyp_size, below) + 1, 0] = np.arange(min(hyp_size, below) + 1)
+        distance[0, :min(ref_size, above) + 1] = np.arange(min(ref_size, above) + 1)
+
+        cumulative_deletion_cost = np.concatenate([[0], np.cumsum(deletion_cost)])
+        for i in range(1, hyp_size + 1):
+            start, stop = max(0, i - below), min(ref_size, i + above) + 1
+            first = max(start, 1)
+            offset, previous_offset = offsets[i], offsets[i - 1]
+            candidates = np.minimum(
+                distance[i - 1, first - 1 - previous_offset:stop - 1 - previous_offset]
+                + ~is_hyp_word_in_ref[i, first - offset:stop - offset],
+                distance[i - 1, first - previous_offset:stop - previous_offset] + 1
+            )
+            if start == 0:
+                candidates = np.concatenate([[i], candidates])
+            cumulative = cumulative_deletion_cost[start:stop]
+            distance[i, start - offset:stop - offset] = np.minimum.accumulate(candidates - cumulative) + cumulative
 
-        return edges
+        return distance[:, :width], offsets, is_hyp_word_in_ref
 
     @staticmethod
-    def _get_edges_for_words(words: List[str]) -> List[AlignmentEdge]:
-        return [AlignmentEdge(word, 1) for word in words]
+    def _is_band_optimal(cost: int, hyp_size: int, deletion_cost: npt.NDArray[np.int_], band: int) -> bool:
+        """Checks that every path leaving the band costs more than `cost` of the one found within it.
+
+        A path leaving the band passes through a cell right next to it, and a path through the cell `(i, j)`
+        costs at least its insertions and its deletions of slots without the empty token on both sides of
+        the cell. Then no optimal path leaves the band, and the backtracking over the banded table is the same.
+        """
+        ref_size = len(deletion_cost)
+        below, above = ROVER._get_band_limits(hyp_size, ref_size, band)
+
+        rows = np.arange(hyp_size + 1)
+        i = np.concatenate([rows[rows - below - 1 >= 0], rows[rows + above + 1 <= ref_size]])
+        j = np.concatenate([rows[rows - below - 1 >= 0] - below - 1, rows[rows + above + 1 <= ref_size] + above + 1])
+        if i.size == 0:
+            return True
+
+        cumulative_deletion_cost = np.concatenate([[0], np.cumsum(deletion_cost)])
+        costs = cumulative_deletion_cost[j]
+        lower_bound = np.maximum.reduce([np.zeros_like(i), i - j, costs - i]) + np.maximum.reduce([
+            np.zeros_like(i),
+            (hyp_size - i) - (ref_size - j),
+            (cumulative_deletion_cost[-1] - costs) - (hyp_size - i)
+        ])
+        return bool(lower_bound.min() > cost)
 
     @staticmethod
     def _align(
-            ref_edges_sets: List[Dict[str, AlignmentEdge]],
-            hyp_edges: List[AlignmentEdge],
-            sources_count: int
-    ) -> List[Dict[str, AlignmentEdge]]:
+            wtn: '_WordTransitionNetwork',
+            hyp: npt.NDArray[np.int_],
+            sources_weight: float,
+            weight: float,
+            band: Optional[int] = None
+    ) -> '_WordTransitionNetwork':
         """Sequence alignment algorithm implementation.
 
-        Aligns a sequence of sets of tokens (edges) with a sequence of tokens using dynamic programming algorithm. Look
+        Aligns a word transition network with a sequence of tokens using dynamic programming algorithm. Look
         for section 2.1 in <https://doi.org/10.1109/ASRU.1997.659110> for implementation details. Penalty for
-        insert/deletion or mismatch is 1.
+        insert/deletion or mismatch is 1. Tokens are integer ids, the id 0 stands for the empty token.
 
         Args:
-           ref_edges_sets: Sequence of sets formed from previously aligned sequences.
-           hyp_edges: Tokens from hypothesis (currently aligned) sequence.
-           sources_count: Number of previously aligned sequences.
+           wtn: Word transition network formed from previously aligned sequences.
+           hyp: Token ids of hypothesis (currently aligned) sequence.
+           sources_weight: Total weight of previously aligned sequences.
+           weight: Weight of the hypothesis.
+           band: Width of the band around the diagonal the dynamic programming table is filled within.
         """
 
-        distance = np.zeros((len(hyp_edges) + 1, len(ref_edges_sets) + 1))
-        distance[:, 0] = np.arange(len(hyp_edges) + 1)
-        distance[0, :] = np.arange(len(ref_edges_sets) + 1)
+        slots = wtn.slots
+        n_tokens = max(wtn.tokens.max(initial=_EMPTY), hyp.max(initial=_EMPTY)) + 1
+        ref_keys = ROVER._get_ref_keys(slots, wtn.tokens, n_tokens)
 
-        memoization: List[List[Optional[Tuple[AlignmentAction, Dict[str, AlignmentEdge], AlignmentEdge]]]] = [
-            [None] * (len(ref_edges_sets) + 1) for _ in range(len(hyp_edges) + 1)
-        ]
+        deletion_cost = np.ones(len(wtn), dtype=int)
+        deletion_cost[slots[wtn.tokens == _EMPTY]] = 0
 
-        for i, hyp_edge in enumerate(hyp_edges, start=1):
-            memoization[i][0] = (
-                AlignmentAction.INSERTION,
-                {'': AlignmentEdge('', sources_count)},
-                hyp_edge,
-            )
-        for i, ref_edges in enumerate(ref_edges_sets, start=1):
-            memoization[0][i] = (
-                AlignmentAction.DELETION,
-                ref_edges,
-                AlignmentEdge('', 1),
-            )
+        window, offsets, is_hyp_word_in_ref = ROVER._get_distances(hyp, ref_keys, n_tokens, deletion_cost, band)
+        out_of_window = len(hyp) + len(wtn) + 1
 
-        # find alignment minimal cost using dynamic programming algorithm
-        for i, hyp_edge in enumerate(hyp_edges, start=1):
-            hyp_word = hyp_edge and hyp_edge.value
-            for j, ref_edges in enumerate(ref_edges_sets, start=1):
-                ref_words_set = ref_edges.keys()
-                is_hyp_word_in_ref = hyp_word in ref_words_set
-
-                options = []
-
-                if is_hyp_word_in_ref:
-                    options.append((
-                        distance[i - 1, j - 1],
-                        (
-                            AlignmentAction.CORRECT,
-                            ref_edges,
-                            hyp_edge,
-                        )
-                    ))
-                else:
-                    options.append((
-                        distance[i - 1, j - 1] + 1,
-                        (
-                            AlignmentAction.SUBSTITUTION,
-                            ref_edges,
-                            hyp_edge,
-                        )
-                    ))
-                options.append((
-                    distance[i, j - 1] + ('' not in ref_edges),
-                    (
-                        AlignmentAction.DELETION,
-                        ref_edges,
-                        AlignmentEdge('', 1),
-                    )
-                ))
-                options.append((
-                    distance[i - 1, j] + 1,
-                    (
-                        AlignmentAction.INSERTION,
-                        {'': AlignmentEdge('', sources_count)},
-                        hyp_edge,
-                    )
-                ))
-
-                distance[i, j], memoization[i][j] = min(options, key=lambda t: t[0])  # type: ignore
-
-        alignment = []
-        i = len(hyp_edges)
-        j = len(ref_edges_sets)
-
-        # reconstruct answer from dp array
+        def distance(i: int, j: int) -> int:
+            k = j - offsets[i]
+            return int(window[i, k]) if 0 <= k < window.shape[1] else out_of_window
+
+        # slots of the network joined with the new slots, -1 for insertions, and the aligned hypothesis tokens
+        ref_slots = []
+        hyp_words = []
+        i = len(hyp)
+        j = len(wtn)
+
+        # reconstruct answer from dp array, preferring correct/substitution, then deletion, then insertion
         while i != 0 or j != 0:
-            action, ref_edges, hyp_edge = cast(Tuple[AlignmentAction, Dict[str, AlignmentEdge], AlignmentEdge],
-                                               memoization[i][j])
-            joined_edges = deepcopy(ref_edges)
-            hyp_edge_word = hyp_edge.value
-            if hyp_edge_word not in joined_edges:
-                joined_edges[hyp_edge_word] = hyp_edge
+            if i == 0:
+                action = AlignmentAction.DELETION
+            elif j == 0:
+                action = AlignmentAction.INSERTION
+            elif distance(i, j) == distance(i - 1, j - 1) + (not is_hyp_word_in_ref[i, j - offsets[i]]):
+                action = AlignmentAction.CORRECT if is_hyp_word_in_ref[i, j - offsets[i]] else AlignmentAction.SUBSTITUTION
+            elif distance(i, j) == distance(i, j - 1) + deletion_cost[j - 1]:
+                action = AlignmentAction.DELETION
             else:
-                # if word is already in set increment sources count for future score calculation
-                joined_edges[hyp_edge_word].sources_count += 1  # type: ignore
-            alignment.append(joined_edges)
+                action = AlignmentAction.INSERTION
+
+            ref_slots.append(-1 if action == AlignmentAction.INSERTION else j - 1)
+            hyp_words.append(_EMPTY if action == AlignmentAction.DELETION else hyp[i - 1])
             if action == AlignmentAction.CORRECT or action == AlignmentAction.SUBSTITUTION:
                 i -= 1
                 j -= 1
@@ -236,12 +407,69 @@ class ROVER(BaseTextsAggregator):
             else:
                 j -= 1
 
-        return alignment[::-1]
+        return wtn.join(np.array(ref_slots[::-1], dtype=int), np.array(hyp_words[::-1], dtype=int),
+                        sources_weight, weight)
 
     @staticmethod
-    def _get_result(edges: List[Dict[str, AlignmentEdge]]) -> List[str]:
-        result = []
-        for edges_set in edges:
-            _, _, value = max((x.sources_count, len(x.value), x.value) for x in edges_set.values())
-            result.append(value)
-        return result
+    def _get_result(wtn: '_WordTransitionNetwork', vocabulary: List[str]) -> List[str]:
+        # ties of weights are broken in favour of the longest and then the lexicographically greatest token
+        rank = np.empty(len(vocabulary), dtype=int)
+        rank[sorted(range(len(vocabulary)), key=lambda token: (len(vocabulary[token]), vocabulary[token]))] = \
+            np.arange(len(vocabulary))
+
+        order = np.lexsort((rank[wtn.tokens], wtn.weights, wtn.slots))
+        return [vocabulary[token] for token in wtn.tokens[order[wtn.indptr[1:] - 1]].tolist()]
+
+
+def _segment_arange(sizes: npt.NDArray[np.int_]) -> npt.NDArray[np.int_]:
+    """Concatenates `np.arange(size)` for all the sizes."""
+    return np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+
+
+@attr.s(slots=True)
+class _WordTransitionNetwork:
+    """Word transition network stored as parallel arrays of arcs sorted by slots.
+
+    The arcs of the `j`-th slot hold the token ids `tokens[indptr[j]:indptr[j + 1]]`, and
+    `weights[indptr[j]:indptr[j + 1]]` are the total weights of the hypotheses passing through them.
+    """
+
+    indptr: npt.NDArray[np.int_] = attr.ib()
+    tokens: npt.NDArray[np.int_] = attr.ib()
+    weights: npt.NDArray[Any] = attr.ib()
+
+    def __len__(self) -> int:
+        return len(self.indptr) - 1
+
+    @property
+    def slots(self) -> npt.NDArray[np.int_]:
+        """The slot of every arc."""
+        return np.repeat(np.arange(len(self)), np.diff(self.indptr))
+
+    def join(self, ref_slots: npt.NDArray[np.int_], hyp_words: npt.NDArray[np.int_],
+             sources_weight: float, weight: float) -> '_WordTransitionNetwork':
+        """Builds the network of an alignment with a hypothesis.
+
+        Every new slot copies the arcs of the slot `ref_slots[k]`, or gets the empty token passed by all the
+        previous hypotheses if it is an insertion (`ref_slots[k] == -1`). Then the hypothesis token
+        `hyp_words[k]` is added to it with the weight of the hypothesis.
+        """
+        sizes = np.where(ref_slots >= 0, np.diff(self.indptr)[ref_slots], 0)
+        arcs = np.repeat(self.indptr[ref_slots], sizes) + _segment_arange(sizes)
+        insertions = np.flatnonzero(ref_slots < 0)
+
+        slots = np.concatenate([np.repeat(np.arange(ref_slots.size), sizes), insertions, np.arange(ref_slots.size)])
+        tokens = np.concatenate([self.tokens[arcs], np.full(insertions.size, _EMPTY), hyp_words])
+        weights = np.concatenate([
+            self.weights[arcs], np.full(insertions.size, sources_weight), np.full(ref_slots.size, weight)
+        ])
+
+        # merge the arcs of the same tokens within a slot
+        vocabulary_size = tokens.max(initial=_EMPTY) + 1
+        keys, inverse = np.unique(slots * vocabulary_size + tokens, return_inverse=True)
+        slots, tokens = np.divmod(keys, vocabulary_size)
+        return _WordTransitionNetwork(
+            np.concatenate([[0], np.cumsum(np.bincount(slots, minlength=ref_slots.size))]),
+            tokens,
+            np.bincount(inverse, weights, minlength=keys.size)
+        )
@@ -1,10 +1,12 @@
 __all__ = ['TextHRRASA']
 
-from typing import Callable, List, Any
+from typing import Callable, List, Any, Optional
 
 import numpy.typing as npt
 import pandas as pd
 
+from .caching import EmbeddingCache
+from .encoding import encode_texts
 from ..base import BaseTextsAggregator
 from ..embeddings.hrrasa import HRRASA, glue_similarity
 
@@ -18,11 +20,15 @@ class TextHRRASA(BaseTextsAggregator):
 
     Args:
         encoder: A callable that takes a text and returns a NumPy array containing the corresponding embedding.
+            If `batch_size` is specified, it takes a list of texts and returns a two-dimensional array of
+            their embeddings instead. Each distinct text is only encoded once.
         n_iter: A number of HRRASA iterations.
         lambda_emb: A weight of reliability calculated on embeddigs.
         lambda_out: A weight of reliability calculated on outputs.
         alpha: Confidence level of chi-squared distribution quantiles in beta parameter formula.
         calculate_ranks: If true, calculate additional attribute `ranks_`.
+        batch_size: If specified, a maximal number of texts passed to the encoder at once.
+        cache: An embedding cache the embeddings are looked up in before encoding.
 
     Examples:
         We suggest to use sentence encoders provided by [Sentence Transformers](https://www.sbert.net).
@@ -47,10 +53,13 @@ class TextHRRASA(BaseTextsAggregator):
             encoder: Callable[[str], npt.ArrayLike],
             n_iter: int = 100, tol: float = 1e-5, lambda_emb: float = 0.5, lambda_out: float = 0.5,
             alpha: float = 0.05, calculate_ranks: bool = False,
-            output_similarity: Callable[[str, List[List[str]]], float] = glue_similarity
+            output_similarity: Callable[[str, List[List[str]]], float] = glue_similarity,
+            batch_size: Optional[int] = None, cache: Optional[EmbeddingCache] = None
     ) -> None:
         super().__init__()
         self.encoder = encoder
+        self.batch_size = batch_size
+        self.cache = cache
         self._hrrasa = HRRASA(n_iter, tol, lambda_emb, lambda_out, alpha, calculate_ranks, output_similarity)
 
     def __getattr__(self, name: str) -> Any:
@@ -96,8 +105,9 @@ class TextHRRASA(BaseTextsAggregator):
 
     def _encode_data(self, data: pd.DataFrame) -> pd.DataFrame:
         data = data[['task', 'worker', 'output']]
-        data['embedding'] = data.output.apply(self.encoder)
-        return data
+        return data.assign(embedding=encode_texts(data.output, self.encoder, self.batch_size, self.cache))
 
-    def _encode_true_objects(self, true_objects: pd.Series) -> pd.Series:
-        return true_objects and true_objects.apply(self.encoder)
+    def _encode_true_objects(self, true_objects: Optional[pd.Series]) -> Optional[pd.Series]:
+        if true_objects is None:
+            return None
+        return encode_texts(true_objects, self.encoder, self.batch_size, self.cache)
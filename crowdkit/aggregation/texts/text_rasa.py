@@ -5,6 +5,8 @@ from typing import Callable, Optional, Any, List
 import numpy.typing as npt
 import pandas as pd
 
+from .caching import EmbeddingCache
+from .encoding import encode_texts
 from ..base import BaseTextsAggregator
 from ..embeddings.rasa import RASA
 
@@ -17,8 +19,12 @@ class TextRASA(BaseTextsAggregator):
 
     Args:
         encoder: A callable that takes a text and returns a NumPy array containing the corresponding embedding.
+            If `batch_size` is specified, it takes a list of texts and returns a two-dimensional array of
+            their embeddings instead. Each distinct text is only encoded once.
         n_iter: A number of RASA iterations.
         alpha: Confidence level of chi-squared distribution quantiles in beta parameter formula.
+        batch_size: If specified, a maximal number of texts passed to the encoder at once.
+        cache: An embedding cache the embeddings are looked up in before encoding.
 
     Examples:
         We suggest to use sentence encoders provided by [Sentence Transformers](https://www.sbert.net).
@@ -39,9 +45,12 @@ class TextRASA(BaseTextsAggregator):
         return self._rasa.loss_history_
 
     def __init__(self, encoder: Callable[[str], npt.NDArray[Any]],
-                 n_iter: int = 100, tol: float = 1e-5, alpha: float = 0.05):
+                 n_iter: int = 100, tol: float = 1e-5, alpha: float = 0.05,
+                 batch_size: Optional[int] = None, cache: Optional[EmbeddingCache] = None):
         super().__init__()
         self.encoder = encoder
+        self.batch_size = batch_size
+        self.cache = cache
         self._rasa = RASA(n_iter, tol, alpha)
 
     def __getattr__(self, name: str) -> Any:
@@ -103,8 +112,9 @@ class TextRASA(BaseTextsAggregator):
 
     def _encode_data(self, data: pd.DataFrame) -> pd.DataFrame:
         data = data[['task', 'worker', 'output']]
-        data['embedding'] = data.output.apply(self.encoder)
-        return data
+        return data.assign(embedding=encode_texts(data.output, self.encoder, self.batch_size, self.cache))
 
-    def _encode_true_objects(self, true_objects: pd.Series) -> pd.Series:
-        return true_objects and true_objects.apply(self.encoder)
+    def _encode_true_objects(self, true_objects: Optional[pd.Series]) -> Optional[pd.Series]:
+        if true_objects is None:
+            return None
+        return encode_texts(true_objects, self.encoder, self.batch_size, self.cache)
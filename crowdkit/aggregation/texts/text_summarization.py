@@ -2,14 +2,16 @@ __all__ = [
     'TextSummarization'
 ]
 
-import itertools
-from typing import Optional, cast
+import json
+import math
+from typing import Dict, List, Optional, Tuple, cast
 
 import attr
 import numpy as np
 import pandas as pd
 from transformers import PreTrainedTokenizer, PreTrainedModel  # type: ignore
 
+from .caching import GenerationCache
 from ..base import BaseTextsAggregator
 
 
@@ -19,7 +21,7 @@ class TextSummarization(BaseTextsAggregator):
 
     The method uses a pre-trained language model for summarization to aggregate crowdsourced texts.
     For each task, texts are concateneted by ` | ` token and passed as a model's input. If
-    `n_permutations` is not `None`, texts are random shuffled `n_permutations` times and then
+    `n_permutations` is not `None`, texts are shuffled in `n_permutations` distinct random orders and then
     outputs are aggregated with `permutation_aggregator` if provided. If `permutation_aggregator`
     is not provided, the resulting aggregate is the most common output over permuted inputs.
 
@@ -48,6 +50,17 @@ class TextSummarization(BaseTextsAggregator):
             Default value: `None`.
         device: Device to use such as `cpu` or `cuda`.
             Default value: `cpu`.
+        batch_size: Number of model inputs generated at once. The inputs of all the tasks and permutations are
+            sorted by their length before batching, so that the batches need little padding.
+            Default value: `1`.
+        random_state: Seed of the random generator the permutations are sampled with.
+            Default value: `0`.
+        cache: A cache of the generated outputs. The outputs are keyed by the model identifier,
+            `num_beams`, `concat_token` and the model input, so only new inputs are passed to the model.
+            Default value: `None`.
+        model_id: Identifier of the model the cached outputs are keyed by. If `None`, the model's
+            `name_or_path` is used. A cache cannot be used with a model having neither.
+            Default value: `None`.
     Example:
         >>> import torch
         >>> from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, AutoConfig
@@ -71,6 +84,10 @@ class TextSummarization(BaseTextsAggregator):
     n_permutations: Optional[int] = attr.ib(default=None)
     permutation_aggregator: Optional[BaseTextsAggregator] = attr.ib(default=None)
     device: str = attr.ib(default='cpu')
+    batch_size: int = attr.ib(default=1)
+    random_state: Optional[int] = attr.ib(default=0)
+    cache: Optional[GenerationCache] = attr.ib(default=None)
+    model_id: Optional[str] = attr.ib(default=None)
 
     # texts_
 
@@ -88,31 +105,106 @@ class TextSummarization(BaseTextsAggregator):
         data = data[['task', 'worker', 'text']]
 
         self.model = self.model.to(self.device)  # type: ignore
-        self.texts_ = data.groupby('task')['text'].apply(self._aggregate_one)
+        rng = np.random.default_rng(self.random_state)
+
+        tasks = []
+        tasks_inputs = []
+        for task, outputs in data.groupby('task')['text']:
+            tasks.append(task)
+            tasks_inputs.append(self._get_inputs(outputs, rng))
+
+        # identical inputs of different permutations and tasks are generated once
+        unique_inputs = list(dict.fromkeys(text for inputs in tasks_inputs for text in inputs))
+        generated = self._get_cached_outputs(unique_inputs)
+        missing = [text for text in unique_inputs if text not in generated]
+        generated_missing = dict(zip(missing, self._generate_outputs(missing)))
+        if self.cache is not None:
+            self.cache.update({self._get_cache_key(text): output for text, output in generated_missing.items()})
+        generated.update(generated_missing)
+        texts = [self._aggregate_generated([generated[text] for text in inputs]) for inputs in tasks_inputs]
+
+        self.texts_ = pd.Series(texts, index=pd.Index(tasks, name='task'), dtype=object)
         return self.texts_
 
-    def _aggregate_one(self, outputs: pd.Series) -> str:
+    def _get_inputs(self, outputs: pd.Series, rng: np.random.Generator) -> List[str]:
+        """Returns the model inputs of a task: its texts concatenated in one or several orders."""
         if not self.n_permutations:
-            return self._generate_output(outputs)
+            return [self.concat_token.join(outputs)]
 
-        generated_outputs = []
+        texts = outputs.tolist()
+        return [
+            self.concat_token.join(texts[i] for i in permutation)
+            for permutation in _sample_permutations(len(texts), self.n_permutations, rng)
+        ]
 
-        # TODO: generate only `n_permutations` permutations
-        permutations = list(itertools.permutations(outputs))
-        permutations_idx = np.random.choice(len(permutations), size=self.n_permutations, replace=False)
-        permutations = [permutations[i] for i in permutations_idx]
-        for permutation in permutations:
-            generated_outputs.append(self._generate_output(permutation))
+    def _aggregate_generated(self, generated_outputs: List[str]) -> str:
+        """Aggregates the outputs generated for the permutations of a task."""
+        if not self.n_permutations:
+            return generated_outputs[0]
 
         data = pd.DataFrame({'task': [''] * len(generated_outputs), 'text': generated_outputs})
 
         if self.permutation_aggregator is not None:
             return cast(str, self.permutation_aggregator.fit_predict(data)[''])
 
-        return cast(str, data.text.mode())
-
-    def _generate_output(self, permutation: pd.Series) -> str:
-        input_text = self.concat_token.join(permutation)
-        input_ids = self.tokenizer.encode(input_text, return_tensors='pt').to(self.device)
-        outputs = self.model.generate(input_ids, num_beams=self.num_beams)  # type: ignore
-        return cast(str, self.tokenizer.decode(outputs[0], skip_special_tokens=True))
+        return cast(str, data.text.mode()[0])
+
+    def _get_cached_outputs(self, inputs: List[str]) -> Dict[str, str]:
+        """Returns the cached outputs of the inputs found in the cache."""
+        if self.cache is None:
+            return {}
+        keys = {self._get_cache_key(text): text for text in inputs}
+        return {keys[key]: output for key, output in self.cache.get(keys).items()}
+
+    def _get_cache_key(self, text: str) -> str:
+        model_id = self.model_id or getattr(self.model, 'name_or_path', None)
+        if not model_id:
+            raise ValueError('The model has no name_or_path, model_id must be specified to use the cache.')
+        return json.dumps([model_id, self.num_beams, self.concat_token, text])
+
+    def _generate_outputs(self, inputs: List[str]) -> List[str]:
+        """Generates the outputs for the inputs in batches of inputs of similar lengths."""
+        if not inputs:
+            return []
+
+        input_ids = self.tokenizer(inputs)['input_ids']
+        order = sorted(range(len(inputs)), key=lambda i: len(input_ids[i]))
+
+        outputs = [''] * len(inputs)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            encoded = self.tokenizer.pad({'input_ids': [input_ids[i] for i in batch]}, return_tensors='pt')
+            generated = self.model.generate(**encoded.to(self.device), num_beams=self.num_beams)  # type: ignore
+            for i, output in zip(batch, self.tokenizer.batch_decode(generated, skip_special_tokens=True)):
+                outputs[i] = output
+        return outputs
+
+
+def _sample_permutations(n: int, k: int, rng: np.random.Generator) -> List[Tuple[int, ...]]:
+    """Samples `k` distinct random permutations of `n` items without enumerating all of them."""
+    n_permutations = math.factorial(n)
+    if k > n_permutations:
+        raise ValueError(f'Cannot sample {k} distinct permutations of {n} texts')
+
+    # when most of the permutations are needed, sample their ranks, otherwise shuffle until k distinct ones are seen
+    if 2 * k > n_permutations:
+        return [_unrank_permutation(int(rank), n) for rank in rng.choice(n_permutations, size=k, replace=False)]
+
+    permutations: List[Tuple[int, ...]] = []
+    seen = set()
+    while len(permutations) < k:
+        permutation = tuple(int(i) for i in rng.permutation(n))
+        if permutation not in seen:
+            seen.add(permutation)
+            permutations.append(permutation)
+    return permutations
+
+
+def _unrank_permutation(rank: int, n: int) -> Tuple[int, ...]:
+    """Returns the permutation of `n` items with the given rank in the lexicographical order."""
+    items = list(range(n))
+    permutation = []
+    for i in range(n - 1, -1, -1):
+        index, rank = divmod(rank, math.factorial(i))
+        permutation.append(items.pop(index))
+    return tuple(permutation)
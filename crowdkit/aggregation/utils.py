@@ -7,16 +7,28 @@ __all__ = [
     'normalize_rows',
     'manage_data',
     'get_accuracy',
+    'get_accuracy_scores',
     'add_skills_to_data',
     'named_series_attrib',
+    'get_embeddings_matrix',
+    'get_known_embeddings',
+    'get_segment_sums',
+    'get_merged_components',
+    'add_sorted_counts',
+    'merge_sorted_counts',
+    'find_sorted_counts',
+    'check_answers',
+    'get_answer_skills',
 ]
 
-from typing import Tuple, Union, Callable, Optional, Any
+from typing import List, Tuple, Union, Callable, Optional, Any, cast
 
 import attr
 import numpy as np
 import numpy.typing as npt
 import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
 
 
 def _argmax_random_ties(array: npt.NDArray[Any]) -> int:
@@ -115,6 +127,28 @@ def get_accuracy(data: pd.DataFrame, true_labels: pd.Series, by: Optional[str] =
         Series: workers' skills.
             A pandas.Series index by workers and holding corresponding worker's skill
     """
+    data = get_accuracy_scores(data, true_labels)
+
+    if by is not None:
+        data = data.groupby(by)
+
+    return data.score.sum() / data.weight.sum()
+
+
+def get_accuracy_scores(data: pd.DataFrame, true_labels: pd.Series) -> pd.DataFrame:
+    """Scores the answers against the ground truth labels, the accuracy is the ratio of the scores and the weights.
+
+    Args:
+        data (DataFrame): Workers' labeling results.
+            A pandas.DataFrame containing `task`, `worker` and `label` columns and optionally `weight` column.
+        true_labels (Series): Tasks' ground truth labels.
+            A pandas.Series indexed by `task` such that `labels.loc[task]`
+            is the tasks's ground truth label.
+
+    Returns:
+        DataFrame: The answers to the tasks with known labels with `weight` and `score` columns,
+            the score being the weight of a correct answer and zero otherwise.
+    """
     if 'weight' in data.columns:
         data = data[['task', 'worker', 'label', 'weight']]
     else:
@@ -133,10 +167,7 @@ def get_accuracy(data: pd.DataFrame, true_labels: pd.Series, by: Optional[str] =
 
     data = data.sort_values('score').drop_duplicates(['task', 'worker', 'label'], keep='last')
 
-    if by is not None:
-        data = data.groupby(by)
-
-    return data.score.sum() / data.weight.sum()
+    return data
 
 
 def named_series_attrib(name: str) -> pd.Series:
@@ -150,7 +181,7 @@ def named_series_attrib(name: str) -> pd.Series:
 
 
 def add_skills_to_data(data: pd.DataFrame, skills: pd.Series, on_missing_skill: str,
-                       default_skill: float) -> pd.DataFrame:
+                       default_skill: Optional[float] = None) -> pd.DataFrame:
     """Args:
         skills (Series): workers' skills.
             A pandas.Series index by workers and holding corresponding worker's skill
@@ -160,6 +191,7 @@ def add_skills_to_data(data: pd.DataFrame, skills: pd.Series, on_missing_skill:
                     * "ignore" — drop assignments with unknown skill values during prediction. Raise an exception if there is no
                     assignments with known skill for any task;
                     * value — default value will be used if skill is missing.
+        default_skill (float): The skill of the workers missing from `skills`, only used if `on_missing_skill` is "value".
     """
     data = data.join(skills.rename('skill'), on='worker')
 
@@ -191,3 +223,201 @@ def add_skills_to_data(data: pd.DataFrame, skills: pd.Series, on_missing_skill:
     else:
         raise ValueError(f'Unknown option {on_missing_skill!r} of "on_missing_skill" argument.')
     return data
+
+
+def get_embeddings_matrix(embeddings: pd.Series, index: Optional[pd.Index] = None) -> npt.NDArray[Any]:
+    """Stacks the embeddings into a contiguous float matrix, one embedding per row.
+
+    Args:
+        embeddings (Series): Embeddings as one-dimensional NumPy arrays of the same size.
+        index (Index): If specified, the rows follow this index, and the rows of its items missing
+            in `embeddings` are filled with NaN.
+
+    Returns:
+        ndarray: A matrix of shape `(n, dim)`.
+    """
+    if index is None:
+        if embeddings.empty:
+            return np.empty((0, 0))
+        return np.vstack(embeddings.values).astype(float)
+
+    positions = embeddings.index.get_indexer(index)
+    found = positions >= 0
+    found_embeddings = get_embeddings_matrix(embeddings.iloc[positions[found]])
+    matrix = np.full((len(index), found_embeddings.shape[1]), np.nan)
+    matrix[found] = found_embeddings
+    return matrix
+
+
+def get_known_embeddings(embeddings: Optional[pd.Series],
+                         index: pd.Index) -> Tuple[npt.NDArray[Any], npt.NDArray[Any]]:
+    """Finds the items of the index with known embeddings, e.g. the tasks with ground truth.
+
+    Args:
+        embeddings (Series): Known embeddings, possibly of the items not present in the index.
+        index (Index): Items to look the embeddings up for.
+
+    Returns:
+        Tuple[ndarray, ndarray]: Positions of the found items in the index and the matrix of their embeddings.
+    """
+    if embeddings is None:
+        return np.array([], dtype=int), np.empty((0, 0))
+    positions = index.get_indexer(embeddings.index)
+    found = positions >= 0
+    return positions[found], get_embeddings_matrix(embeddings[found])
+
+
+def get_segment_sums(values: npt.NDArray[Any], codes: npt.NDArray[Any], size: int,
+                     weights: Optional[npt.NDArray[Any]] = None) -> npt.NDArray[Any]:
+    """Sums the rows of a matrix that have the same codes.
+
+    Args:
+        values (ndarray): A matrix of shape `(n, dim)`.
+        codes (ndarray): Integer codes of the rows from `0` to `size - 1`.
+        size (int): The number of distinct codes.
+        weights (ndarray): If specified, the rows are multiplied by these weights before summation.
+
+    Returns:
+        ndarray: A matrix of shape `(size, dim)` such that its `i`-th row is the sum of rows coded by `i`.
+    """
+    if weights is None:
+        weights = np.ones(len(codes))
+    indicator = sp.csr_matrix((weights, (codes, np.arange(len(codes)))), shape=(size, len(codes)))
+    return np.asarray(indicator @ values)
+
+
+def get_merged_components(components: npt.NDArray[Any], first: npt.NDArray[Any],
+                          second: npt.NDArray[Any]) -> npt.NDArray[Any]:
+    """Updates the connected components of a graph after adding edges to it.
+
+    Only the components linked by the new edges are merged, so the graph itself is not traversed.
+
+    Args:
+        components (ndarray): Component ids of the nodes from `0` to the number of components minus one.
+        first (ndarray): The first nodes of the new edges.
+        second (ndarray): The second nodes of the new edges.
+
+    Returns:
+        ndarray: Component ids of the nodes from `0` to the number of components minus one. Each merged
+            component gets the smallest id of the components it consists of, the other ids are shifted
+            to fill the gaps.
+    """
+    if not first.size:
+        return components
+
+    linked, codes = np.unique(components[np.concatenate([first, second])], return_inverse=True)
+    codes = codes.reshape(2, -1)
+    graph = sp.coo_matrix((np.ones(first.size), (codes[0], codes[1])), shape=(linked.size, linked.size))
+    _, merged = connected_components(graph, directed=False)
+
+    ids = np.arange(components.max() + 1)
+    smallest = np.full(merged.max() + 1, ids.size)
+    np.minimum.at(smallest, merged, linked)
+    ids[linked] = smallest[merged]
+
+    is_kept = ids == np.arange(ids.size)
+    return cast(npt.NDArray[Any], (np.cumsum(is_kept) - 1)[ids][components])
+
+
+def add_sorted_counts(runs: List[Tuple[npt.NDArray[Any], npt.NDArray[Any]]], keys: npt.NDArray[Any],
+                      counts: npt.NDArray[Any]) -> List[Tuple[npt.NDArray[Any], npt.NDArray[Any]]]:
+    """Adds the counts of integer keys to the ones kept as sorted runs.
+
+    The new keys form a run of their own, and the last two runs are merged while the last one is at least
+    half as long as the one before it. So the runs get shorter from the oldest to the newest, there are
+    logarithmically many of them, and the time of an addition amortized over the previous ones is
+    proportional to the number of the added keys times the logarithm of the number of all the keys.
+    A key may be present in several runs, its count is the sum of its counts in them.
+
+    Args:
+        runs (List[Tuple[ndarray, ndarray]]): Runs of sorted distinct keys and their counts, from the oldest one.
+        keys (ndarray): Sorted distinct keys to add.
+        counts (ndarray): Counts of the keys to add.
+
+    Returns:
+        List[Tuple[ndarray, ndarray]]: The runs holding the new counts too.
+    """
+    if not keys.size:
+        return runs
+
+    runs = runs + [(keys, counts)]
+    while len(runs) > 1 and 2 * runs[-1][0].size >= runs[-2][0].size:
+        runs = runs[:-2] + [merge_sorted_counts(runs[-2:])]
+    return runs
+
+
+def merge_sorted_counts(runs: List[Tuple[npt.NDArray[Any], npt.NDArray[Any]]]) -> Tuple[npt.NDArray[Any],
+                                                                                        npt.NDArray[Any]]:
+    """Merges the runs of `add_sorted_counts` into one.
+
+    Returns:
+        Tuple[ndarray, ndarray]: Sorted distinct keys and their total counts.
+    """
+    if not runs:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+
+    keys, inverse = np.unique(np.concatenate([keys for keys, _ in runs]), return_inverse=True)
+    counts = np.bincount(inverse.ravel(), weights=np.concatenate([counts for _, counts in runs]), minlength=keys.size)
+    return keys, counts
+
+
+def find_sorted_counts(runs: List[Tuple[npt.NDArray[Any], npt.NDArray[Any]]], starts: npt.NDArray[Any],
+                       ends: npt.NDArray[Any]) -> Tuple[npt.NDArray[Any], npt.NDArray[Any], npt.NDArray[Any]]:
+    """Finds the keys of the runs of `add_sorted_counts` within the given ranges by binary searches.
+
+    Args:
+        runs (List[Tuple[ndarray, ndarray]]): Runs of sorted distinct keys and their counts.
+        starts (ndarray): The smallest keys of the ranges.
+        ends (ndarray): The keys following the largest ones of the ranges.
+
+    Returns:
+        Tuple[ndarray, ndarray, ndarray]: The found keys, their counts in the runs and the indices of their
+            ranges. A key is found once per run it is present in.
+    """
+    found = [(np.empty(0, dtype=np.int64), np.empty(0), np.empty(0, dtype=int))]
+    for keys, counts in runs:
+        lows = np.searchsorted(keys, starts)
+        sizes = np.searchsorted(keys, ends) - lows
+        positions = np.repeat(lows - np.cumsum(sizes) + sizes, sizes) + np.arange(sizes.sum())
+        found.append((keys[positions], counts[positions], np.repeat(np.arange(starts.size), sizes)))
+
+    found_keys, found_counts, ranges = (np.concatenate(parts) for parts in zip(*found))
+    return found_keys, found_counts, ranges
+
+
+def check_answers(answers: pd.DataFrame) -> None:
+    """Checks that the answers are a data frame containing `task`, `worker` and `label` columns.
+
+    Raises:
+        TypeError: If the answers are not a data frame.
+        AssertionError: If some of the columns are missing.
+    """
+    if not isinstance(answers, pd.DataFrame):
+        raise TypeError('Working only with pandas DataFrame')
+    assert 'task' in answers, 'There is no "task" column in answers'
+    assert 'worker' in answers, 'There is no "worker" column in answers'
+    assert 'label' in answers, 'There is no "label" column in answers'
+
+
+def get_answer_skills(answers: pd.DataFrame, workers_skills: Optional[pd.Series]) -> npt.NDArray[Any]:
+    """Looks up the skills of the workers who gave the answers.
+
+    Args:
+        answers (DataFrame): A data frame containing a `worker` column.
+        workers_skills (Series): Workers' skills indexed by workers. If not specified, all the skills are equal to one.
+
+    Returns:
+        ndarray: The skill of the worker of every answer.
+
+    Raises:
+        AssertionError: If some of the workers have no skill.
+    """
+    if workers_skills is None:
+        return np.ones(len(answers))
+
+    skills = workers_skills.reindex(answers['worker']).to_numpy(dtype=float)
+    if np.isnan(skills).any():
+        missing_workers = set(answers['worker'][np.isnan(skills)])
+        raise AssertionError(f'Did not provide skills for workers: {missing_workers}.'
+                             f'Please provide workers skills.')
+    return cast(npt.NDArray[Any], skills)
@@ -1,3 +1,12 @@
-from typing import List
+from typing import TYPE_CHECKING
 
-__all__: List[str] = []
+from .._lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from .bootstrap import bootstrap_confidence_interval
+
+__all__ = ['bootstrap_confidence_interval']
+
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'bootstrap_confidence_interval': '.bootstrap',
+})
@@ -0,0 +1,199 @@
+__all__ = [
+    'bootstrap_confidence_interval',
+]
+
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple, Union
+
+import attr
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+import scipy.sparse as sp
+
+from crowdkit.aggregation import MajorityVote
+from crowdkit.aggregation.base import BaseClassificationAggregator
+from crowdkit.aggregation.utils import check_answers, get_accuracy_scores
+from .data._classification import (
+    _get_alpha, _get_consistencies, _get_distance_matrix, _get_task_coincidences,
+    alpha_krippendorff, consistency
+)
+from .workers.accuracy_on_aggregates import accuracy_on_aggregates
+
+# the largest fraction of undefined replicates the interval is computed without
+_MAX_NAN_FRACTION = 0.05
+
+
+@attr.s(frozen=True)
+class _RatioStatistic:
+    """A ratio of the weighted sums of the tasks' numerators and denominators."""
+
+    numerators: npt.NDArray[Any] = attr.ib()
+    denominators: npt.NDArray[Any] = attr.ib()
+
+    def __len__(self) -> int:
+        return len(self.numerators)
+
+    def __call__(self, weights: npt.NDArray[Any]) -> float:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return float(weights @ self.numerators / (weights @ self.denominators))
+
+
+@attr.s(frozen=True)
+class _AlphaStatistic:
+    """Krippendorff's alpha of the weighted sum of the tasks' coincidence matrices."""
+
+    coincidences: sp.csr_matrix = attr.ib()
+    labels: npt.NDArray[Any] = attr.ib()
+    # the ordinal distances depend on the numbers of the values, so they are computed for every replicate
+    distance: Union[str, npt.NDArray[Any]] = attr.ib()
+
+    def __len__(self) -> int:
+        return int(self.coincidences.shape[0])
+
+    def __call__(self, weights: npt.NDArray[Any]) -> float:
+        n_labels = len(self.labels)
+        coincidences = np.asarray(self.coincidences.T @ weights).reshape(n_labels, n_labels)
+        return _get_alpha(coincidences, self.labels, self.distance)
+
+
+_Statistic = Union[_RatioStatistic, _AlphaStatistic]
+
+
+def _get_alpha_statistic(answers: pd.DataFrame,
+                         distance: Union[str, Callable[[Hashable, Hashable], float]] = 'nominal') -> _AlphaStatistic:
+    task_codes, tasks = pd.factorize(answers['task'])
+    label_codes, labels = pd.factorize(answers['label'])
+    if len(labels) < 2:
+        raise ValueError('Cannot bootstrap alpha of a single label.')
+
+    # only the tasks with pairable values are resampled
+    coincidences = _get_task_coincidences(task_codes, len(tasks), label_codes, len(labels))
+    coincidences = coincidences[coincidences.getnnz(axis=1) > 0]
+
+    labels = np.asarray(labels)
+    # callables are evaluated once and are not passed to the processes
+    distance_matrix = distance if distance == 'ordinal' else _get_distance_matrix(labels, np.ones(len(labels)), distance)
+    return _AlphaStatistic(coincidences, labels, distance_matrix)
+
+
+def _get_consistency_statistic(answers: pd.DataFrame, workers_skills: Optional[pd.Series] = None,
+                               aggregator: BaseClassificationAggregator = MajorityVote()) -> _RatioStatistic:
+    consistencies = _get_consistencies(answers, workers_skills, aggregator).to_numpy()
+    return _RatioStatistic(consistencies, np.ones(len(consistencies)))
+
+
+def _get_accuracy_statistic(answers: pd.DataFrame,
+                            aggregator: Optional[BaseClassificationAggregator] = MajorityVote(),
+                            aggregates: Optional[pd.Series] = None) -> _RatioStatistic:
+    if aggregates is None and aggregator is None:
+        raise AssertionError('One of aggregator or aggregates should be not None')
+
+    if aggregates is None:
+        aggregates = aggregator.fit_predict(answers)  # type: ignore
+
+    scores = get_accuracy_scores(answers, aggregates).groupby('task')[['score', 'weight']].sum()
+    return _RatioStatistic(scores['score'].to_numpy(dtype=float), scores['weight'].to_numpy(dtype=float))
+
+
+_STATISTICS: Dict[Callable[..., Union[float, pd.Series]], Callable[..., _Statistic]] = {
+    accuracy_on_aggregates: _get_accuracy_statistic,
+    alpha_krippendorff: _get_alpha_statistic,
+    consistency: _get_consistency_statistic,
+}
+
+# the statistic of the process, it is only sent to every process once
+_statistic: Optional[_Statistic] = None
+
+
+def _set_statistic(statistic: _Statistic) -> None:
+    global _statistic
+    _statistic = statistic
+
+
+def _get_replicates(statistic: Optional[_Statistic], seed: np.random.SeedSequence,
+                    n_replicates: int) -> npt.NDArray[Any]:
+    """Evaluates the statistic on the tasks resampled with replacement."""
+    statistic = statistic or _statistic
+    assert statistic is not None
+
+    rng = np.random.default_rng(seed)
+    n_tasks = len(statistic)
+    return np.array([
+        statistic(np.bincount(rng.integers(0, n_tasks, size=n_tasks), minlength=n_tasks).astype(float))
+        for _ in range(n_replicates)
+    ])
+
+
+def bootstrap_confidence_interval(
+    answers: pd.DataFrame,
+    metric: Callable[..., Union[float, pd.Series]],
+    n_replicates: int = 1000,
+    confidence: float = 0.95,
+    n_jobs: int = 1,
+    chunk_size: int = 50,
+    random_state: Optional[int] = 0,
+    **kwargs: Any
+) -> Tuple[float, float]:
+    """Bootstrap confidence interval of a metric.
+
+    The tasks are resampled with replacement together with all their answers (cluster bootstrap).
+    The per-task sufficient statistics of the metric are computed once, so every replicate is only
+    a weighted sum over the tasks. The aggregator, if any, is also fitted once on all the answers.
+    The interval is given by the percentiles of the replicates.
+
+    A replicate is undefined if the metric is, e.g. the accuracy of resampled tasks whose answers all have zero weight.
+    The undefined replicates are excluded with a warning, unless there are more than 5% of them.
+
+    Supported metrics are `alpha_krippendorff`, `consistency` and `accuracy_on_aggregates`.
+
+    Args:
+        answers: A data frame containing `task`, `worker` and `label` columns.
+        metric: The metric function.
+        n_replicates: A number of bootstrap replicates.
+        confidence: A confidence level of the interval.
+        n_jobs: A number of processes the replicates are computed in.
+        chunk_size: A number of replicates computed by a process at once. The replicates of a chunk share
+            a random generator, so the result does not depend on `n_jobs`.
+        random_state: Seed of the random generator the tasks are resampled with.
+        **kwargs: Keyword arguments of the metric, except for the ones returning per-task or per-worker values.
+
+    Returns:
+        Tuple[float, float]: The lower and the upper bounds of the interval.
+
+    Raises:
+        ValueError: If the metric is not supported or more than 5% of the replicates are undefined.
+
+    Examples:
+        >>> from crowdkit.datasets import load_dataset
+        >>> from crowdkit.metrics import bootstrap_confidence_interval
+        >>> from crowdkit.metrics.data import alpha_krippendorff
+        >>> df, gt = load_dataset('relevance-2')
+        >>> bootstrap_confidence_interval(df, alpha_krippendorff, n_jobs=4)
+    """
+    check_answers(answers)
+    if metric not in _STATISTICS:
+        raise ValueError(f'Bootstrap of {getattr(metric, "__name__", metric)!r} is not supported.')
+
+    statistic = _STATISTICS[metric](answers, **kwargs)
+
+    sizes = [min(chunk_size, n_replicates - start) for start in range(0, n_replicates, chunk_size)]
+    seeds = np.random.SeedSequence(random_state).spawn(len(sizes))
+    if n_jobs == 1:
+        replicates = list(map(_get_replicates, repeat(statistic), seeds, sizes))
+    else:
+        with ProcessPoolExecutor(max_workers=n_jobs, initializer=_set_statistic, initargs=(statistic,)) as executor:
+            replicates = list(executor.map(_get_replicates, repeat(None), seeds, sizes))
+
+    values = np.concatenate(replicates)
+    n_undefined = np.isnan(values).sum()
+    if n_undefined > _MAX_NAN_FRACTION * n_replicates:
+        raise ValueError(f'The metric is undefined in {n_undefined} of {n_replicates} replicates.')
+    if n_undefined:
+        warnings.warn(f'The metric is undefined in {n_undefined} of {n_replicates} replicates, '
+                      'they are excluded from the interval.')
+
+    lower, upper = np.percentile(values[~np.isnan(values)], [50 * (1 - confidence), 50 * (1 + confidence)])
+    return float(lower), float(upper)
@@ -1,3 +1,15 @@
-from ._classification import alpha_krippendorff, consistency, uncertainty
+from typing import TYPE_CHECKING
+
+from ..._lazy import lazy_attributes
+
+if TYPE_CHECKING:
+    from ._classification import alpha_krippendorff, consistency, uncertainty
 
 __all__ = ['alpha_krippendorff', 'consistency', 'uncertainty']
+
+# the metrics and their dependencies are only imported on the first access
+__getattr__, __dir__ = lazy_attributes(__name__, {
+    'alpha_krippendorff': '._classification',
+    'consistency': '._classification',
+    'uncertainty': '._classification',
+})
@@ -4,40 +4,68 @@ __all__ = [
     'alpha_krippendorff',
 ]
 
-from typing import Any, Callable, Hashable, List, Optional, Tuple, Union
+from typing import Any, Callable, Hashable, Optional, Union
 
 import numpy as np
+import numpy.typing as npt
 import pandas as pd
-from nltk.metrics.agreement import AnnotationTask
-from nltk.metrics.distance import binary_distance
+import scipy.sparse as sp
 from scipy.stats import entropy
 
 from crowdkit.aggregation import MajorityVote
 from crowdkit.aggregation.base import BaseClassificationAggregator
+from crowdkit.aggregation.utils import check_answers, get_answer_skills, get_segment_sums
 
 
-def _check_answers(answers: pd.DataFrame) -> None:
-    if not isinstance(answers, pd.DataFrame):
-        raise TypeError('Working only with pandas DataFrame')
-    assert 'task' in answers, 'There is no "task" column in answers'
-    assert 'worker' in answers, 'There is no "worker" column in answers'
-    assert 'label' in answers, 'There is no "label" column in answers'
+def _get_label_probabilities(skills: npt.NDArray[Any], label_codes: npt.NDArray[Any],
+                             n_labels: int) -> npt.NDArray[Any]:
+    """Numerators in the Bayes formula: the probabilities of the answers given each of the labels is true.
 
+    Args:
+        skills (ndarray): Skills of the workers given the answers.
+        label_codes (ndarray): Integer codes of the answers' labels from `0` to `n_labels - 1`.
+        n_labels (int): The number of distinct labels.
 
-def _label_probability(row: pd.Series, label: Any, n_labels: int) -> float:
-    """Numerator in the Bayes formula"""
-    if row['label'] == label:
-        return float(row['skill'])
-    else:
-        return (1. - float(row['skill'])) / (n_labels - 1)
+    Returns:
+        ndarray: A matrix of shape `(len(label_codes), n_labels)`.
+    """
+    probabilities = np.repeat(((1. - skills) / max(n_labels - 1, 1))[:, np.newaxis], n_labels, axis=1)
+    probabilities[np.arange(len(label_codes)), label_codes] = skills
+    return probabilities
 
 
-def _task_consistency(row: pd.Series) -> float:
-    """Posterior probability for a single task"""
-    if row['denominator'] != 0:
-        return float(row[row['aggregated_label']]) / float(row['denominator'])
-    else:
-        return 0.
+def _get_consistencies(answers: pd.DataFrame, workers_skills: Optional[pd.Series],
+                       aggregator: BaseClassificationAggregator) -> pd.Series:
+    """Posterior probabilities of the aggregated labels of the tasks."""
+    aggregated = aggregator.fit_predict(answers)
+    if workers_skills is None:
+        if hasattr(aggregator, 'skills_'):
+            workers_skills = aggregator.skills_  # type: ignore
+        else:
+            raise AssertionError('This aggregator is not supported. Please, provide workers skills.')
+
+    task_codes, tasks = pd.factorize(answers['task'], sort=True)
+    label_codes, labels = pd.factorize(answers['label'])
+    skills = workers_skills.reindex(answers['worker']).to_numpy(dtype=float)
+
+    # the likelihoods of the labels are products over the task's answers, so they are summed in log space
+    with np.errstate(divide='ignore'):
+        log_proba = np.log(_get_label_probabilities(skills, label_codes, len(labels)))
+    log_proba[np.isnan(log_proba)] = 0.  # the answers of workers without skills are ignored
+    log_proba = get_segment_sums(log_proba, task_codes, len(tasks))
+
+    # the posterior probabilities, the tasks with all the likelihoods being zero get zeros
+    with np.errstate(invalid='ignore'):
+        proba = np.exp(log_proba - log_proba.max(axis=1, keepdims=True))
+    proba[np.isnan(proba)] = 0.
+    denominator = proba.sum(axis=1)
+
+    aggregated_codes = pd.Index(labels).get_indexer(aggregated.reindex(tasks))
+    numerator = np.where(aggregated_codes >= 0, proba[np.arange(len(tasks)), aggregated_codes], np.nan)
+    return pd.Series(
+        np.divide(numerator, denominator, out=np.zeros(len(tasks)), where=denominator != 0),
+        index=pd.Index(tasks, name='task')
+    )
 
 
 def consistency(
@@ -60,29 +88,8 @@ def consistency(
     Returns:
         Union[float, pd.Series]
     """
-    _check_answers(answers)
-    aggregated = aggregator.fit_predict(answers)
-    if workers_skills is None:
-        if hasattr(aggregator, 'skills_'):
-            workers_skills = aggregator.skills_  # type: ignore
-        else:
-            raise AssertionError('This aggregator is not supported. Please, provide workers skills.')
-
-    answers = answers.copy(deep=False)
-    answers.set_index('task', inplace=True)
-    answers = answers.reset_index().set_index('worker')
-    answers['skill'] = workers_skills
-    answers.reset_index(inplace=True)
-
-    labels = pd.unique(answers.label)
-    for label in labels:
-        answers[label] = answers.apply(lambda row: _label_probability(row, label, len(labels)), axis=1)
-
-    labels_proba = answers.groupby('task').prod()
-    labels_proba['aggregated_label'] = aggregated
-    labels_proba['denominator'] = labels_proba[list(labels)].sum(axis=1)
-
-    consistencies = labels_proba.apply(_task_consistency, axis=1)
+    check_answers(answers)
+    consistencies = _get_consistencies(answers, workers_skills, aggregator)
 
     if by_task:
         return consistencies
@@ -90,14 +97,24 @@ def consistency(
         return consistencies.mean()
 
 
-def _task_uncertainty(row: pd.Series, labels: List[Hashable]) -> float:
-    if row['denominator'] == 0:
-        row[labels] = 1 / len(labels)
-    else:
-        row[labels] /= row['denominator']
-    softmax = row[labels]
-    log_softmax = np.log(row[list(labels)])
-    return float(-np.sum(softmax * log_softmax))
+def _get_label_scores(codes: npt.NDArray[Any], size: int, label_codes: npt.NDArray[Any], n_labels: int,
+                      skills: npt.NDArray[Any]) -> npt.NDArray[Any]:
+    """Sums the probabilities of the answers given each of the labels is true over the answers with the same codes.
+
+    Args:
+        codes (ndarray): Integer codes of the answers' entities, e.g. tasks or workers, from `0` to `size - 1`.
+        size (int): The number of distinct entities.
+        label_codes (ndarray): Integer codes of the answers' labels from `0` to `n_labels - 1`.
+        n_labels (int): The number of distinct labels.
+        skills (ndarray): Skills of the workers given the answers.
+
+    Returns:
+        ndarray: A matrix of shape `(size, n_labels)`, the same as the segment sums of `_get_label_probabilities`.
+    """
+    # every answer adds the probability of a mistake to all the labels and the rest to its own label
+    mistakes = (1. - skills) / max(n_labels - 1, 1)
+    scores = np.bincount(codes * n_labels + label_codes, weights=skills - mistakes, minlength=size * n_labels)
+    return scores.reshape(size, n_labels) + np.bincount(codes, weights=mistakes, minlength=size)[:, np.newaxis]
 
 
 def uncertainty(
@@ -179,7 +196,7 @@ def uncertainty(
         workers_skills (typing.Optional[pandas.core.series.Series]): workers' skills.
             A pandas.Series index by workers and holding corresponding worker's skill
     """
-    _check_answers(answers)
+    check_answers(answers)
 
     if workers_skills is None and aggregator is not None:
         aggregator.fit(answers)
@@ -188,27 +205,101 @@ def uncertainty(
         else:
             raise AssertionError('This aggregator is not supported. Please, provide workers skills.')
 
-    answers = answers.copy(deep=False)
-    answers = answers.set_index('worker')
-    answers['skill'] = workers_skills if workers_skills is not None else 1
-    if answers['skill'].isnull().any():
-        missing_workers = set(answers[answers.skill.isnull()].index.tolist())
-        raise AssertionError(f'Did not provide skills for workers: {missing_workers}.'
-                             f'Please provide workers skills.')
-    answers.reset_index(inplace=True)
-    labels = pd.unique(answers.label)
-    for label in labels:
-        answers[label] = answers.apply(lambda row: _label_probability(row, label, len(labels)), axis=1)
-
-    labels_proba = answers.groupby(compute_by).sum()
-    uncertainties = labels_proba.apply(lambda row: entropy(row[labels] / (sum(row[labels]) + 1e-6)), axis=1)
+    skills = get_answer_skills(answers, workers_skills)
+    codes, entities = pd.factorize(answers[compute_by], sort=True)
+    label_codes, labels = pd.factorize(answers['label'])
+    scores = _get_label_scores(codes, len(entities), label_codes, len(labels), skills)
+    uncertainties = pd.Series(entropy(scores, axis=1), index=pd.Index(entities, name=compute_by))
     if aggregate:
         return uncertainties.mean()
     return uncertainties
 
 
+def _get_distance_matrix(labels: npt.NDArray[Any], label_counts: npt.NDArray[Any],
+                         distance: Union[str, Callable[[Hashable, Hashable], float], npt.NDArray[Any]]
+                         ) -> npt.NDArray[Any]:
+    """Returns the matrix of distances between the labels.
+
+    Args:
+        labels (ndarray): Distinct labels.
+        label_counts (ndarray): Numbers of the pairable values of the labels.
+        distance: A name of the metric, a callable evaluated on every pair of the labels or the matrix itself.
+
+    Returns:
+        ndarray: A matrix of shape `(len(labels), len(labels))`.
+    """
+    if isinstance(distance, np.ndarray):
+        return distance
+    if callable(distance):
+        return np.array([[distance(first, second) for second in labels] for first in labels], dtype=float)
+    if distance == 'nominal':
+        return 1. - np.eye(len(labels))
+    if distance == 'interval':
+        values = labels.astype(float)
+        return np.asarray(np.subtract.outer(values, values) ** 2)
+    if distance == 'ordinal':
+        # the number of values between the ranks, a half of the values of the ranks themselves excluded
+        order = pd.Index(labels).argsort()
+        counts = label_counts[order]
+        cumulative = np.cumsum(counts) - counts / 2
+        ranks = np.empty(len(labels))
+        ranks[order] = cumulative
+        return np.asarray(np.subtract.outer(ranks, ranks) ** 2)
+    raise ValueError(f'Unknown option {distance!r} of "distance" argument.')
+
+
+def _get_task_coincidences(task_codes: npt.NDArray[Any], n_tasks: int, label_codes: npt.NDArray[Any],
+                           n_labels: int) -> sp.csr_matrix:
+    """Returns the coincidence matrices of the labels in the tasks.
+
+    Every ordered pair of values of different answers to a task is weighted by the inverse of the task's size
+    minus one. The values of the tasks with a single answer are not pairable.
+
+    Returns:
+        csr_matrix: A matrix of shape `(n_tasks, n_labels * n_labels)` of the flattened coincidence matrices.
+    """
+    counts = sp.csr_matrix((np.ones(len(task_codes)), (task_codes, label_codes)), shape=(n_tasks, n_labels))
+    counts.sum_duplicates()
+    task_sizes = np.asarray(counts.sum(axis=1)).ravel()
+
+    # all the pairs of the distinct labels of every task
+    n_distinct = np.diff(counts.indptr)
+    n_pairs = n_distinct ** 2
+    rows = np.repeat(np.arange(n_tasks), n_pairs)
+    pair_index = np.arange(n_pairs.sum()) - np.repeat(np.cumsum(n_pairs) - n_pairs, n_pairs)
+    first = counts.indptr[rows] + pair_index // n_distinct[rows]
+    second = counts.indptr[rows] + pair_index % n_distinct[rows]
+
+    values = counts.data[first] * counts.data[second] - np.where(first == second, counts.data[first], 0.)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        values = np.where(task_sizes[rows] > 1, values / (task_sizes[rows] - 1), 0.)
+    coincidences = sp.csr_matrix(
+        (values, (rows, counts.indices[first] * n_labels + counts.indices[second])),
+        shape=(n_tasks, n_labels * n_labels)
+    )
+    coincidences.eliminate_zeros()
+    return coincidences
+
+
+def _get_alpha(coincidences: npt.NDArray[Any], labels: npt.NDArray[Any],
+               distance: Union[str, Callable[[Hashable, Hashable], float], npt.NDArray[Any]]) -> float:
+    """Krippendorff's alpha of the coincidence matrix of the labels."""
+    label_counts = coincidences.sum(axis=1)
+    n_values = label_counts.sum()
+
+    if n_values == 0:
+        raise ValueError('Cannot calculate alpha, no task has more than one answer!')
+    if np.count_nonzero(label_counts) == 1:
+        return 1.
+
+    distances = _get_distance_matrix(np.asarray(labels), label_counts, distance)
+    observed = float((coincidences * distances).sum()) / n_values
+    expected = float(((np.outer(label_counts, label_counts) - np.diag(label_counts)) * distances).sum())
+    return float(1. - observed / (expected / (n_values * (n_values - 1))))
+
+
 def alpha_krippendorff(answers: pd.DataFrame,
-                       distance: Callable[[Hashable, Hashable], float] = binary_distance) -> float:
+                       distance: Union[str, Callable[[Hashable, Hashable], float]] = 'nominal') -> float:
     """Inter-annotator agreement coefficient (Krippendorff 1980).
 
     Amount that annotators agreed on label assignments beyond what is expected by chance.
@@ -217,11 +308,17 @@ def alpha_krippendorff(answers: pd.DataFrame,
         alpha >= 0.667 allows making tentative conclusions only,
         while the lower values suggest the unreliable annotation.
 
+    The observed and expected disagreements are computed from the coincidence matrix of the labels,
+    so the distance between every pair of distinct labels is only computed once.
+
     Args:
         answers: A data frame containing `task`, `worker` and `label` columns.
-        distance: Distance metric, that takes two arguments,
-            and returns a value between 0.0 and 1.0
-            By default: binary_distance (0.0 for equal labels 1.0 otherwise).
+        distance: Distance metric, either a name or a callable that takes two labels
+            and returns a value between 0.0 and 1.0. The names are
+            `nominal` (0.0 for equal labels 1.0 otherwise),
+            `ordinal` (for sortable labels, the squared number of values between the labels) and
+            `interval` (for numeric labels, the squared difference of the labels).
+            By default: `nominal`.
 
     Returns:
         Float value.
@@ -249,6 +346,16 @@ def alpha_krippendorff(answers: pd.DataFrame,
         >>> ]))
         0.4444444444444444
     """
-    _check_answers(answers)
-    data: List[Tuple[Any, Hashable, Hashable]] = answers[['worker', 'task', 'label']].values.tolist()
-    return float(AnnotationTask(data, distance).alpha())
+    check_answers(answers)
+    task_codes, tasks = pd.factorize(answers['task'])
+    label_codes, labels = pd.factorize(answers['label'])
+
+    if len(labels) == 0:
+        raise ValueError('Cannot calculate alpha, no data present!')
+    if len(labels) == 1:
+        return 1.
+    if len(tasks) == 1 and answers['worker'].nunique() == 1:
+        raise ValueError('Cannot calculate alpha, only one worker and task present!')
+
+    coincidences = _get_task_coincidences(task_codes, len(tasks), label_codes, len(labels))
+    return _get_alpha(np.asarray(coincidences.sum(axis=0)).reshape(len(labels), len(labels)), labels, distance)
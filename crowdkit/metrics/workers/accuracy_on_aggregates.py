@@ -2,17 +2,18 @@ __all__ = [
     'accuracy_on_aggregates',
 ]
 
-from typing import Optional, Union
+from typing import Iterable, Optional, Union
 
+import numpy as np
 import pandas as pd
 
 from crowdkit.aggregation import MajorityVote
 from crowdkit.aggregation.base import BaseClassificationAggregator
-from crowdkit.aggregation.utils import get_accuracy
+from crowdkit.aggregation.utils import get_accuracy, get_accuracy_scores
 
 
 def accuracy_on_aggregates(
-        answers: pd.DataFrame,
+        answers: Union[pd.DataFrame, Iterable[pd.DataFrame]],
         aggregator: Optional[BaseClassificationAggregator] = MajorityVote(),
         aggregates: Optional[pd.Series] = None,
         by: Optional[str] = None
@@ -20,8 +21,13 @@ def accuracy_on_aggregates(
     """
     Accuracy on aggregates: a fraction of worker's answers that match the aggregated one.
 
+    The answers can also be given as an iterable of data frames, e.g. read from a large answer log chunk by chunk.
+    Then only the numerators and the denominators of the accuracies are accumulated, so the memory does not
+    grow with the number of answers. The aggregates should be provided in this case, and the duplicate answers
+    are only dropped within a chunk.
+
     Args:
-        answers: a data frame containing `task`, `worker` and `label` columns.
+        answers: a data frame containing `task`, `worker` and `label` columns or an iterable of such data frames.
         aggregator: aggregation algorithm. default: MajorityVote
         aggregates: aggregated answers for provided tasks.
         by: if set, returns accuracies for every worker in provided data frame. Otherwise,
@@ -29,11 +35,47 @@ def accuracy_on_aggregates(
 
         Returns:
             Union[float, pd.Series]
+
+    Examples:
+        Accuracies of the workers over the row groups of a Parquet file.
+
+        >>> import pyarrow.parquet as pq
+        >>> log = pq.ParquetFile('answers.parquet')
+        >>> chunks = (log.read_row_group(i).to_pandas() for i in range(log.num_row_groups))
+        >>> accuracy_on_aggregates(chunks, aggregates=aggregates, by='worker')
     """
     if aggregates is None and aggregator is None:
         raise AssertionError('One of aggregator or aggregates should be not None')
 
+    if not isinstance(answers, pd.DataFrame):
+        if aggregates is None:
+            raise AssertionError('Aggregates should be provided if the answers are given in chunks')
+        return _get_chunked_accuracy(answers, aggregates, by)
+
     if aggregates is None:
         aggregates = aggregator.fit_predict(answers)  # type: ignore
 
     return get_accuracy(answers, aggregates, by=by)
+
+
+def _get_chunked_accuracy(chunks: Iterable[pd.DataFrame], aggregates: pd.Series,
+                          by: Optional[str]) -> Union[float, pd.Series]:
+    """Accumulates the sums of the scores and the weights of the answers chunk by chunk."""
+    if by is None:
+        score, weight = np.float64(0.), np.float64(0.)
+        for chunk in chunks:
+            scores = get_accuracy_scores(chunk, aggregates)
+            score += scores['score'].sum()
+            weight += scores['weight'].sum()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return float(score / weight)
+
+    totals: Optional[pd.DataFrame] = None
+    for chunk in chunks:
+        sums = get_accuracy_scores(chunk, aggregates).groupby(by)[['score', 'weight']].sum()
+        totals = sums if totals is None else totals.add(sums, fill_value=0)
+
+    if totals is None:
+        return pd.Series([], index=pd.Index([], name=by), dtype=float)
+    totals = totals.sort_index()
+    return totals['score'] / totals['weight']
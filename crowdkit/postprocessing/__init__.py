@@ -1,3 +1,3 @@
-from .entropy_threshold import entropy_threshold
+from .entropy_threshold import entropy_threshold, entropy_threshold_trajectory
 
-__all__ = ['entropy_threshold']
+__all__ = ['entropy_threshold', 'entropy_threshold_trajectory']
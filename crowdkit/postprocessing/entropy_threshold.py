@@ -1,14 +1,17 @@
 __all__ = [
     'entropy_threshold',
+    'entropy_threshold_trajectory',
 ]
 
 import warnings
-from typing import Optional, cast
+from typing import Any, List, Optional
 
 import numpy as np
+import numpy.typing as npt
 import pandas as pd
+from scipy.stats import entropy
 
-from ..metrics.data import uncertainty
+from ..aggregation.utils import check_answers, get_answer_skills
 
 
 def entropy_threshold(
@@ -16,6 +19,7 @@ def entropy_threshold(
         workers_skills: Optional[pd.Series] = None,
         percentile: int = 10,
         min_answers: int = 2,
+        n_iterations: Optional[int] = 1,
 ) -> pd.DataFrame:
     """Entropy thresholding postprocessing: filters out all answers by workers,
     whos' entropy (uncertanity) of answers is below specified percentile.
@@ -23,14 +27,26 @@ def entropy_threshold(
     This heuristic detects answers of workers that answer the same way too often, e.g. when "speed-running" by only
     clicking one button.
 
+    In the iterative mode, the filtering is repeated on the answers of the remaining workers, the same as calling
+    the function on its own output. The workers' label scores are only computed once and the entropies are only
+    recomputed when some label is left without answers.
+
     Args:
         answers (pandas.DataFrame): A data frame containing `task`, `worker` and `label` columns.
         workers_skills (Optional[pandas.Series]): workers skills e.g. golden set skills.
         percentile (int): threshold entropy percentile from 0 to 100. Default: 10.
         min_answers (int): worker can be filtered out if he left at least that many answers.
+        n_iterations (Optional[int]): number of filtering passes. Every pass takes its own percentile
+            of the remaining workers' uncertainties, so it removes at least one worker. Default: 1.
+
+            If `None`, the passes are repeated until they remove no one. In this mode the cutoff is NOT
+            the percentile of the remaining workers' uncertainties, which would remove someone every time,
+            but the percentile over all the workers who can be filtered out, the already removed ones
+            included. The uncertainties, and so the cutoff, only change when some label is left without
+            answers, so the passes stop at the first one finding no remaining worker at or below the cutoff.
 
     Returns:
-        pd.DataFrame
+        pd.DataFrame: The answers of the remaining workers.
 
     Examples:
         Fraudent worker always answers the same and gets filtered out.
@@ -58,21 +74,8 @@ def entropy_threshold(
             A pandas.Series index by workers and holding corresponding worker's skill
     """
 
-    answers_per_worker = answers.groupby('worker')['label'].count()
-    answers_per_worker = answers_per_worker[answers_per_worker >= min_answers]
-
-    answers_for_filtration = answers[answers.worker.isin(answers_per_worker.index)]
-
-    uncertainties = cast(pd.Series, uncertainty(
-        answers_for_filtration,
-        workers_skills,
-        compute_by='worker',
-        aggregate=False,
-    ))
-
-    cutoff = np.percentile(uncertainties, percentile)  # type: ignore
-
-    removed_workers = uncertainties[uncertainties <= cutoff].index
+    trajectory = entropy_threshold_trajectory(answers, workers_skills, percentile, min_answers, n_iterations)
+    removed_workers = trajectory['worker']
 
     filtered_answers = answers.copy(deep=False)
     filtered_answers = filtered_answers[~filtered_answers['worker'].isin(removed_workers)]
@@ -82,3 +85,91 @@ def entropy_threshold(
                       'Try decreasing percentile or min_answers.')
 
     return filtered_answers
+
+
+def entropy_threshold_trajectory(
+        answers: pd.DataFrame,
+        workers_skills: Optional[pd.Series] = None,
+        percentile: int = 10,
+        min_answers: int = 2,
+        n_iterations: Optional[int] = 1,
+) -> pd.DataFrame:
+    """The workers removed by `entropy_threshold` with the same arguments, in the order of removal.
+
+    Args:
+        answers (pandas.DataFrame): A data frame containing `task`, `worker` and `label` columns.
+        workers_skills (Optional[pandas.Series]): workers skills e.g. golden set skills.
+        percentile (int): threshold entropy percentile from 0 to 100. Default: 10.
+        min_answers (int): worker can be filtered out if he left at least that many answers.
+        n_iterations (Optional[int]): number of filtering passes, see `entropy_threshold`. Default: 1.
+
+    Returns:
+        pd.DataFrame: The removal trajectory with `worker`, `iteration`, `uncertainty` and `cutoff` columns,
+            holding the pass the worker was removed at starting from 1, the worker's uncertainty
+            and the pass' cutoff uncertainty.
+    """
+    answers_per_worker = answers.groupby('worker')['label'].count()
+    answers_per_worker = answers_per_worker[answers_per_worker >= min_answers]
+
+    answers_for_filtration = answers[answers.worker.isin(answers_per_worker.index)]
+
+    return _get_removal_trajectory(answers_for_filtration, workers_skills, percentile, n_iterations)
+
+
+def _get_removal_trajectory(answers: pd.DataFrame, workers_skills: Optional[pd.Series], percentile: int,
+                            n_iterations: Optional[int]) -> pd.DataFrame:
+    """Removes the workers with the lowest uncertainties pass by pass."""
+    check_answers(answers)
+    skills = get_answer_skills(answers, workers_skills)
+    worker_codes, workers = pd.factorize(answers['worker'])
+    label_codes, labels = pd.factorize(answers['label'])
+    n_workers, n_labels = len(workers), len(labels)
+
+    # the workers' sums of the skills and the mistake probabilities per label, see `uncertainty`
+    codes = worker_codes * n_labels + label_codes
+    answer_counts = np.bincount(codes, minlength=n_workers * n_labels).reshape(n_workers, n_labels)
+    correct = np.bincount(codes, weights=skills, minlength=n_workers * n_labels).reshape(n_workers, n_labels)
+    mistakes = np.bincount(codes, weights=1. - skills, minlength=n_workers * n_labels).reshape(n_workers, n_labels)
+    label_counts = answer_counts.sum(axis=0)
+
+    remaining = np.arange(n_workers)
+    uncertainties = np.empty(n_workers)
+    active_labels: Optional[npt.NDArray[Any]] = None
+    removed: List[pd.DataFrame] = []
+    iteration = 0
+    while len(remaining) and (n_iterations is None or iteration < n_iterations):
+        iteration += 1
+        # until stable, the cutoff is taken over all the workers, so it stays at the same rank as the removal goes
+        population = remaining if n_iterations is not None else np.arange(n_workers)
+        if active_labels is None or not np.array_equal(active_labels, label_counts > 0):
+            active_labels = label_counts > 0
+            uncertainties[population] = _get_uncertainties(correct[population][:, active_labels],
+                                                           mistakes[population][:, active_labels])
+
+        # the removed workers with all their labels gone have no uncertainty
+        cutoff = np.nanpercentile(uncertainties[population], percentile)
+        is_removed = uncertainties[remaining] <= cutoff
+        if not is_removed.any():
+            break
+        removed_codes = remaining[is_removed]
+        removed.append(pd.DataFrame({
+            'worker': workers[removed_codes],
+            'iteration': iteration,
+            'uncertainty': uncertainties[removed_codes],
+            'cutoff': cutoff,
+        }))
+
+        remaining = remaining[~is_removed]
+        label_counts = label_counts - answer_counts[removed_codes].sum(axis=0)
+
+    if not removed:
+        return pd.DataFrame({'worker': workers[:0], 'iteration': np.array([], dtype=int),
+                             'uncertainty': np.array([]), 'cutoff': np.array([])})
+    return pd.concat(removed, ignore_index=True)
+
+
+def _get_uncertainties(correct: npt.NDArray[Any], mistakes: npt.NDArray[Any]) -> npt.NDArray[Any]:
+    """Entropies of the workers' label scores, every answer spreading its mistake probability over the other labels."""
+    n_labels = correct.shape[1]
+    scores = correct + (mistakes.sum(axis=1, keepdims=True) - mistakes) / max(n_labels - 1, 1)
+    return np.asarray(entropy(scores, axis=1))
@@ -1,11 +1,13 @@
-from typing import Any
+from typing import Any, List, Tuple
 
 import numpy as np
 import pandas as pd
 import pytest
+from scipy.optimize import check_grad
 
 from pandas.testing import assert_series_equal
 from crowdkit.aggregation import BradleyTerry, NoisyBradleyTerry
+from crowdkit.aggregation.utils import merge_sorted_counts
 
 
 @pytest.fixture
@@ -49,12 +51,17 @@ def result_equal() -> pd.Series:
 
 @pytest.fixture
 def noisy_bt_result() -> pd.Series:
-    return pd.Series([1.0, 1.0, 1.497123058531228e-45], index=pd.Index(['a', 'b', 'c'], name='label'), name='agg_score')
+    return pd.Series([0.9999930454486686, 0.6396793483495749, 2.502517660655551e-05], index=pd.Index(['a', 'b', 'c'], name='label'), name='agg_score')
+
+
+@pytest.fixture
+def noisy_bt_result_iter_10() -> pd.Series:
+    return pd.Series([0.9997817852794654, 0.6337922436558076, 0.0008115243619527748], index=pd.Index(['a', 'b', 'c'], name='label'), name='agg_score')
 
 
 @pytest.fixture
 def noisy_bt_result_equal() -> pd.Series:
-    return pd.Series([0.6715468044437242, 0.6462882683525435, 0.632947637600415], index=pd.Index(['a', 'b', 'c'], name='label'), name='agg_score')
+    return pd.Series([0.4803399488399325, 0.7606232364090837, 0.6726686985482374], index=pd.Index(['a', 'b', 'c'], name='label'), name='agg_score')
 
 
 @pytest.fixture
@@ -89,17 +96,32 @@ def test_bradley_terry_step_by_step(request: Any, data_abc: pd.DataFrame, n_iter
 
 
 @pytest.mark.parametrize(
-    'n_iter, tol', [(10, 0), (100500, 1e-5)]
+    'n_iter, tol, result', [(10, 0, 'noisy_bt_result_iter_10'), (100500, 1e-5, 'noisy_bt_result')]
 )
-def test_noisy_bradley_terry(n_iter: int, tol: float,
-                             data_abc: pd.DataFrame, noisy_bt_result: pd.Series) -> None:
-    with pytest.warns(RuntimeWarning):
-        noisy_bt = NoisyBradleyTerry(n_iter=n_iter, tol=tol).fit(data_abc)
-    assert_series_equal(noisy_bt.scores_, noisy_bt_result, atol=0.005)
+def test_noisy_bradley_terry(request: Any, n_iter: int, tol: float, result: str, data_abc: pd.DataFrame) -> None:
+    noisy_bt = NoisyBradleyTerry(n_iter=n_iter, tol=tol).fit(data_abc)
+    assert_series_equal(noisy_bt.scores_, request.getfixturevalue(result), atol=0.005)
     assert noisy_bt.skills_.name == 'skill'
     assert noisy_bt.biases_.name == 'bias'
 
 
+def test_noisy_bradley_terry_gradient() -> None:
+    rng = np.random.default_rng(0)
+    labels, workers = 5, 3
+    np_data = rng.integers(1, labels + 1, size=(50, 3))
+    np_data[:, 2] = np.where(rng.random(50) < 0.5, np_data[:, 0], np_data[:, 1])
+    np_workers = rng.integers(0, workers, size=50)
+    x = rng.normal(size=1 + labels + 2 * workers)
+
+    def fun(x: np.ndarray) -> float:  # type: ignore
+        return NoisyBradleyTerry._compute_log_likelihood_and_gradient(x, np_data, np_workers, labels, workers, 0.1)[0]
+
+    def jac(x: np.ndarray) -> np.ndarray:  # type: ignore
+        return NoisyBradleyTerry._compute_log_likelihood_and_gradient(x, np_data, np_workers, labels, workers, 0.1)[1]
+
+    assert check_grad(fun, jac, x) < 1e-4
+
+
 def test_noisy_bradley_terry_equal(data_equal: pd.DataFrame, noisy_bt_result_equal: pd.Series) -> None:
     noisy_bt = NoisyBradleyTerry().fit(data_equal)
     assert_series_equal(noisy_bt.scores_, noisy_bt_result_equal, atol=0.005)
@@ -110,3 +132,128 @@ def test_zero_iter(agg_class: Any, data_equal: pd.DataFrame, result_equal: pd.Se
     aggregator = agg_class(n_iter=0)
     answers = aggregator.fit_predict(data_equal)
     assert len(answers.index.difference(result_equal.index)) == 0
+
+
+def test_bradley_terry_tol_stops(data_abc: pd.DataFrame) -> None:
+    bt = BradleyTerry(n_iter=100500, tol=1e-5).fit(data_abc)
+    assert 0 < len(bt.loss_history_) < 100500
+    assert bt.loss_history_[-1] < 1e-5
+    assert all(loss >= 1e-5 for loss in bt.loss_history_[:-1])
+
+
+@pytest.fixture
+def data_abcd_update() -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            ['w2', 't4', 'c', 'd', 'c'],
+            ['w2', 't5', 'd', 'a', 'a'],
+        ],
+        columns=['worker', 'task', 'left', 'right', 'label']
+    )
+
+
+@pytest.mark.parametrize('agg_class, kwargs', [(BradleyTerry, {'n_iter': 10}), (NoisyBradleyTerry, {})])
+def test_partial_fit_not_fitted(agg_class: Any, kwargs: Any, data_abc: pd.DataFrame) -> None:
+    assert_series_equal(agg_class(**kwargs).partial_fit(data_abc).scores_, agg_class(**kwargs).fit_predict(data_abc))
+
+
+@pytest.mark.parametrize('agg_class, kwargs', [(BradleyTerry, {'n_iter': 10}), (NoisyBradleyTerry, {})])
+def test_partial_fit(agg_class: Any, kwargs: Any, data_abc: pd.DataFrame, data_abcd_update: pd.DataFrame) -> None:
+    aggregator = agg_class(**kwargs).fit(data_abc)
+    scores = aggregator.scores_.copy()
+    aggregator.partial_fit(data_abcd_update)
+
+    assert aggregator.scores_.index.tolist() == ['a', 'b', 'c', 'd']
+    # b is not compared in the new data, so only its normalization may change
+    assert aggregator.scores_['a'] > aggregator.scores_['d']
+    if agg_class is NoisyBradleyTerry:
+        assert aggregator.scores_['b'] == scores['b']
+        assert aggregator.skills_.index.tolist() == ['w1', 'w2']
+
+
+def test_bradley_terry_partial_fit_accumulates_wins(data_abc: pd.DataFrame) -> None:
+    first, second = data_abc[:2], data_abc[2:]
+    bt = BradleyTerry(n_iter=10).fit(first).partial_fit(second)
+    expected = BradleyTerry(n_iter=10).fit(data_abc)
+    assert bt._comparisons is not None and expected._comparisons is not None
+    for actual, wanted in zip(merge_sorted_counts(bt._comparisons), merge_sorted_counts(expected._comparisons)):
+        assert np.array_equal(actual, wanted)
+    assert np.array_equal(bt._wins[:bt.scores_.size], expected._wins)  # type: ignore
+
+
+def test_noisy_bradley_terry_partial_fit_accumulates_counts(data_abc: pd.DataFrame,
+                                                            data_abcd_update: pd.DataFrame) -> None:
+    def get_counts(noisy_bt: NoisyBradleyTerry) -> List[Tuple[Any, ...]]:
+        assert noisy_bt._comparisons is not None
+        np_data, np_workers, counts = noisy_bt._comparisons.get_all()
+        labels, workers = noisy_bt.scores_.index.to_numpy(), noisy_bt.skills_.index.to_numpy()
+        return sorted(zip(*(labels[np_data].T), workers[np_workers], counts))
+
+    update = pd.concat([data_abc[2:], data_abcd_update], ignore_index=True)
+    noisy_bt = NoisyBradleyTerry(n_iter=0).fit(data_abc).partial_fit(update)
+    expected = NoisyBradleyTerry(n_iter=0).fit(pd.concat([data_abc, update], ignore_index=True))
+    assert get_counts(noisy_bt) == get_counts(expected)
+    assert ('c', 'a', 'a', 'w1', 2.) in get_counts(noisy_bt)
+
+
+def test_noisy_bradley_terry_partial_fit_decompose(data_two_pools: pd.DataFrame,
+                                                   data_abcd_update: pd.DataFrame) -> None:
+    noisy_bt = NoisyBradleyTerry(decompose=True).fit(data_two_pools)
+    scores = noisy_bt.scores_.copy()
+    # the worker of the other pool would link the pools
+    noisy_bt.partial_fit(data_abcd_update.assign(worker='w3'))
+
+    assert_series_equal(noisy_bt.scores_[['A', 'B', 'C']], scores[['A', 'B', 'C']])
+    assert noisy_bt.components_['d'] == noisy_bt.components_['a'] != noisy_bt.components_['A']
+
+    # the pools are linked by a worker
+    noisy_bt.partial_fit(pd.DataFrame([['w1', 'A', 'B', 'A']], columns=['worker', 'left', 'right', 'label']))
+    assert noisy_bt.components_.tolist() == [0] * 7
+
+
+@pytest.fixture
+def data_two_pools(data_abc: pd.DataFrame) -> pd.DataFrame:
+    other_pool = data_abc.copy()
+    other_pool['worker'] = 'w2'
+    for column in 'left', 'right', 'label':
+        other_pool[column] = other_pool[column].str.upper()
+    return pd.concat([data_abc, other_pool], ignore_index=True)
+
+
+def test_bradley_terry_decompose(data_abc: pd.DataFrame, data_two_pools: pd.DataFrame) -> None:
+    bt = BradleyTerry(n_iter=10, tol=0, decompose=True).fit(data_two_pools)
+    assert bt.components_.name == 'component'
+    assert bt.components_.groupby(bt.components_).size().tolist() == [3, 3]
+    assert_series_equal(bt.scores_.groupby(bt.components_).sum(), pd.Series([1., 1.]), check_names=False,
+                        check_index_type=False)
+
+    single_pool = BradleyTerry(n_iter=10, tol=0).fit_predict(data_abc)
+    assert_series_equal(bt.scores_[['a', 'b', 'c']], single_pool)
+    assert_series_equal(bt.scores_[['A', 'B', 'C']], single_pool.rename(str.upper))
+
+
+def test_bradley_terry_partial_fit_decompose(data_two_pools: pd.DataFrame,
+                                             data_abcd_update: pd.DataFrame) -> None:
+    bt = BradleyTerry(n_iter=10, decompose=True).fit(data_two_pools)
+    scores = bt.scores_.copy()
+    bt.partial_fit(data_abcd_update)
+
+    # the other component is neither updated nor normalized
+    assert_series_equal(bt.scores_[['A', 'B', 'C']], scores[['A', 'B', 'C']])
+    assert bt.components_['d'] == bt.components_['a'] != bt.components_['A']
+    assert bt.scores_.groupby(bt.components_).sum().tolist() == pytest.approx([1., 1.])
+
+    # the components linked by new comparisons are merged
+    bt.partial_fit(pd.DataFrame([['w1', 'a', 'A', 'a']], columns=['worker', 'left', 'right', 'label']))
+    assert bt.components_.tolist() == [0] * 7
+    assert bt.scores_.sum() == pytest.approx(1.)
+
+
+def test_noisy_bradley_terry_decompose(data_two_pools: pd.DataFrame) -> None:
+    noisy_bt = NoisyBradleyTerry(decompose=True).fit(data_two_pools)
+    assert noisy_bt.components_.groupby(noisy_bt.components_).size().tolist() == [3, 3]
+    assert noisy_bt.components_['a'] != noisy_bt.components_['A']
+
+    parallel_noisy_bt = NoisyBradleyTerry(decompose=True, n_jobs=2).fit(data_two_pools)
+    assert_series_equal(noisy_bt.scores_, parallel_noisy_bt.scores_)
+    assert_series_equal(noisy_bt.skills_, parallel_noisy_bt.skills_)
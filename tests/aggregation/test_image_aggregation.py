@@ -1,5 +1,6 @@
 from typing import Any
 
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -19,6 +20,12 @@ def test_skills_segmentation_mv(image_with_skills_df: pd.DataFrame, image_with_s
     assert_series_equal(output, image_with_skills_mv_result)
 
 
+def test_skills_segmentation_mv_proba(image_with_skills_df: pd.DataFrame) -> None:
+    probas = SegmentationMajorityVote().fit_predict_proba(*image_with_skills_df)
+    assert probas.name == 'agg_proba'
+    np.testing.assert_allclose(probas[1], np.array([[.4, .8, .8, .6, .2], [.2, 0, 0, 0, 0]]))
+
+
 @pytest.mark.parametrize(
     'n_iter, tol', [(10, 0), (100500, 1e-5)]
 )
@@ -28,6 +35,33 @@ def test_simple_segmentation_rasa_iter(n_iter: int, tol: float, simple_image_df:
     assert_series_equal(output, simple_image_rasa_result)
 
 
+@pytest.mark.parametrize(
+    'n_iter, tol', [(10, 0), (100500, 1e-5)]
+)
+def test_simple_segmentation_rasa_incremental(n_iter: int, tol: float, simple_image_df: pd.DataFrame,
+                                              simple_image_rasa_result: pd.Series) -> None:
+    rasa = SegmentationRASA(n_iter=n_iter, tol=tol, incremental=True)
+    output = rasa.fit_predict(simple_image_df)
+    assert_series_equal(output, simple_image_rasa_result)
+    assert len(rasa.loss_history_) <= n_iter
+
+
+@pytest.mark.parametrize('n_iter', [1, 2, 3, 500])
+def test_segmentation_rasa_incremental_matches_classic(n_iter: int) -> None:
+    rng = np.random.default_rng(0)
+    truth = rng.random((20, 16, 16)) < 0.5
+    # the workers flip the true pixels with different probabilities, so the weights change the vote
+    df = pd.DataFrame([
+        [task, worker, truth[task] ^ (rng.random((16, 16)) < noise)]
+        for task in range(20) for worker, noise in enumerate([0.05, 0.1, 0.3, 0.4, 0.45])
+    ], columns=['task', 'worker', 'segmentation'])
+
+    classic = SegmentationRASA(n_iter=n_iter, tol=0).fit_predict(df)
+    incremental = SegmentationRASA(n_iter=n_iter, tol=0, incremental=True).fit_predict(df)
+    for task in classic.index:
+        np.testing.assert_array_equal(incremental[task], classic[task])
+
+
 @pytest.mark.parametrize(
     'n_iter, tol', [(10, 0), (100500, 1e-5)]
 )
@@ -45,3 +79,29 @@ def test_zero_iter(agg_class: Any, simple_image_df: pd.DataFrame,
     aggregator = agg_class(n_iter=0)
     answers = aggregator.fit_predict(simple_image_df)
     assert len(answers.index.difference(simple_image_mv_result.index)) == 0
+
+
+@pytest.mark.parametrize('tile_size', [1, 2, 100])
+def test_tiled_segmentation_em(tile_size: int, simple_image_df: pd.DataFrame,
+                               simple_image_em_result: pd.Series) -> None:
+    output = SegmentationEM(tile_size=tile_size).fit_predict(simple_image_df)
+    assert_series_equal(output, simple_image_em_result)
+
+
+@pytest.mark.parametrize('tile_size', [0, -1])
+def test_tiled_segmentation_em_raises_invalid_tile_size(tile_size: int) -> None:
+    with pytest.raises(ValueError):
+        SegmentationEM(tile_size=tile_size)
+
+
+def test_tiled_segmentation_em_memmap(tmp_path: Any, simple_image_df: pd.DataFrame,
+                                      simple_image_em_result: pd.Series) -> None:
+    segmentations = []
+    for i, segmentation in enumerate(simple_image_df.segmentation):
+        mmap = np.memmap(tmp_path / f'{i}.dat', dtype=bool, mode='w+', shape=segmentation.shape)
+        mmap[:] = segmentation
+        segmentations.append(mmap)
+    data = simple_image_df.assign(segmentation=segmentations)
+
+    output = SegmentationEM(tile_size=2).fit_predict(data)
+    assert_series_equal(output, simple_image_em_result)
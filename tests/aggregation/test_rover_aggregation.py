@@ -1,3 +1,6 @@
+from typing import Dict
+
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -58,3 +61,109 @@ def test_rover_simple_text(simple_text_df: pd.DataFrame,
     rover = ROVER(tokenizer=lambda x: x.split(' '), detokenizer=lambda x: ' '.join(x))
     predicted = rover.fit_predict(simple_text_df.rename(columns={'output': 'text'}))
     assert_series_equal(predicted, simple_text_result_rover)
+
+
+def test_rover_distances() -> None:
+    # reference slots: {a}, {b, ''}, {c}; hypothesis: a c
+    ref_keys = ROVER._get_ref_keys(np.array([0, 1, 1, 2]), np.array([1, 2, 0, 3]), 4)
+    deletion_cost = np.array([1, 0, 1])
+    distance, offsets, is_hyp_word_in_ref = ROVER._get_distances(np.array([1, 3]), ref_keys, 4, deletion_cost)
+    assert offsets.tolist() == [0, 0, 0]
+    np.testing.assert_array_equal(distance, np.array([
+        [0, 1, 2, 3],
+        [1, 0, 0, 1],
+        [2, 1, 1, 0],
+    ]))
+    np.testing.assert_array_equal(is_hyp_word_in_ref, np.array([
+        [False, False, False, False],
+        [False, True, False, False],
+        [False, False, False, True],
+    ]))
+
+
+@pytest.mark.parametrize('n_jobs, chunk_size', [(1, None), (2, None), (2, 3)])
+def test_rover_n_jobs(simple_text_df: pd.DataFrame,
+                      simple_text_result_rover: pd.Series,  # noqa F811
+                      n_jobs: int, chunk_size: int) -> None:
+    rover = ROVER(tokenizer=lambda x: x.split(' '), detokenizer=lambda x: ' '.join(x),
+                  n_jobs=n_jobs, chunk_size=chunk_size)
+    predicted = rover.fit_predict(simple_text_df.rename(columns={'output': 'text'}))
+    assert_series_equal(predicted, simple_text_result_rover)
+
+
+def test_rover_iter_texts(data_toy: pd.DataFrame) -> None:
+    data = pd.concat([data_toy, data_toy.assign(task='t0', text='x y')])
+    rover = ROVER(tokenizer=lambda x: x.split(' '), detokenizer=lambda x: ' '.join(x))
+    assert list(rover.iter_texts(data)) == [('t0', 'x y'), ('t1', 'b c d e')]
+    assert not hasattr(rover, 'texts_')
+
+
+@pytest.mark.parametrize('skills, expected', [
+    ({'w1': 1.0, 'w2': 1.0, 'w3': 1.0}, 'b c d e'),
+    ({'w1': 5.0, 'w2': 1.0, 'w3': 1.0}, 'a b c d'),
+    ({'w1': 1.0, 'w2': 3.0, 'w3': 1.0}, 'b z d e'),
+])
+def test_rover_skills(data_toy: pd.DataFrame, skills: Dict[str, float], expected: str) -> None:
+    rover = ROVER(tokenizer=lambda x: x.split(' '), detokenizer=lambda x: ' '.join(x))
+    assert rover.fit_predict(data_toy, pd.Series(skills)).tolist() == [expected]
+
+
+def test_rover_missing_skills(data_toy: pd.DataFrame) -> None:
+    rover = ROVER(tokenizer=lambda x: x.split(' '), detokenizer=lambda x: ' '.join(x))
+    with pytest.raises(ValueError):
+        rover.fit(data_toy, pd.Series({'w1': 1.0}))
+
+
+@pytest.mark.parametrize('band', [0, 1, 3])
+def test_rover_banded_distances(band: int) -> None:
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        hyp = rng.integers(1, 5, size=rng.integers(0, 15))
+        ref = rng.integers(0, 5, size=rng.integers(0, 15))
+        ref_keys = ROVER._get_ref_keys(np.arange(len(ref)), ref, 5)
+        deletion_cost = (ref != 0).astype(int)
+
+        full, full_offsets, full_matches = ROVER._get_distances(hyp, ref_keys, 5, deletion_cost)
+        assert full.shape == (len(hyp) + 1, len(ref) + 1) and not full_offsets.any()
+        np.testing.assert_array_equal(full_matches[1:, 1:], hyp[:, None] == ref)
+
+        distance, offsets, is_hyp_word_in_ref = ROVER._get_distances(hyp, ref_keys, 5, deletion_cost, band)
+        assert distance[-1, len(ref) - offsets[-1]] == full[-1, -1]
+        # the paths within the band cost at least as much as the paths through the full table
+        rows, columns = np.indices(distance.shape)
+        assert (distance >= full[rows, columns + offsets[:, None]]).all()
+        np.testing.assert_array_equal(is_hyp_word_in_ref, full_matches[rows, columns + offsets[:, None]])
+
+
+@pytest.mark.parametrize('band', [0, 2])
+def test_rover_band(simple_text_df: pd.DataFrame,
+                    simple_text_result_rover: pd.Series,  # noqa F811
+                    band: int) -> None:
+    rover = ROVER(tokenizer=lambda x: x.split(' '), detokenizer=lambda x: ' '.join(x), band=band)
+    predicted = rover.fit_predict(simple_text_df.rename(columns={'output': 'text'}))
+    assert_series_equal(predicted, simple_text_result_rover)
+
+
+@pytest.mark.parametrize('backbone, expected', [
+    ('first', 'd d'),
+    ('longest', 'd d c'),
+    ('medoid', 'd d'),
+])
+def test_rover_backbone(backbone: str, expected: str) -> None:
+    data = pd.DataFrame(
+        [
+            ['w1', 't1', 'c'],
+            ['w2', 't1', 'd d'],
+            ['w3', 't1', 'd d b'],
+            ['w4', 't1', 'b a c d c'],
+        ],
+        columns=['worker', 'task', 'text']
+    )
+    rover = ROVER(tokenizer=lambda x: x.split(' '), detokenizer=lambda x: ' '.join(x), backbone=backbone)
+    assert rover.fit_predict(data).tolist() == [expected]
+
+
+def test_rover_unknown_backbone(data_toy: pd.DataFrame) -> None:
+    rover = ROVER(tokenizer=lambda x: x.split(' '), detokenizer=lambda x: ' '.join(x), backbone='shortest')
+    with pytest.raises(ValueError):
+        rover.fit(data_toy)
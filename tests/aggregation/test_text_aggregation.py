@@ -1,10 +1,15 @@
-from typing import Any
+from pathlib import Path
+from typing import Any, List, cast
 
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
 import pytest
 
-from crowdkit.aggregation import RASA, HRRASA
+from crowdkit.aggregation import ClosestToAverage, RASA, HRRASA, TextRASA, TextHRRASA
+from crowdkit.aggregation.texts import EmbeddingCache
 from pandas.testing import assert_frame_equal
+from scipy.spatial import distance
 from .data_hrrasa import *  # noqa:
 
 
@@ -32,6 +37,41 @@ def test_hrrasa_single_overlap(simple_text_df: pd.DataFrame) -> None:
     assert len(output) == 1
 
 
+def test_hrrasa_local_skills() -> None:
+    data = pd.DataFrame(
+        [
+            ['t1', 'w1', 'a b', np.array([1.0, 0.0])],
+            ['t1', 'w2', 'a c', np.array([1.0, 1.0])],
+            ['t2', 'w1', 'a b', np.array([0.0, 2.0])],
+            ['t2', 'w2', 'b c', np.array([1.0, 2.0])],
+            ['t2', 'w3', 'a b', np.array([2.0, 2.0])],
+        ],
+        columns=['task', 'worker', 'output', 'embedding']
+    )
+    hrrasa = HRRASA(output_similarity=lambda hyp, ref: float(hyp == cast(Any, ref)))
+    embeddings = np.vstack(data.embedding.values)
+    task_codes, worker_codes = np.array([0, 0, 1, 1, 1]), np.array([0, 1, 0, 1, 2])
+
+    expected = []
+    for i in range(len(data)):
+        others = [j for j in range(len(data)) if task_codes[j] == task_codes[i] and worker_codes[j] != worker_codes[i]]
+        norms = (embeddings ** 2).sum(axis=1)
+        emb_sum = sum(np.exp(-np.sum((embeddings[i] - embeddings[j]) ** 2) / (norms[i] * norms[j])) for j in others)
+        seq_sum = sum(float(data.output[i] == data.output[j]) for j in others)
+        expected.append(0.5 * (emb_sum + seq_sum) / len(others))
+
+    local_skills = hrrasa._get_local_skills(data, embeddings, task_codes, worker_codes)
+    np.testing.assert_allclose(local_skills, expected)
+
+
+def test_hrrasa_ranks(simple_text_df: pd.DataFrame) -> None:
+    hrrasa = HRRASA(calculate_ranks=True).fit(simple_text_df)
+    assert len(hrrasa.ranks_) == len(simple_text_df)
+    assert hrrasa.ranks_['rank'].notna().all()
+    # the rank of an answer is its global skill times the embedding similarity plus its local skill
+    assert (hrrasa.ranks_['rank'] > 0).all()
+
+
 @pytest.mark.parametrize(
     'agg_class', [RASA, HRRASA]
 )
@@ -40,3 +80,76 @@ def test_zero_iter(agg_class: Any, simple_text_df: pd.DataFrame, simple_text_tru
     aggregator = agg_class(n_iter=0)
     answers = aggregator.fit_predict(simple_text_df, simple_text_true_embeddings)
     assert len(answers.index.difference(simple_text_result_hrrasa.index)) == 0
+
+
+class CountingEncoder:
+    def __init__(self) -> None:
+        self.texts: List[str] = []
+
+    def __call__(self, text: str) -> npt.NDArray[Any]:
+        self.texts.append(text)
+        return np.array([len(text), text.count(' ')], dtype=float)
+
+    def encode_batch(self, texts: List[str]) -> npt.NDArray[Any]:
+        return np.array([self(text) for text in texts])
+
+
+@pytest.mark.parametrize('agg_class', [TextRASA, TextHRRASA])
+@pytest.mark.parametrize('batch_size', [1, 4, 1000])
+def test_text_batch_encoding(agg_class: Any, batch_size: int, simple_text_df: pd.DataFrame) -> None:
+    data = simple_text_df[['task', 'worker', 'output']]
+    encoder = CountingEncoder()
+    expected = agg_class(encoder=encoder).fit_predict(data)
+    assert sorted(encoder.texts) == sorted(data.output.unique())
+
+    batch_encoder = CountingEncoder()
+    output = agg_class(encoder=batch_encoder.encode_batch, batch_size=batch_size).fit_predict(data)
+    assert_frame_equal(output, expected)
+    assert batch_encoder.texts == encoder.texts
+
+
+def test_text_encoding_cache(tmp_path: Path, simple_text_df: pd.DataFrame) -> None:
+    data = simple_text_df[['task', 'worker', 'output']]
+    path = str(tmp_path / 'embeddings.sqlite')
+
+    encoder = CountingEncoder()
+    expected = TextRASA(encoder=encoder, cache=EmbeddingCache(path, max_size=5)).fit_predict(data)
+    assert len(encoder.texts) == data.output.nunique()
+
+    # the embeddings are read back from the database and are not encoded again
+    encoder = CountingEncoder()
+    cache = EmbeddingCache(path, max_size=5)
+    assert len(cache) == data.output.nunique()
+    assert_frame_equal(TextRASA(encoder=encoder, cache=cache).fit_predict(data), expected)
+    TextRASA(encoder=encoder, cache=cache).fit_predict(data[:10])
+    assert encoder.texts == []
+
+
+@pytest.mark.parametrize('metric', ['cosine', 'euclidean', 'sqeuclidean'])
+def test_closest_to_average_metrics(metric: str, simple_text_df: pd.DataFrame,
+                                    simple_text_true_embeddings: pd.Series) -> None:
+    expected = ClosestToAverage(distance=getattr(distance, metric)).fit(
+        simple_text_df, true_embeddings=simple_text_true_embeddings
+    )
+    cta = ClosestToAverage(distance=metric).fit(simple_text_df, true_embeddings=simple_text_true_embeddings)
+    assert_frame_equal(cta.scores_, expected.scores_)
+    assert_frame_equal(cta.embeddings_and_outputs_, expected.embeddings_and_outputs_)
+
+
+def test_closest_to_average_zero_cosine() -> None:
+    data = pd.DataFrame(
+        [
+            ['t1', 'w1', 'a', np.array([0.0, 0.0])],
+            ['t1', 'w2', 'b', np.array([1.0, 0.0])],
+            ['t1', 'w3', 'c', np.array([1.0, 1.0])],
+        ],
+        columns=['task', 'worker', 'output', 'embedding']
+    )
+    cta = ClosestToAverage(distance='cosine').fit(data)
+    assert np.isinf(cta.scores_.score.iloc[0])
+    assert cta.embeddings_and_outputs_.output.tolist() == ['c']
+
+
+def test_closest_to_average_unknown_metric(simple_text_df: pd.DataFrame) -> None:
+    with pytest.raises(ValueError):
+        ClosestToAverage(distance='manhattan').fit(simple_text_df)
@@ -0,0 +1,157 @@
+import itertools
+from pathlib import Path
+from typing import Any, Dict, List, Optional, cast
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+import pytest
+
+from crowdkit.aggregation import TextSummarization
+from crowdkit.aggregation.texts import GenerationCache
+from crowdkit.aggregation.texts.text_summarization import _sample_permutations
+
+
+class FakeBatch(Dict[str, npt.NDArray[Any]]):
+    def to(self, device: str) -> 'FakeBatch':
+        return self
+
+
+class FakeTokenizer:
+    """Encodes texts as code points of their characters, 0 is the padding."""
+
+    def __init__(self) -> None:
+        self.batches: List[List[int]] = []
+
+    def __call__(self, texts: List[str]) -> Dict[str, List[List[int]]]:
+        return {'input_ids': [[ord(char) for char in text] for text in texts]}
+
+    def pad(self, encoded: Dict[str, List[List[int]]], return_tensors: str) -> FakeBatch:
+        input_ids = encoded['input_ids']
+        self.batches.append([len(ids) for ids in input_ids])
+        width = max(len(ids) for ids in input_ids)
+        padded = np.array([ids + [0] * (width - len(ids)) for ids in input_ids])
+        return FakeBatch(input_ids=padded, attention_mask=(padded != 0).astype(int))
+
+    def batch_decode(self, sequences: npt.NDArray[Any], skip_special_tokens: bool) -> List[str]:
+        return [''.join(chr(code) for code in sequence if code) for sequence in sequences]
+
+
+class EchoModel:
+    """Generates its input."""
+
+    name_or_path = 'echo'
+
+    def to(self, device: str) -> 'EchoModel':
+        return self
+
+    def generate(self, input_ids: npt.NDArray[Any], attention_mask: npt.NDArray[Any],
+                 num_beams: int) -> npt.NDArray[Any]:
+        return input_ids
+
+
+def get_summarization(tokenizer: FakeTokenizer, model: Optional[EchoModel] = None,
+                      **kwargs: Any) -> TextSummarization:
+    # the fakes only implement the parts of the transformers interfaces that are used
+    return TextSummarization(cast(Any, tokenizer), cast(Any, model or EchoModel()), **kwargs)
+
+
+@pytest.fixture
+def summarization_data() -> pd.DataFrame:
+    return pd.DataFrame(
+        [
+            ['t1', 'w1', 'a b c'],
+            ['t1', 'w2', 'a b'],
+            ['t2', 'w1', 'x'],
+            ['t3', 'w1', 'long text'],
+            ['t3', 'w2', 'longer text'],
+            ['t3', 'w3', 'the longest text'],
+        ],
+        columns=['task', 'worker', 'text']
+    )
+
+
+@pytest.mark.parametrize('batch_size', [1, 2, 10])
+def test_text_summarization_batches(summarization_data: pd.DataFrame, batch_size: int) -> None:
+    tokenizer = FakeTokenizer()
+    result = get_summarization(tokenizer, batch_size=batch_size).fit_predict(summarization_data)
+
+    expected = pd.Series(['a b c | a b', 'x', 'long text | longer text | the longest text'],
+                         index=pd.Index(['t1', 't2', 't3'], name='task'), name='agg_text')
+    pd.testing.assert_series_equal(result, expected)
+
+    # the inputs are batched in the order of their lengths
+    lengths = [length for batch in tokenizer.batches for length in batch]
+    assert lengths == sorted(lengths)
+    assert max(len(batch) for batch in tokenizer.batches) == min(batch_size, len(expected))
+
+
+def test_text_summarization_permutations(summarization_data: pd.DataFrame) -> None:
+    data = summarization_data[summarization_data.task == 't3']
+    tokenizer = FakeTokenizer()
+    aggregator = get_summarization(tokenizer, n_permutations=6, batch_size=10)
+    result = aggregator.fit_predict(data)
+
+    # all the six orders of the three texts are generated exactly once
+    assert tokenizer.batches == [[42] * 6]
+    assert result['t3'] in {' | '.join(texts) for texts in itertools.permutations(data.text)}
+
+    with pytest.raises(ValueError):
+        get_summarization(tokenizer, n_permutations=7).fit_predict(data)
+
+
+def test_text_summarization_duplicate_inputs() -> None:
+    data = pd.DataFrame([['t1', 'w1', 'a'], ['t1', 'w2', 'a'], ['t2', 'w1', 'a'], ['t2', 'w2', 'a']],
+                        columns=['task', 'worker', 'text'])
+    tokenizer = FakeTokenizer()
+    result = get_summarization(tokenizer, n_permutations=2).fit_predict(data)
+
+    assert result.tolist() == ['a | a', 'a | a']
+    assert tokenizer.batches == [[5]]
+
+
+@pytest.mark.parametrize('n, k', [(3, 4), (3, 6), (12, 100)])
+def test_sample_permutations(n: int, k: int) -> None:
+    permutations = _sample_permutations(n, k, np.random.default_rng(0))
+
+    assert len(set(permutations)) == k
+    assert all(sorted(permutation) == list(range(n)) for permutation in permutations)
+    assert permutations == _sample_permutations(n, k, np.random.default_rng(0))
+
+
+def test_text_summarization_cache(summarization_data: pd.DataFrame, tmp_path: Path) -> None:
+    path = str(tmp_path / 'generations.sqlite')
+    first = summarization_data[summarization_data.task != 't3']
+    expected = get_summarization(FakeTokenizer(), batch_size=10).fit_predict(summarization_data)
+
+    get_summarization(FakeTokenizer(), cache=GenerationCache(path)).fit_predict(first)
+
+    # only the new task is generated
+    tokenizer = FakeTokenizer()
+    cache = GenerationCache(path)
+    result = get_summarization(tokenizer, batch_size=10, cache=cache).fit_predict(summarization_data)
+    pd.testing.assert_series_equal(result, expected)
+    assert tokenizer.batches == [[42]]
+    assert len(cache) == 3
+
+    # the outputs of other generation parameters are not reused
+    tokenizer = FakeTokenizer()
+    get_summarization(tokenizer, num_beams=1, batch_size=10, cache=cache).fit_predict(first)
+    assert tokenizer.batches == [[1, 11]]
+    cache.close()
+
+
+def test_text_summarization_cache_model_id(summarization_data: pd.DataFrame) -> None:
+    model = EchoModel()
+    model.name_or_path = ''
+    with pytest.raises(ValueError):
+        get_summarization(FakeTokenizer(), model, cache=GenerationCache()).fit_predict(summarization_data)
+
+    cache = GenerationCache()
+    get_summarization(FakeTokenizer(), model, cache=cache, model_id='echo').fit_predict(summarization_data)
+    assert len(cache) == 3
+
+    # the outputs are keyed by the model identifier
+    tokenizer = FakeTokenizer()
+    get_summarization(tokenizer, batch_size=10, cache=cache).fit_predict(summarization_data)
+    assert tokenizer.batches == []
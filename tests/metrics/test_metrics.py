@@ -1,11 +1,17 @@
+from typing import Any, Dict, cast
+
 import pandas as pd
 import numpy as np
 import pytest
 from nltk.metrics.distance import masi_distance
 from pandas.testing import assert_series_equal
 
+from crowdkit.aggregation import MajorityVote
 from crowdkit.aggregation.utils import get_accuracy
+from crowdkit.metrics import bootstrap_confidence_interval
+from crowdkit.metrics.bootstrap import _STATISTICS
 from crowdkit.metrics.data import alpha_krippendorff, consistency, uncertainty
+from crowdkit.metrics.data._classification import _get_label_probabilities, _get_label_scores
 from crowdkit.metrics.workers import accuracy_on_aggregates
 
 
@@ -13,6 +19,22 @@ def test_consistency(toy_answers_df: pd.DataFrame) -> None:
     assert consistency(toy_answers_df) == 0.9384615384615385
 
 
+def test_consistency_by_task() -> None:
+    answers = pd.DataFrame.from_records([
+        {'task': 'X', 'worker': 'A', 'label': 'Yes'},
+        {'task': 'X', 'worker': 'B', 'label': 'Yes'},
+        {'task': 'X', 'worker': 'C', 'label': 'No'},
+        {'task': 'Y', 'worker': 'A', 'label': 'No'},
+        {'task': 'Z', 'worker': 'D', 'label': 'No'},
+    ])
+    workers_skills = pd.Series([0.9, 0.6, 0.8, 0.0], index=['A', 'B', 'C', 'D'])
+
+    # X: 0.9 * 0.6 * 0.2 / (0.9 * 0.6 * 0.2 + 0.1 * 0.4 * 0.8); Z: a worker with zero skill is always wrong
+    assert cast(pd.Series, consistency(answers, workers_skills, by_task=True)).to_dict() == pytest.approx(
+        {'X': 0.108 / 0.14, 'Y': 0.9, 'Z': 0.}
+    )
+
+
 class TestUncertaintyMetric:
     def test_uncertainty_mean_per_task_skills(self, toy_answers_df: pd.DataFrame) -> None:
         workers_skills = pd.Series(
@@ -198,6 +220,17 @@ class TestUncertaintyMetric:
             aggregate=True
         )
 
+    @pytest.mark.parametrize('n_labels', [1, 2, 5])
+    def test_uncertainty_label_scores(self, n_labels: int) -> None:
+        rng = np.random.default_rng(0)
+        codes = rng.integers(0, 10, 100)
+        label_codes = rng.integers(0, n_labels, 100)
+        skills = rng.uniform(size=100)
+
+        expected = np.zeros((10, n_labels))
+        np.add.at(expected, codes, _get_label_probabilities(skills, label_codes, n_labels))
+        np.testing.assert_allclose(_get_label_scores(codes, 10, label_codes, n_labels, skills), expected)
+
 
 def test_golden_set_accuracy(toy_answers_df: pd.DataFrame, toy_gold_df: pd.Series) -> None:
     assert get_accuracy(toy_answers_df, toy_gold_df) == 5 / 9
@@ -216,6 +249,20 @@ def test_accuracy_on_aggregates(toy_answers_df: pd.DataFrame) -> None:
     assert accuracy_on_aggregates(toy_answers_df) == 0.7083333333333334
 
 
+def test_accuracy_on_aggregates_chunks(toy_answers_df: pd.DataFrame) -> None:
+    aggregates = MajorityVote().fit_predict(toy_answers_df)
+    chunks = [toy_answers_df.iloc[start:start + 7] for start in range(0, len(toy_answers_df), 7)]
+
+    assert_series_equal(accuracy_on_aggregates(iter(chunks), aggregates=aggregates, by='worker'),
+                        accuracy_on_aggregates(toy_answers_df, aggregates=aggregates, by='worker'))
+    assert accuracy_on_aggregates(iter(chunks), aggregates=aggregates) == pytest.approx(
+        accuracy_on_aggregates(toy_answers_df, aggregates=aggregates)
+    )
+
+    with pytest.raises(AssertionError):
+        accuracy_on_aggregates(iter(chunks))
+
+
 def test_alpha_krippendorff(toy_answers_df: pd.DataFrame) -> None:
     assert alpha_krippendorff(pd.DataFrame.from_records([
         {'task': 'X', 'worker': 'A', 'label': 'Yes'},
@@ -236,6 +283,32 @@ def test_alpha_krippendorff(toy_answers_df: pd.DataFrame) -> None:
     assert alpha_krippendorff(toy_answers_df) == 0.14219114219114215
 
 
+@pytest.mark.parametrize('distance, expected', [
+    ('nominal', 0.743), ('ordinal', 0.815), ('interval', 0.849), (lambda a, b: float(a != b), 0.743)
+])
+def test_alpha_krippendorff_metrics(distance: Any, expected: float) -> None:
+    # the reliability data example from K. Krippendorff, "Computing Krippendorff's Alpha-Reliability", 2011
+    reliability_data = [
+        [1, 2, 3, 3, 2, 1, 4, 1, 2, None, None, None],
+        [1, 2, 3, 3, 2, 2, 4, 1, 2, 5, None, 3],
+        [None, 3, 3, 3, 2, 3, 4, 2, 2, 5, 1, None],
+        [1, 2, 3, 3, 2, 4, 4, 1, 2, 5, 1, None],
+    ]
+    answers = pd.DataFrame.from_records([
+        {'task': task, 'worker': worker, 'label': label}
+        for worker, labels in enumerate(reliability_data)
+        for task, label in enumerate(labels)
+        if label is not None
+    ])
+
+    assert alpha_krippendorff(answers, distance) == pytest.approx(expected, abs=5e-4)
+
+
+def test_alpha_krippendorff_raises_unknown_distance(toy_answers_df: pd.DataFrame) -> None:
+    with pytest.raises(ValueError):
+        alpha_krippendorff(toy_answers_df, 'ratio')
+
+
 def test_alpha_krippendorff_with_distance() -> None:
     whos_on_the_picture = pd.DataFrame.from_records([
         {'task': 'X', 'worker': 'A', 'label': frozenset(['dog'])},
@@ -248,3 +321,48 @@ def test_alpha_krippendorff_with_distance() -> None:
 
     assert alpha_krippendorff(whos_on_the_picture) == 0.5454545454545454
     assert alpha_krippendorff(whos_on_the_picture, masi_distance) == 0.6673336668334168
+
+
+@pytest.mark.parametrize('metric, kwargs', [
+    (alpha_krippendorff, {}),
+    (alpha_krippendorff, {'distance': 'ordinal'}),
+    (consistency, {}),
+    (accuracy_on_aggregates, {}),
+])
+def test_bootstrap_statistics(toy_answers_df: pd.DataFrame, metric: Any, kwargs: Dict[str, Any]) -> None:
+    statistic = _STATISTICS[metric](toy_answers_df, **kwargs)
+
+    # the statistic of the tasks taken once is the metric itself
+    assert statistic(np.ones(len(statistic))) == pytest.approx(metric(toy_answers_df, **kwargs))
+
+
+@pytest.mark.parametrize('metric', [alpha_krippendorff, consistency, accuracy_on_aggregates])
+def test_bootstrap_confidence_interval(toy_answers_df: pd.DataFrame, metric: Any) -> None:
+    lower, upper = bootstrap_confidence_interval(toy_answers_df, metric, n_replicates=200, chunk_size=30)
+
+    assert lower <= metric(toy_answers_df) <= upper
+    assert (lower, upper) == bootstrap_confidence_interval(toy_answers_df, metric, n_replicates=200, chunk_size=30,
+                                                           n_jobs=2)
+
+
+def test_bootstrap_confidence_interval_raises_unsupported_metric(toy_answers_df: pd.DataFrame) -> None:
+    with pytest.raises(ValueError):
+        bootstrap_confidence_interval(toy_answers_df, uncertainty)
+
+
+@pytest.mark.parametrize('n_tasks', [2, 8])
+def test_bootstrap_confidence_interval_undefined_replicates(n_tasks: int) -> None:
+    # the accuracy is undefined if all the resampled tasks have zero weight
+    answers = pd.DataFrame(
+        [[f't{task}', f'w{worker}', worker, task % 2] for task in range(n_tasks) for worker in range(2)],
+        columns=['task', 'worker', 'label', 'weight']
+    )
+    aggregates = pd.Series(0, index=answers['task'].unique())
+
+    if n_tasks == 2:
+        with pytest.raises(ValueError):
+            bootstrap_confidence_interval(answers, accuracy_on_aggregates, aggregates=aggregates)
+    else:
+        with pytest.warns(UserWarning, match='undefined'):
+            lower, upper = bootstrap_confidence_interval(answers, accuracy_on_aggregates, aggregates=aggregates)
+        assert (lower, upper) == (0.5, 0.5)
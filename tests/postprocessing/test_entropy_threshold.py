@@ -1,8 +1,12 @@
+from typing import cast
+
+import numpy as np
+
 import pandas as pd
 import pytest
 
-from crowdkit.metrics.data import consistency
-from crowdkit.postprocessing import entropy_threshold
+from crowdkit.metrics.data import consistency, uncertainty
+from crowdkit.postprocessing import entropy_threshold, entropy_threshold_trajectory
 from crowdkit.aggregation import MajorityVote
 
 
@@ -101,3 +105,53 @@ class TestEntropyThreshold:
         filtered_accuracy = sum(aggregated[simple_ground_truth.index] == simple_ground_truth)/len(simple_ground_truth)
 
         assert filtered_accuracy >= base_accuracy
+
+    def test_entropy_threshold_iterations(self, simple_answers_df: pd.DataFrame) -> None:
+        once = entropy_threshold(simple_answers_df, percentile=20)
+        twice = entropy_threshold(once, percentile=20)
+
+        filtered_answers = entropy_threshold(simple_answers_df, percentile=20, n_iterations=2)
+        trajectory = entropy_threshold_trajectory(simple_answers_df, percentile=20, n_iterations=2)
+        pd.testing.assert_frame_equal(filtered_answers, twice)
+
+        assert trajectory.columns.tolist() == ['worker', 'iteration', 'uncertainty', 'cutoff']
+        assert set(trajectory[trajectory.iteration == 1].worker) == set(simple_answers_df.worker) - set(once.worker)
+        assert set(trajectory.worker) == set(simple_answers_df.worker) - set(filtered_answers.worker)
+        assert (trajectory.uncertainty <= trajectory.cutoff).all()
+
+    def test_entropy_threshold_until_stable(self) -> None:
+        workers_labels = {
+            'R': ['rare', 'rare'], 'A': ['a', 'c', 'c', 'c', 'c'], 'B': ['c', 'c', 'c'], 'C': ['a', 'a', 'a', 'c'],
+            'D': ['c', 'b', 'c', 'b'], 'E': ['a', 'b'], 'F': ['b', 'b', 'b', 'b', 'b'], 'G': ['c', 'b'], 'H': ['b', 'a'],
+        }
+        answers = pd.DataFrame.from_records([
+            {'task': str(task), 'worker': worker, 'label': label}
+            for worker, labels in workers_labels.items()
+            for task, label in enumerate(labels)
+        ])
+        skills = pd.Series([1, 1, 0.3, 0.3, 1, 0.3, 1, 0.3, 0.3], index=list(workers_labels))
+
+        filtered_answers = entropy_threshold(answers, skills, percentile=20, n_iterations=None)
+        trajectory = entropy_threshold_trajectory(answers, skills, percentile=20, n_iterations=None)
+
+        # once the only worker answering 'rare' is removed, the uncertainties change and A is removed too
+        assert trajectory.worker.tolist() == ['R', 'F', 'A']
+        assert trajectory.iteration.tolist() == [1, 1, 2]
+        assert set(filtered_answers.worker) == set(workers_labels) - {'R', 'F', 'A'}
+
+    def test_entropy_threshold_until_stable_random(self) -> None:
+        rng = np.random.default_rng(0)
+        answers = pd.DataFrame({
+            'task': rng.integers(0, 200, 2000),
+            'worker': rng.integers(0, 100, 2000),
+            'label': rng.integers(0, 3, 2000),
+        })
+
+        filtered_answers = entropy_threshold(answers, percentile=10, min_answers=2, n_iterations=None)
+        trajectory = entropy_threshold_trajectory(answers, percentile=10, min_answers=2, n_iterations=None)
+
+        # the passes stop with most of the workers left
+        assert filtered_answers.worker.nunique() > 80
+        assert trajectory.worker.is_unique
+        remaining_uncertainties = cast(pd.Series, uncertainty(filtered_answers, compute_by='worker', aggregate=False))
+        assert (remaining_uncertainties > trajectory.cutoff.iloc[-1]).all()
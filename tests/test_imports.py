@@ -0,0 +1,46 @@
+import subprocess
+import sys
+from typing import List
+
+import pytest
+
+from crowdkit._lazy import lazy_attributes
+
+HEAVY_MODULES = ['nltk', 'scipy.optimize', 'sklearn', 'tqdm', 'transformers']
+
+
+def get_imported_modules(statement: str) -> List[str]:
+    code = f'import sys\n{statement}\nprint(" ".join(sys.modules))'
+    return subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True).stdout.split()
+
+
+@pytest.mark.parametrize('statement', [
+    'import crowdkit.aggregation',
+    'import crowdkit.metrics.data',
+    'from crowdkit.aggregation import MajorityVote, DawidSkene',
+    'from crowdkit.metrics.workers import accuracy_on_aggregates',
+])
+def test_cold_import_skips_heavy_modules(statement: str) -> None:
+    modules = get_imported_modules(statement)
+    assert [module for module in HEAVY_MODULES if module in modules] == []
+
+
+def test_lazy_attributes() -> None:
+    import crowdkit.aggregation as aggregation
+    from crowdkit.aggregation.classification.glad import GLAD
+
+    assert aggregation.GLAD is GLAD
+    assert 'TextSummarization' in dir(aggregation)
+    with pytest.raises(AttributeError):
+        aggregation.Unknown
+
+
+def test_attributes_named_as_modules() -> None:
+    # importing the module first must not replace the function of the same name
+    statement = ('import crowdkit.metrics.workers.accuracy_on_aggregates\n'
+                 'from crowdkit.metrics.workers import accuracy_on_aggregates\n'
+                 'assert callable(accuracy_on_aggregates)')
+    get_imported_modules(statement)
+
+    with pytest.raises(ValueError):
+        lazy_attributes('crowdkit.metrics.workers', {'accuracy_on_aggregates': '.accuracy_on_aggregates'})
@@ -1,6 +1,12 @@
+from typing import Any, List, Tuple
+
+import numpy as np
 import pandas as pd
 
-from crowdkit.aggregation.utils import get_most_probable_labels, get_accuracy, normalize_rows
+from crowdkit.aggregation.utils import (
+    add_sorted_counts, find_sorted_counts, get_merged_components, get_most_probable_labels, get_accuracy,
+    merge_sorted_counts, normalize_rows
+)
 from pandas.testing import assert_frame_equal, assert_series_equal
 
 
@@ -89,3 +95,33 @@ def test_get_accuracy() -> None:
 
     skills = pd.Series([2/3, 1/3], index=pd.Index(['b', 'c'], name='true_label'))
     assert_series_equal(get_accuracy(data, true_labels, by='true_label'), skills)
+
+
+def test_get_merged_components() -> None:
+    components = np.array([0, 0, 1, 2, 2, 3, 4])
+    merged = get_merged_components(components, np.array([2, 6]), np.array([5, 0]))
+    assert merged.tolist() == [0, 0, 1, 2, 2, 1, 0]
+    assert get_merged_components(components, np.array([], dtype=int), np.array([], dtype=int)) is components
+
+
+def test_sorted_counts() -> None:
+    rng = np.random.default_rng(0)
+    runs: List[Tuple[Any, Any]] = []
+    all_keys = []
+    for size in [50, 10, 10, 3, 30, 1]:
+        keys = np.unique(rng.integers(0, 100, size))
+        runs = add_sorted_counts(runs, keys, np.ones(keys.size))
+        all_keys.append(keys)
+        assert all(2 * later[0].size < earlier[0].size for earlier, later in zip(runs, runs[1:]))
+
+    expected_keys, expected_counts = np.unique(np.concatenate(all_keys), return_counts=True)
+    keys, counts = merge_sorted_counts(runs)
+    assert keys.tolist() == expected_keys.tolist()
+    assert counts.tolist() == expected_counts.tolist()
+
+    found_keys, found_counts, ranges = find_sorted_counts(runs, np.array([10, 90]), np.array([20, 95]))
+    found = pd.Series(found_counts).groupby(found_keys).sum()
+    in_ranges = ((expected_keys >= 10) & (expected_keys < 20)) | ((expected_keys >= 90) & (expected_keys < 95))
+    assert found.index.tolist() == expected_keys[in_ranges].tolist()
+    assert found.tolist() == expected_counts[in_ranges].tolist()
+    assert (ranges == (found_keys >= 90)).all()